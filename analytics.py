@@ -0,0 +1,148 @@
+from array import array
+from typing import List, Sequence
+
+from common import Graph
+
+
+def topological_frontiers(graph: Graph) -> List[array]:
+    """
+    Фронты Кана: фронт k — вершины, все предки которых лежат во фронтах < k.
+    Все метрики ниже считаются фронт за фронтом по CSR-массивам.
+    ValueError с кратчайшим циклом (cycle_witness), если граф не ацикличен.
+    """
+    n = len(graph)
+    offsets = graph.succ_offsets
+    indices = graph.succ_indices
+    indegree = graph.in_degrees()
+
+    frontier = array("q", [i for i in range(n) if indegree[i] == 0])
+    frontiers = []
+    seen = 0
+    while frontier:
+        frontiers.append(frontier)
+        seen += len(frontier)
+        following = array("q")
+        for u in frontier:
+            for k in range(offsets[u], offsets[u + 1]):
+                v = indices[k]
+                indegree[v] -= 1
+                if indegree[v] == 0:
+                    following.append(v)
+        frontier = following
+
+    if seen < n:
+        witness = cycle_witness(graph, indegree)
+        raise ValueError(f"Cycle detected in tasks: {[graph.ids[i] for i in witness]}")
+    return frontiers
+
+
+def cycle_witness(graph: Graph, blocked: Sequence[int]) -> List[int]:
+    """
+    Цикл из вершин, которые Кан не смог снять (blocked[i] > 0 — у i остались невыполненные предки).
+    У каждой такой вершины есть такой же предок, так что шаг назад по ним приходит на цикл;
+    от найденной вершины цикла поиск в ширину даёт кратчайший цикл через неё, по порядку рёбер.
+    ValueError, если цикла нет — списки предков и потомков графа не согласованы.
+    """
+    offsets = graph.pred_offsets
+    indices = graph.pred_indices
+    v = next((i for i in range(len(graph)) if blocked[i] > 0), None)
+    visited = set()
+    while v is not None and v not in visited:
+        visited.add(v)
+        v = next((indices[k] for k in range(offsets[v], offsets[v + 1]) if blocked[indices[k]] > 0), None)
+    if v is None:
+        # Так бывает только у несогласованных списков предков и потомков
+        raise ValueError("Corrupted graph: blocked vertices do not form a cycle")
+
+    offsets = graph.succ_offsets
+    indices = graph.succ_indices
+    parent = {v: None}
+    queue = [v]
+    for u in queue:
+        for k in range(offsets[u], offsets[u + 1]):
+            w = indices[k]
+            if w == v:
+                cycle = [u]
+                while parent[cycle[-1]] is not None:
+                    cycle.append(parent[cycle[-1]])
+                cycle.reverse()
+                return cycle
+            if blocked[w] > 0 and w not in parent:
+                parent[w] = u
+                queue.append(w)
+    raise ValueError("Corrupted graph: blocked vertices do not form a cycle")
+
+
+def levels(graph: Graph, frontiers: List[array] = None) -> array:
+    """Топологический уровень: число рёбер на самом длинном пути от истока."""
+    result = array("q", [0]) * len(graph)
+    for level, frontier in enumerate(frontiers or topological_frontiers(graph)):
+        for u in frontier:
+            result[u] = level
+    return result
+
+
+def top_levels(graph: Graph, durations: Sequence[int], frontiers: List[array] = None) -> array:
+    """Самый ранний старт: длина самого длинного пути до вершины без её длительности."""
+    offsets = graph.succ_offsets
+    indices = graph.succ_indices
+    result = array("q", [0]) * len(graph)
+    for frontier in frontiers or topological_frontiers(graph):
+        for u in frontier:
+            finish = result[u] + durations[u]
+            for k in range(offsets[u], offsets[u + 1]):
+                v = indices[k]
+                if result[v] < finish:
+                    result[v] = finish
+    return result
+
+
+def bottom_levels(graph: Graph, durations: Sequence[int], frontiers: List[array] = None) -> array:
+    """Длина критического пути от вершины до стока, включая её длительность."""
+    offsets = graph.succ_offsets
+    indices = graph.succ_indices
+    result = array("q", [0]) * len(graph)
+    for frontier in reversed(frontiers or topological_frontiers(graph)):
+        for u in frontier:
+            tail = 0
+            for k in range(offsets[u], offsets[u + 1]):
+                if result[indices[k]] > tail:
+                    tail = result[indices[k]]
+            result[u] = tail + durations[u]
+    return result
+
+
+def descendant_counts(graph: Graph, frontiers: List[array] = None) -> array:
+    """
+    Число потомков (транзитивно) каждой вершины.
+    Множества потомков — битовые маски в Python int, собираются от стоков;
+    маска освобождается, как только её прочитали все предки.
+    """
+    n = len(graph)
+    offsets = graph.succ_offsets
+    indices = graph.succ_indices
+    unread = graph.in_degrees()
+    masks = [0] * n
+    result = array("q", [0]) * n
+    for frontier in reversed(frontiers or topological_frontiers(graph)):
+        for u in frontier:
+            mask = 0
+            for k in range(offsets[u], offsets[u + 1]):
+                v = indices[k]
+                mask |= masks[v] | (1 << v)
+                unread[v] -= 1
+                if unread[v] == 0:
+                    masks[v] = 0
+            result[u] = mask.bit_count()
+            if unread[u]:
+                masks[u] = mask
+    return result
+
+
+def makespan_lower_bound(graph: Graph, durations: Sequence[int], m: int,
+                         frontiers: List[array] = None) -> int:
+    """Нижняя оценка makespan: max(критический путь, ⌈суммарная работа / m⌉)."""
+    if not len(graph):
+        return 0
+    critical_path = max(bottom_levels(graph, durations, frontiers))
+    return max(critical_path, -(-sum(durations) // m))
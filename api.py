@@ -1,15 +1,102 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel, Field
-from typing import List, Dict, Set
+import asyncio
+from array import array
+import json
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Executor, Future
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
 
-from coffman import coffman_graham
-from common import Task, get_graph
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
+from typing import Any, List, Dict, Literal, Optional, Set, Tuple
+
+import profiling
+from analytics import makespan_lower_bound, topological_frontiers
+from cache import ScheduleCache, binary_key, canonical_key, graph_key, stream_hasher
+from common import Graph
+from components import schedule_components
+from exact import EXACT_TIME_LIMIT, solve_exact
+from graphio import ProblemBuilder, build_problem, dumps, loads
+from graphstore import GraphStore
+from reach import transitive_reduction
+from registry import ALGORITHMS, get_algorithm, run_result
+from render import COLUMNAR_MEDIA_TYPE, JSON_MEDIA_TYPE, schedule_columnar, schedule_json
+from session import SESSION_ALGORITHMS, SchedulingSession
+from verify import check_schedule
 
 # Default configuration variables
 DEFAULT_MACHINES: int = 2
 DEFAULT_DURATION: int = 1
+DEFAULT_ALGORITHM: str = "coffman"
+# Портфель по умолчанию — эвристики; точный перебор на больших графах дал бы то же coffman дороже
+PORTFOLIO_DEFAULT = tuple(name for name in ALGORITHMS if name != "exact")
+DEFAULT_BATCH_WORKERS: int = os.cpu_count() or 1
+
+DEFAULT_MAX_JOBS: int = 1000
+DEFAULT_CACHE_ENTRIES: int = 1024
+DEFAULT_CACHE_BYTES: int = 256 * 2**20
+DEFAULT_MAX_SESSIONS: int = 100
+DEFAULT_MAX_EXACT_TIME_LIMIT: float = 60.0
+DEFAULT_VERIFY_SCHEDULES: bool = False
+DEFAULT_MAX_GRAPH_BYTES: int = 2**30
+
+# Размер пула процессов для пакетного планирования
+BATCH_WORKERS: int = int(os.environ.get("BATCH_WORKERS", DEFAULT_BATCH_WORKERS))
+# Сколько фоновых задач хранить; при переполнении забываются самые старые завершённые,
+# а если все ещё идут — новые отклоняются с 503
+MAX_JOBS: int = int(os.environ.get("MAX_JOBS", DEFAULT_MAX_JOBS))
+# Кэш расписаний: лимиты памяти и необязательный каталог для дискового уровня
+CACHE_ENTRIES: int = int(os.environ.get("CACHE_ENTRIES", DEFAULT_CACHE_ENTRIES))
+CACHE_BYTES: int = int(os.environ.get("CACHE_BYTES", DEFAULT_CACHE_BYTES))
+CACHE_DIR: Optional[str] = os.environ.get("CACHE_DIR") or None
+# Сколько сессий инкрементального планирования держать; лишние вытесняются по давности обращения
+MAX_SESSIONS: int = int(os.environ.get("MAX_SESSIONS", DEFAULT_MAX_SESSIONS))
+# Замер фаз запроса: заголовок Server-Timing и /metrics; PROFILING=0 выключает
+PROFILING: bool = os.environ.get("PROFILING", "1") != "0"
+# Верхний предел бюджета точного перебора, который может запросить клиент, секунды
+MAX_EXACT_TIME_LIMIT: float = float(os.environ.get("MAX_EXACT_TIME_LIMIT", DEFAULT_MAX_EXACT_TIME_LIMIT))
+# Предел размера графа, загружаемого в общую память (POST /graphs), байты
+MAX_GRAPH_BYTES: int = int(os.environ.get("MAX_GRAPH_BYTES", DEFAULT_MAX_GRAPH_BYTES))
+# Отладка: проверять каждое посчитанное расписание (verify.check_schedule), нарушение — ответ 500
+VERIFY_SCHEDULES: bool = os.environ.get("VERIFY_SCHEDULES", "1" if DEFAULT_VERIFY_SCHEDULES else "0") != "0"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    if _executor is not None:
+        _executor.shutdown(cancel_futures=True)
+
+
+app = FastAPI(title="Scheduling API", lifespan=lifespan)
+
+metrics = profiling.Metrics()
+
+
+@app.middleware("http")
+async def profile_requests(request: Request, call_next):
+    """Профиль на запрос: фазы уходят в Server-Timing и копятся в /metrics."""
+    if not PROFILING:
+        return await call_next(request)
+    with profiling.profiled() as profile:
+        response = await call_next(request)
+    profile.total()
+    response.headers["Server-Timing"] = profile.server_timing()
+    route = request.scope.get("route")
+    metrics.observe(profile, getattr(route, "path", "unmatched"), response.status_code)
+    return response
 
-app = FastAPI(title="Scheduling API")
+
+def _parsed() -> None:
+    # Вызывается первой строкой обработчика: всё до него — чтение тела и разбор pydantic
+    profile = profiling.active()
+    if profile is not None:
+        profile.lap("request.parse")
 
 
 class TaskInput(BaseModel):
@@ -45,43 +132,771 @@ class TaskOutput(BaseModel):
 
 class ScheduleResponse(BaseModel):
     schedule: List[List[TaskOutput]] = Field(..., description="Расписание по машинам: список списков задач")
+    algorithm: Optional[str] = Field(None, description="Алгоритм, построивший расписание")
+    makespan: Optional[int] = Field(None, description="Время окончания последней задачи")
+    lower_bound: Optional[int] = Field(None, description="Нижняя оценка makespan: max(критический путь, ⌈работа / машины⌉)")
+
+
+class BatchRequest(BaseModel):
+    requests: List[ScheduleRequest] = Field(..., description="Независимые задачи планирования")
+    algorithm: str = Field(DEFAULT_ALGORITHM, description="Алгоритм из реестра для всех элементов")
+
+
+class BatchItem(BaseModel):
+    schedule: Optional[List[List[TaskOutput]]] = Field(None, description="Расписание, если задача решена")
+    makespan: Optional[int] = Field(None, description="Время окончания последней задачи")
+    lower_bound: Optional[int] = Field(None, description="Нижняя оценка makespan")
+    error: Optional[str] = Field(None, description="Причина ошибки для этого элемента")
+
+
+class BatchResponse(BaseModel):
+    results: List[BatchItem] = Field(..., description="Результаты в порядке запросов")
+
+
+# Сырой вид задач для передачи между процессами: (id, duration, predecessors)
+RawTasks = List[Tuple[int, int, List[int]]]
+# Сырой вид расписания: по машинам списки (id, start_time, end_time, machine)
+RawSchedule = List[List[Tuple[int, int, int, int]]]
+# Результат solve: {"schedule": RawSchedule, "makespan": int, "lower_bound": int}
+Solved = Dict[str, Any]
+
+
+def solve(algorithm: str, tasks: RawTasks, machines: int, executor: Optional[Executor] = None,
+          reduce: bool = False) -> Solved:
+    """
+    Построить расписание алгоритмом из реестра; функция модульного уровня, чтобы её мог вызвать пул процессов.
+    С executor граф делится на компоненты слабой связности, которые планируются в нём параллельно.
+    reduce — сначала убрать транзитивные рёбра (reach.transitive_reduction).
+    """
+    graph, durations = build_problem(tasks)
+    return solve_graph(algorithm, graph, durations, machines, executor, reduce)
+
+
+def solve_binary(algorithm: str, data: bytes, machines: Optional[int]) -> Solved:
+    """То же для задачи в двоичном формате graphio; machines по умолчанию — из заголовка."""
+    graph, durations, stored = loads(data)
+    return solve_graph(algorithm, graph, durations, machines or stored or DEFAULT_MACHINES)
+
+
+def solve_graph(algorithm: str, graph: Graph, durations, machines: int,
+                executor: Optional[Executor] = None, reduce: bool = False) -> Solved:
+    """
+    Граф уже собран без повторов и с известными предками (graphio); здесь единственный
+    проход Кана проверяет циклы (с кратчайшим циклом в ошибке), и его фронты идут
+    дальше в планировщик и нижнюю оценку вместо повторных обходов.
+    """
+    with profiling.phase("graph.validate"):
+        frontiers = topological_frontiers(graph)
+    original = graph
+    if reduce:
+        with profiling.phase("graph.reduce"):
+            # Транзитивные рёбра не удлиняют путей, фронты остаются прежними
+            graph = transitive_reduction(graph, frontiers)
+    if executor is None:
+        result = run_result(algorithm, graph, durations, machines, frontiers)
+    else:
+        result = schedule_components(algorithm, graph, durations, machines, executor, frontiers)
+    _verify(original, durations, result)
+    with profiling.phase("graph.lower_bound"):
+        lower_bound = makespan_lower_bound(graph, durations, machines, frontiers)
+    return {
+        "schedule": result.to_raw(),
+        "makespan": result.makespan,
+        "lower_bound": lower_bound,
+    }
+
+
+def _verify(graph: Graph, durations, result) -> None:
+    if VERIFY_SCHEDULES:
+        with profiling.phase("schedule.verify"):
+            check_schedule(graph, durations, result)
+
+
+def solve_optimal(tasks: RawTasks, machines: int, time_limit: float,
+                  executor: Optional[Executor] = None) -> Tuple[Solved, bool]:
+    """Точное расписание (exact.solve_exact) и признак доказанной оптимальности; lower_bound — доказанная оценка."""
+    graph, durations = build_problem(tasks)
+    workers = BATCH_WORKERS if executor is not None else 1
+    solution = solve_exact(graph, durations, machines, time_limit, workers, executor)
+    _verify(graph, durations, solution.result)
+    return {
+        "schedule": solution.result.to_raw(),
+        "makespan": solution.result.makespan,
+        "lower_bound": solution.lower_bound,
+    }, solution.optimal
+
+
+def _solve_batch_item(item: Tuple[str, RawTasks, int]) -> Tuple[Optional[Solved], Optional[str]]:
+    # Ошибка одного элемента не должна ронять весь пакет
+    try:
+        return solve(*item), None
+    except ValueError as e:
+        return None, str(e)
+    except Exception as e:
+        # Сбой алгоритма на одном элементе — тоже ошибка этого элемента, а не 500 на весь пакет
+        return None, f"Internal error: {type(e).__name__}: {e}"
+
+
+def _raw_tasks(tasks: List[TaskInput]) -> RawTasks:
+    return [(t.id, t.duration, t.predecessors) for t in tasks]
+
+
+def _to_outputs(raw: RawSchedule) -> List[List[TaskOutput]]:
+    return [
+        [TaskOutput(id=i, start_time=s, end_time=e, machine=m) for i, s, e, m in machine_tasks]
+        for machine_tasks in raw
+    ]
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+cache = ScheduleCache(max_entries=CACHE_ENTRIES, max_bytes=CACHE_BYTES, directory=CACHE_DIR)
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """Общий пул процессов для CPU-bound работы, создаётся при первом обращении."""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=BATCH_WORKERS)
+    return _executor
+
+
+def _check_algorithm(algorithm: str) -> None:
+    if algorithm not in ALGORITHMS:
+        raise HTTPException(status_code=404, detail=f"Unknown algorithm: {algorithm}")
+
+
+# Формат ответа: model — через ScheduleResponse, json — те же байты напрямую из строк
+# расписания, columnar — массивы ids / starts / ends по машинам
+OutputFormat = Literal["model", "json", "columnar"]
+
+
+def output_format(
+    format: Optional[OutputFormat] = Query(None, description="model | json | columnar"),
+    accept: Optional[str] = Header(None),
+) -> OutputFormat:
+    """Формат из ?format=, иначе из Accept (COLUMNAR_MEDIA_TYPE), иначе model."""
+    if format is not None:
+        return format
+    if accept and COLUMNAR_MEDIA_TYPE in accept:
+        return "columnar"
+    return "model"
+
+
+def _response(algorithm: str, solved: Solved, fmt: OutputFormat = "model"):
+    with profiling.phase("response.render"):
+        return _render(algorithm, solved, fmt)
+
+
+def _render(algorithm: str, solved: Solved, fmt: OutputFormat):
+    if fmt == "json":
+        return Response(schedule_json(algorithm, solved), media_type=JSON_MEDIA_TYPE)
+    if fmt == "columnar":
+        return Response(schedule_columnar(algorithm, solved), media_type=COLUMNAR_MEDIA_TYPE)
+    return ScheduleResponse(
+        schedule=_to_outputs(solved["schedule"]),
+        algorithm=algorithm,
+        makespan=solved["makespan"],
+        lower_bound=solved["lower_bound"],
+    )
+
+
+def _remember(algorithm: str, key: str, solved: Solved) -> None:
+    """
+    Положить результат в кэш. exact на общих маршрутах ограничен бюджетом EXACT_TIME_LIMIT
+    и без доказанной оптимальности зависит от него и от загрузки машины, поэтому кэшируется,
+    только если makespan совпал с нижней оценкой; доказанные оптимумы кэширует /schedule/exact.
+    """
+    if algorithm != "exact" or solved["makespan"] == solved["lower_bound"]:
+        cache.put(key, solved)
+
+
+def _solve_cached(algorithm: str, tasks: RawTasks, machines: int, split: bool = False,
+                  reduce: bool = False) -> Solved:
+    # Расписание по компонентам или по сокращённому графу может отличаться от обычного, поэтому и ключ у него свой
+    with profiling.phase("cache.lookup"):
+        suffix = ("/split" if split else "") + ("/reduced" if reduce else "")
+        key = canonical_key(tasks, machines, algorithm + suffix)
+        solved = cache.get(key)
+    if solved is None:
+        try:
+            solved = solve(algorithm, tasks, machines, get_executor() if split else None, reduce)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        _remember(algorithm, key, solved)
+    return solved
+
+
+SPLIT_DESCRIPTION = "Планировать компоненты слабой связности параллельно в пуле процессов и упаковать на машины"
+REDUCE_DESCRIPTION = "Убрать транзитивные рёбра (A → C при A → B → C) перед планированием"
 
 
 @app.post("/schedule/coffman", response_model=ScheduleResponse)
-def schedule_coffman(request: ScheduleRequest):
-    # Собираем Task-объекты
-    tasks_dict: Dict[int, Task] = {}
+def schedule_coffman(request: ScheduleRequest, fmt: OutputFormat = Depends(output_format),
+                     split: bool = Query(False, description=SPLIT_DESCRIPTION),
+                     reduce: bool = Query(False, description=REDUCE_DESCRIPTION)):
+    _parsed()
+    return _response("coffman", _solve_cached("coffman", _raw_tasks(request.tasks), request.machines,
+                                              split, reduce), fmt)
+
+
+@app.post("/schedule/exact", response_model=ScheduleResponse)
+def schedule_exact(
+    request: ScheduleRequest,
+    fmt: OutputFormat = Depends(output_format),
+    time_limit: float = Query(EXACT_TIME_LIMIT, gt=0, le=MAX_EXACT_TIME_LIMIT, description="Бюджет перебора, секунды"),
+    parallel: bool = Query(False, description="Перебирать поддеревья в пуле процессов"),
+):
+    """
+    Точное расписание ветвями и границами с бюджетом time_limit: по его истечении — лучшее найденное.
+    lower_bound в ответе — доказанная оценка оптимума, равная makespan, если оптимальность доказана.
+    В кэш попадают только доказанно оптимальные расписания: они не зависят от бюджета.
+    """
+    _parsed()
+    tasks = _raw_tasks(request.tasks)
+    with profiling.phase("cache.lookup"):
+        key = canonical_key(tasks, request.machines, "exact/optimal")
+        solved = cache.get(key)
+    if solved is None:
+        try:
+            solved, optimal = solve_optimal(tasks, request.machines, time_limit,
+                                            get_executor() if parallel else None)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if optimal:
+            cache.put(key, solved)
+    return _response("exact", solved, fmt)
+
+
+@app.post("/schedule/batch", response_model=BatchResponse)
+async def schedule_batch(batch: BatchRequest):
+    _parsed()
+    _check_algorithm(batch.algorithm)
+    items = [(batch.algorithm, _raw_tasks(r.tasks), r.machines) for r in batch.requests]
+    keys = [canonical_key(tasks, machines, algorithm) for algorithm, tasks, machines in items]
+    solved: List[Tuple[Optional[Solved], Optional[str]]] = [(cache.get(key), None) for key in keys]
+    missing = [i for i, (result, _) in enumerate(solved) if result is None]
+
+    if missing:
+        # Мелкие задачи отправляем пачками, иначе накладные расходы пула съедят выигрыш
+        chunksize = max(1, len(missing) // (BATCH_WORKERS * 4))
+        executor = get_executor()
+        loop = asyncio.get_running_loop()
+        fresh = await loop.run_in_executor(
+            None, lambda: list(executor.map(_solve_batch_item, [items[i] for i in missing], chunksize=chunksize))
+        )
+        for i, (result, error) in zip(missing, fresh):
+            solved[i] = (result, error)
+            if error is None:
+                _remember(batch.algorithm, keys[i], result)
+
+    results = [
+        BatchItem(
+            schedule=_to_outputs(result["schedule"]),
+            makespan=result["makespan"],
+            lower_bound=result["lower_bound"],
+        ) if error is None else BatchItem(error=error)
+        for result, error in solved
+    ]
+    return BatchResponse(results=results)
+
+
+@app.post("/schedule/portfolio", response_model=ScheduleResponse)
+async def schedule_portfolio(
+    request: ScheduleRequest,
+    algorithms: Optional[List[str]] = Query(None, description="Алгоритмы портфеля, по умолчанию все эвристики реестра"),
+    fmt: OutputFormat = Depends(output_format),
+):
+    """Запустить несколько алгоритмов параллельно и вернуть расписание с наименьшим makespan."""
+    _parsed()
+    names = list(dict.fromkeys(algorithms or PORTFOLIO_DEFAULT))
+    for name in names:
+        _check_algorithm(name)
+    tasks = _raw_tasks(request.tasks)
+    keys = {name: canonical_key(tasks, request.machines, name) for name in names}
+    solved = {name: cache.get(keys[name]) for name in names}
+    missing = [name for name in names if solved[name] is None]
+
+    if missing:
+        executor = get_executor()
+        loop = asyncio.get_running_loop()
+        fresh = await asyncio.gather(
+            *(loop.run_in_executor(executor, solve, name, tasks, request.machines) for name in missing),
+            return_exceptions=True,
+        )
+        for name, result in zip(missing, fresh):
+            if isinstance(result, ValueError):
+                raise HTTPException(status_code=400, detail=str(result))
+            if isinstance(result, BaseException):
+                raise result
+            solved[name] = result
+            _remember(name, keys[name], result)
+
+    # При равном makespan побеждает алгоритм, указанный раньше
+    best = min(names, key=lambda name: (solved[name]["makespan"], names.index(name)))
+    return _response(best, solved[best], fmt)
+
+
+@app.post("/schedule/{algorithm}/binary", response_model=ScheduleResponse)
+async def schedule_binary(
+    algorithm: str,
+    request: Request,
+    machines: Optional[int] = Query(None, gt=0, description="Число машин, по умолчанию из заголовка файла"),
+    fmt: OutputFormat = Depends(output_format),
+):
+    """
+    Задача в двоичном формате graphio (application/octet-stream): без pydantic-моделей
+    на каждую задачу, граф читается прямо из тела запроса.
+    """
+    _check_algorithm(algorithm)
+    if request.headers.get("content-type", "").split(";")[0].strip() != "application/octet-stream":
+        raise HTTPException(status_code=415, detail="Expected application/octet-stream")
+    data = await request.body()
+    _parsed()
+    key = binary_key(data, machines, algorithm)
+    solved = cache.get(key)
+    if solved is None:
+        try:
+            solved = await run_in_threadpool(solve_binary, algorithm, data, machines)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        _remember(algorithm, key, solved)
+    return _response(algorithm, solved, fmt)
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def _ingest_lines(problem: ProblemBuilder, lines: List[bytes], first_number: int) -> None:
+    """Разобрать строки NDJSON в problem; first_number — номер первой строки для сообщений об ошибках."""
+    for line_number, line in enumerate(lines, first_number):
+        if not line.strip():
+            continue
+        try:
+            task = TaskInput.model_validate_json(line)
+            problem.add(task.id, task.duration, task.predecessors)
+        except ValidationError as e:
+            raise HTTPException(status_code=400, detail=f"Line {line_number}: {e.errors(include_url=False)}")
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Line {line_number}: {e}")
+
+
+def _finish_ndjson(problem: ProblemBuilder, tail: bytes, line_number: int) -> Tuple[Graph, array]:
+    _ingest_lines(problem, [tail], line_number)
+    try:
+        return problem.finish()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post("/schedule/{algorithm}/ndjson", response_model=ScheduleResponse)
+async def schedule_ndjson(
+    algorithm: str,
+    request: Request,
+    machines: int = Query(DEFAULT_MACHINES, gt=0, description="Количество машин"),
+    fmt: OutputFormat = Depends(output_format),
+):
+    """
+    Задачи потоком NDJSON (application/x-ndjson): строка — один TaskInput.
+    Строки разбираются по мере прихода прямо в массивы графа, так что в памяти
+    нет ни всего тела, ни списка моделей. Предшественник может прийти и позже
+    задачи, которая на него ссылается; не пришедшие к концу потока — ошибка 400.
+    """
+    _check_algorithm(algorithm)
+    if request.headers.get("content-type", "").split(";")[0].strip() != NDJSON_MEDIA_TYPE:
+        raise HTTPException(status_code=415, detail=f"Expected {NDJSON_MEDIA_TYPE}")
+    problem = ProblemBuilder()
+    hasher = stream_hasher("nd", machines, algorithm)
+    tail = b""
+    line_number = 0
+    with profiling.phase("request.ingest"):
+        # Разбор строк — в пуле потоков по куску за раз: цикл событий не ждёт pydantic
+        async for chunk in request.stream():
+            hasher.update(chunk)
+            lines = (tail + chunk).split(b"\n")
+            tail = lines.pop()
+            if lines:
+                await run_in_threadpool(_ingest_lines, problem, lines, line_number + 1)
+                line_number += len(lines)
+        graph, durations = await run_in_threadpool(_finish_ndjson, problem, tail, line_number + 1)
+    del problem
+
+    key = "nd-" + hasher.hexdigest()
+    solved = cache.get(key)
+    if solved is None:
+        try:
+            # run_in_threadpool, а не loop.run_in_executor: переносит профиль запроса в поток
+            solved = await run_in_threadpool(solve_graph, algorithm, graph, durations, machines)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        _remember(algorithm, key, solved)
+    return _response(algorithm, solved, fmt)
+
+
+graphs = GraphStore(MAX_GRAPH_BYTES)
+
+
+class GraphInfo(BaseModel):
+    id: str = Field(..., description="Идентификатор графа: sha256 его двоичного представления")
+    tasks: int
+    edges: int
+    machines: Optional[int] = Field(None, description="Число машин по умолчанию, если задано при загрузке")
+
+
+class GraphScheduleRequest(BaseModel):
+    durations: Dict[int, int] = Field({}, description="Новые длительности задач по id; сам граф не меняется")
+
+
+def _get_graph(graph_id: str) -> Tuple[Graph, Any, int]:
+    try:
+        return graphs.get(graph_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown graph id: {graph_id}")
+
+
+def _graph_info(graph_id: str) -> GraphInfo:
+    graph, _, machines = _get_graph(graph_id)
+    return GraphInfo(id=graph_id, tasks=len(graph), edges=graph.edge_count, machines=machines or None)
+
+
+def _override_durations(graph: Graph, durations, overrides: Dict[int, int]) -> array:
+    # Копия только длительностей: массивы графа остаются в общей памяти
+    changed = array("q")
+    changed.frombytes(memoryview(durations).cast("B"))
+    for task_id, duration in overrides.items():
+        i = graph.index.get(task_id)
+        if i is None:
+            raise HTTPException(status_code=400, detail=f"Unknown task id: {task_id}")
+        if duration <= 0:
+            raise HTTPException(status_code=400, detail=f"Task {task_id}: duration must be positive")
+        changed[i] = duration
+    return changed
+
+
+async def _read_limited(request: Request, limit: int) -> bytearray:
+    """Тело запроса не больше limit байт, иначе 413 — до чтения по Content-Length или как только поток его превысит."""
+    length = request.headers.get("content-length", "")
+    if length.isdigit() and int(length) > limit:
+        raise HTTPException(status_code=413, detail=f"Request body is too large: {length} bytes, limit {limit}")
+    data = bytearray()
+    async for chunk in request.stream():
+        data += chunk
+        if len(data) > limit:
+            raise HTTPException(status_code=413, detail=f"Request body is too large: limit {limit} bytes")
+    return data
+
+
+@app.post("/graphs", response_model=GraphInfo, status_code=201)
+async def upload_graph(request: Request):
+    """
+    Загрузить граф один раз и дальше планировать его по id (POST /schedule/{algorithm}/graphs/{id}).
+    Тело — двоичный формат graphio (application/octet-stream) или ScheduleRequest в JSON.
+    Граф ложится в общую память и виден всем процессам-воркерам; id — хеш содержимого,
+    так что повторная загрузка того же графа вернёт тот же id.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    data = await _read_limited(request, MAX_GRAPH_BYTES)
+    if content_type == "application/json":
+        try:
+            payload = ScheduleRequest.model_validate_json(data)
+        except ValidationError as e:
+            raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+        try:
+            graph, durations = build_problem(_raw_tasks(payload.tasks))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        data = dumps(graph, durations, payload.machines)
+    elif content_type != "application/octet-stream":
+        raise HTTPException(status_code=415, detail="Expected application/octet-stream or application/json")
+    _parsed()
+    try:
+        graph_id = await run_in_threadpool(graphs.put, data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _graph_info(graph_id)
+
+
+@app.get("/graphs/{graph_id}", response_model=GraphInfo)
+def get_stored_graph(graph_id: str):
+    return _graph_info(graph_id)
+
+
+@app.delete("/graphs/{graph_id}", status_code=204)
+def delete_graph(graph_id: str):
+    """Удалить граф для всех воркеров; запросы, которые уже его планируют, доработают."""
+    try:
+        graphs.delete(graph_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown graph id: {graph_id}")
+    return Response(status_code=204)
+
+
+@app.post("/schedule/{algorithm}/graphs/{graph_id}", response_model=ScheduleResponse)
+async def schedule_stored_graph(
+    algorithm: str,
+    graph_id: str,
+    body: Optional[GraphScheduleRequest] = None,
+    machines: Optional[int] = Query(None, gt=0, description="Число машин, по умолчанию заданное при загрузке"),
+    fmt: OutputFormat = Depends(output_format),
+    reduce: bool = Query(False, description=REDUCE_DESCRIPTION),
+):
+    """
+    Расписание графа, загруженного через POST /graphs: без тела запроса с задачами и без разбора,
+    массивы графа читаются из общей памяти. В теле можно переопределить длительности отдельных задач.
+    """
+    _parsed()
+    _check_algorithm(algorithm)
+    graph, durations, stored = _get_graph(graph_id)
+    overrides = body.durations if body is not None else {}
+    machines = machines or stored or DEFAULT_MACHINES
+    key = graph_key(graph_id, machines, algorithm + ("/reduced" if reduce else ""), overrides)
+    solved = cache.get(key)
+    if solved is None:
+        if overrides:
+            durations = _override_durations(graph, durations, overrides)
+        try:
+            solved = await run_in_threadpool(solve_graph, algorithm, graph, durations, machines, None, reduce)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        _remember(algorithm, key, solved)
+    return _response(algorithm, solved, fmt)
+
+
+@app.post("/schedule/{algorithm}", response_model=ScheduleResponse)
+def schedule(algorithm: str, request: ScheduleRequest, fmt: OutputFormat = Depends(output_format),
+             split: bool = Query(False, description=SPLIT_DESCRIPTION),
+             reduce: bool = Query(False, description=REDUCE_DESCRIPTION)):
+    _parsed()
+    _check_algorithm(algorithm)
+    return _response(algorithm, _solve_cached(algorithm, _raw_tasks(request.tasks), request.machines,
+                                              split, reduce), fmt)
+
+
+class JobStatus(BaseModel):
+    id: str
+    status: str = Field(..., description="pending | running | done | failed | cancelled")
+    error: Optional[str] = Field(None, description="Причина ошибки, если status == failed")
+
+
+_jobs: "OrderedDict[str, Future]" = OrderedDict()
+_jobs_lock = threading.Lock()
+
+
+def _job_status(job_id: str, future: Future) -> JobStatus:
+    if not future.done():
+        return JobStatus(id=job_id, status="running" if future.running() else "pending")
+    # Пул останавливается с cancel_futures=True: exception() отменённой задачи бросает CancelledError
+    if future.cancelled():
+        return JobStatus(id=job_id, status="cancelled")
+    error = future.exception()
+    if error is not None:
+        return JobStatus(id=job_id, status="failed", error=str(error))
+    return JobStatus(id=job_id, status="done")
+
+
+def _get_job(job_id: str) -> Future:
+    future = _jobs.get(job_id)
+    if future is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job id: {job_id}")
+    return future
+
+
+def _forget_finished_jobs() -> None:
+    # Освободить место под одну новую задачу
+    for job_id in [j for j, f in _jobs.items() if f.done()]:
+        if len(_jobs) < MAX_JOBS:
+            break
+        del _jobs[job_id]
+
+
+@app.post("/jobs", response_model=JobStatus, status_code=202)
+def submit_job(request: ScheduleRequest, algorithm: str = Query(DEFAULT_ALGORITHM)):
+    _parsed()
+    _check_algorithm(algorithm)
+    job_id = uuid.uuid4().hex
+    with _jobs_lock:
+        _forget_finished_jobs()
+        if len(_jobs) >= MAX_JOBS:
+            raise HTTPException(status_code=503, detail=f"Too many unfinished jobs: limit {MAX_JOBS}")
+        # Место занимается сразу, чтобы параллельные запросы не превысили лимит
+        _jobs[job_id] = Future()
+    tasks = _raw_tasks(request.tasks)
+    key = canonical_key(tasks, request.machines, algorithm)
+    solved = cache.get(key)
+    if solved is not None:
+        future = Future()
+        future.set_result(solved)
+    else:
+        try:
+            future = get_executor().submit(solve, algorithm, tasks, request.machines)
+        except BaseException:
+            with _jobs_lock:
+                del _jobs[job_id]
+            raise
+        future.add_done_callback(
+            lambda f: not f.cancelled() and f.exception() is None and _remember(algorithm, key, f.result()))
+    _jobs[job_id] = future
+    return _job_status(job_id, future)
+
+
+@app.get("/jobs/{job_id}", response_model=JobStatus)
+def get_job(job_id: str):
+    return _job_status(job_id, _get_job(job_id))
+
+
+@app.get("/jobs/{job_id}/result")
+def get_job_result(job_id: str):
+    """Расписание в формате NDJSON: одна строка {"machine": i, "tasks": [...]} на машину."""
+    future = _get_job(job_id)
+    if not future.done():
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is not finished")
+    if future.cancelled():
+        raise HTTPException(status_code=410, detail=f"Job {job_id} was cancelled")
+    error = future.exception()
+    if error is not None:
+        raise HTTPException(status_code=400, detail=str(error))
+    raw = future.result()["schedule"]
+
+    def lines():
+        for machine, machine_tasks in enumerate(raw):
+            tasks = [
+                {"id": i, "start_time": s, "end_time": e, "machine": m}
+                for i, s, e, m in machine_tasks
+            ]
+            yield json.dumps({"machine": machine, "tasks": tasks}) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@app.get("/cache/stats")
+def cache_stats():
+    """Счётчики попаданий и промахов кэша расписаний этого процесса."""
+    return cache.stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """
+    Метрики этого процесса в текстовом формате Prometheus: время фаз, счётчики
+    горячих путей, запросы по маршрутам, состояние кэша, фоновых задач и сессий.
+    Фазы, выполненные в пуле процессов (batch, portfolio, jobs), сюда не попадают.
+    """
+    stats = cache.stats()
+    extra = {
+        "cache_entries": stats["entries"],
+        "cache_bytes": stats["bytes"],
+        "cache_hits_total": stats["hits"],
+        "cache_disk_hits_total": stats["disk_hits"],
+        "cache_misses_total": stats["misses"],
+        "cache_evictions_total": stats["evictions"],
+        "jobs": len(_jobs),
+        "sessions": len(_sessions),
+    }
+    return PlainTextResponse(metrics.render(extra), media_type="text/plain; version=0.0.4")
+
+
+
+class ScheduleChange(BaseModel):
+    op: Literal["add_task", "remove_task", "set_duration", "add_edge", "remove_edge"]
+    id: Optional[int] = Field(None, description="Задача для add_task, remove_task, set_duration")
+    duration: Optional[int] = Field(None, gt=0, description="Длительность для add_task и set_duration")
+    predecessors: List[int] = Field([], description="Предшественники новой задачи (add_task)")
+    successors: List[int] = Field([], description="Последователи новой задачи (add_task)")
+    source: Optional[int] = Field(None, description="Начало ребра для add_edge и remove_edge")
+    target: Optional[int] = Field(None, description="Конец ребра для add_edge и remove_edge")
+
+
+class SessionPatch(BaseModel):
+    changes: List[ScheduleChange] = Field(..., description="Дельты, применяются по порядку")
+
+
+class SessionResponse(ScheduleResponse):
+    id: str
+
+
+# Сессия и её замок: дельты и result() меняют сессию на месте, а синхронные маршруты
+# выполняются в пуле потоков — одновременные запросы к одной сессии идут по очереди
+_sessions: "OrderedDict[str, Tuple[SchedulingSession, threading.Lock]]" = OrderedDict()
+_sessions_lock = threading.Lock()
+
+
+def _get_session(session_id: str) -> Tuple[SchedulingSession, threading.Lock]:
+    with _sessions_lock:
+        entry = _sessions.get(session_id)
+        if entry is None:
+            raise HTTPException(status_code=404, detail=f"Unknown session id: {session_id}")
+        _sessions.move_to_end(session_id)
+        return entry
+
+
+def _session_response(session_id: str, session: SchedulingSession) -> SessionResponse:
+    result = session.result()
+    return SessionResponse(
+        id=session_id,
+        schedule=_to_outputs(result.to_raw()),
+        algorithm=session.algorithm,
+        makespan=result.makespan,
+    )
+
+
+@app.post("/sessions", response_model=SessionResponse, status_code=201)
+def create_session(request: ScheduleRequest, algorithm: str = Query("fujii")):
+    """Создать сессию: расписание хранится в процессе и правится дельтами через PATCH."""
+    if algorithm not in SESSION_ALGORITHMS:
+        raise HTTPException(status_code=404, detail=f"Unknown session algorithm: {algorithm}")
+    durations = {}
+    precedence = {}
     for t in request.tasks:
-        if t.id in tasks_dict:
+        if t.id in durations:
             raise HTTPException(status_code=400, detail=f"Duplicate task id: {t.id}")
-        tasks_dict[t.id] = Task(id=t.id, duration=t.duration)
-
-    # Строим граф предшествований
-    precedence: Dict[int, Set[int]] = {t.id: set(t.predecessors) for t in request.tasks}
-
-    # Валидация: все упомянутые предшественники должны существовать
-    all_ids = set(tasks_dict.keys())
-    for preds in precedence.values():
-        for p in preds:
-            if p not in all_ids:
-                raise HTTPException(status_code=400, detail=f"Unknown predecessor id: {p}")
-
-    # Запуск алгоритма
-    schedule = coffman_graham(tasks_dict, precedence, m=request.machines)
-
-    # Сборка ответа
-    response_schedule: List[List[TaskOutput]] = []
-    for machine_tasks in schedule:
-        out_tasks = [
-            TaskOutput(
-                id=task.id,
-                start_time=task.start_time,
-                end_time=task.end_time,
-                machine=task.machine
-            )
-            for task in machine_tasks
-        ]
-        out_tasks.sort(key=lambda x: x.start_time)
-        response_schedule.append(out_tasks)
-
-    return ScheduleResponse(schedule=response_schedule)
+        durations[t.id] = t.duration
+    for t in request.tasks:
+        for p in t.predecessors:
+            precedence.setdefault(p, []).append(t.id)
+    try:
+        session = SchedulingSession(durations, precedence, request.machines, algorithm)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    session_id = uuid.uuid4().hex
+    with _sessions_lock:
+        _sessions[session_id] = (session, threading.Lock())
+        while len(_sessions) > MAX_SESSIONS:
+            _sessions.popitem(last=False)
+    return _session_response(session_id, session)
+
+
+@app.get("/sessions/{session_id}", response_model=SessionResponse)
+def get_session(session_id: str):
+    session, lock = _get_session(session_id)
+    # Чтение тоже под замком: result() применяет накопленные дельты
+    with lock:
+        return _session_response(session_id, session)
+
+
+@app.patch("/sessions/{session_id}", response_model=SessionResponse)
+def patch_session(session_id: str, patch: SessionPatch):
+    """
+    Применить дельты и вернуть обновлённое расписание.
+    Перепланируется только хвост расписания после первого затронутого момента.
+    Если дельта некорректна (цикл, неизвестная задача), она и все следующие
+    не применяются, а предыдущие остаются в силе.
+    """
+    session, lock = _get_session(session_id)
+    with lock:
+        for k, change in enumerate(patch.changes):
+            try:
+                session.apply(change.model_dump(exclude_none=True))
+            except KeyError as e:
+                raise HTTPException(status_code=400, detail=f"Change {k}: missing field {e}")
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=f"Change {k}: {e}")
+        return _session_response(session_id, session)
+
+
+@app.delete("/sessions/{session_id}", status_code=204)
+def delete_session(session_id: str):
+    with _sessions_lock:
+        if _sessions.pop(session_id, None) is None:
+            raise HTTPException(status_code=404, detail=f"Unknown session id: {session_id}")
+    return Response(status_code=204)
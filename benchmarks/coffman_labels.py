@@ -0,0 +1,64 @@
+"""
+Сравнение разметки Coffman–Graham: прежняя очередь с сортировкой на каждом
+шаге против кучи из coffman.coffman_graham_labels.
+
+    python -m benchmarks.coffman_labels --sizes 1000 10000 100000 1000000
+"""
+import argparse
+import time
+
+from benchmarks.generators import layered
+from coffman import coffman_graham_labels
+from common import Graph, build_graph
+
+
+def legacy_compute_labels(graph: Graph):
+    """Разметка в том виде, в каком она была до кучи: sort() готовой очереди на каждом шаге."""
+    ids = graph.ids
+    n = len(ids)
+    in_degree = graph.in_degrees()
+    queue = [i for i in range(n) if in_degree[i] == 0]
+    labels = [0] * n
+    step = 1
+    while queue:
+        queue.sort(key=lambda i: ids[i], reverse=True)
+        t = queue.pop()
+        labels[t] = step
+        step += 1
+        for v in graph.successors(t):
+            in_degree[v] -= 1
+            if in_degree[v] == 0:
+                queue.append(v)
+    return labels
+
+
+def wide_dag(n: int, width: int, seed: int = 0) -> Graph:
+    """Слои по width задач, каждая задача зависит от двух случайных задач предыдущего слоя."""
+    precedence, _ = layered(n, seed=seed, width=width, fan_in=2, max_duration=1)
+    return build_graph(precedence)
+
+
+def measure(fn, graph: Graph) -> float:
+    start = time.perf_counter()
+    fn(graph)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--width", type=int, default=5000, help="ширина слоя (число одновременно готовых задач)")
+    parser.add_argument("--legacy-limit", type=int, default=20000,
+                        help="старую версию не запускаем на графах больше этого размера")
+    args = parser.parse_args()
+
+    print(f"{'n':>10} {'legacy, s':>12} {'heap, s':>10}")
+    for n in args.sizes:
+        graph = wide_dag(n, min(args.width, n))
+        heap_time = measure(coffman_graham_labels, graph)
+        legacy = f"{measure(legacy_compute_labels, graph):12.3f}" if n <= args.legacy_limit else f"{'-':>12}"
+        print(f"{n:>10} {legacy} {heap_time:10.3f}")
+
+
+if __name__ == "__main__":
+    main()
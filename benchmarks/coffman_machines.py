@@ -0,0 +1,77 @@
+"""
+Выбор машины в Coffman–Graham: прежний просмотр всех m машин на задачу
+против дерева минимумов из coffman.coffman_graham_result.
+
+    python -m benchmarks.coffman_machines --n 20000 --machines 2 8 64 512 4096
+
+Обе версии считают метки и собирают ScheduleResult одинаково, различается только назначение.
+"""
+import argparse
+import time
+from array import array
+
+from benchmarks.generators import layered
+from coffman import coffman_graham_labels, coffman_graham_result
+from common import Graph, ScheduleResult, build_graph
+
+
+def legacy_result(graph: Graph, durations, m: int) -> ScheduleResult:
+    """Coffman–Graham с назначением в том виде, в каком оно было до дерева: O(m) на задачу."""
+    n = len(graph)
+    predecessors = graph.predecessors
+    labels = coffman_graham_labels(graph)
+    ordered_tasks = sorted(range(n), key=lambda i: -labels[i])
+    machine_end_times = [0] * m
+    task_start = array("q", [0]) * n
+    task_end = array("q", [0]) * n
+    task_machine = array("q", [0]) * n
+    for t in ordered_tasks:
+        earliest_start = 0
+        for pred_task in predecessors(t):
+            if task_end[pred_task] > earliest_start:
+                earliest_start = task_end[pred_task]
+        best_machine = 0
+        best_start = max(machine_end_times[0], earliest_start)
+        for i in range(1, m):
+            available_time = max(machine_end_times[i], earliest_start)
+            if available_time < best_start:
+                best_start = available_time
+                best_machine = i
+        task_start[t] = best_start
+        task_end[t] = best_start + durations[t]
+        task_machine[t] = best_machine
+        machine_end_times[best_machine] = task_end[t]
+    return ScheduleResult.from_arrays(graph.ids, m, task_start, task_end, task_machine)
+
+
+def measure(fn, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=20000)
+    parser.add_argument("--machines", type=int, nargs="+", default=[2 ** k for k in range(1, 13)])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    precedence, durations = layered(args.n, seed=args.seed)
+    graph = build_graph(precedence)
+    ordered = [durations[i] for i in graph.ids]
+
+    print(f"{'m':>6} {'legacy, s':>10} {'tree, s':>10} {'makespan':>10}")
+    for m in args.machines:
+        legacy, expected = measure(lambda: legacy_result(graph, ordered, m), args.repeat)
+        tree, result = measure(lambda: coffman_graham_result(graph, ordered, m), args.repeat)
+        same = result.to_raw() == expected.to_raw()
+        print(f"{m:>6} {legacy:10.3f} {tree:10.3f} {result.makespan:>10} {'' if same else 'РАСХОЖДЕНИЕ'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Генераторы синтетических DAG для бенчмарков.
+Каждый генератор возвращает (precedence, durations):
+  precedence[u] — множество v, таких что u → v (все вершины 0..n-1 есть среди ключей)
+  durations[i]  — длительность задачи i
+"""
+import random
+from typing import Callable, Dict, List, Set, Tuple
+
+Workload = Tuple[Dict[int, Set[int]], List[int]]
+
+
+def _durations(n: int, rnd: random.Random, max_duration: int) -> List[int]:
+    if max_duration <= 1:
+        return [1] * n
+    return [rnd.randint(1, max_duration) for _ in range(n)]
+
+
+def layered(n: int, seed: int = 0, width: int = 0, fan_in: int = 2, max_duration: int = 10) -> Workload:
+    """Слои по width задач, каждая задача зависит от fan_in случайных задач предыдущего слоя."""
+    rnd = random.Random(seed)
+    width = width or max(1, int(n ** 0.5))
+    precedence = {i: set() for i in range(n)}
+    for v in range(width, n):
+        layer_start = (v // width - 1) * width
+        for _ in range(fan_in):
+            precedence[layer_start + rnd.randrange(width)].add(v)
+    return precedence, _durations(n, rnd, max_duration)
+
+
+def erdos(n: int, seed: int = 0, degree: float = 3.0, max_duration: int = 10) -> Workload:
+    """Случайный DAG Эрдёша–Реньи: ребро i → j (i < j), в среднем degree исходящих рёбер на вершину."""
+    rnd = random.Random(seed)
+    precedence = {i: set() for i in range(n)}
+    if n > 1:
+        for _ in range(int(n * degree)):
+            i, j = rnd.randrange(n), rnd.randrange(n)
+            if i != j:
+                precedence[min(i, j)].add(max(i, j))
+    return precedence, _durations(n, rnd, max_duration)
+
+
+def fork_join(n: int, seed: int = 0, branches: int = 8, max_duration: int = 10) -> Workload:
+    """Повторяющиеся блоки: fork-вершина, branches параллельных цепочек, join-вершина."""
+    rnd = random.Random(seed)
+    precedence = {i: set() for i in range(n)}
+    block = branches + 2
+    for start in range(0, n, block):
+        fork, join = start, min(start + block - 1, n - 1)
+        for v in range(fork + 1, join):
+            precedence[fork].add(v)
+            precedence[v].add(join)
+        if join + 1 < n:
+            precedence[join].add(join + 1)
+    return precedence, _durations(n, rnd, max_duration)
+
+
+def chain(n: int, seed: int = 0, max_duration: int = 10) -> Workload:
+    """Одна длинная цепочка 0 → 1 → ... → n-1."""
+    rnd = random.Random(seed)
+    precedence = {i: {i + 1} for i in range(n - 1)}
+    precedence[n - 1] = set()
+    return precedence, _durations(n, rnd, max_duration)
+
+
+def fan_out(n: int, seed: int = 0, max_duration: int = 10) -> Workload:
+    """Один корень, от которого зависят все остальные задачи."""
+    rnd = random.Random(seed)
+    precedence = {i: set() for i in range(n)}
+    precedence[0] = set(range(1, n))
+    return precedence, _durations(n, rnd, max_duration)
+
+
+def pipelines(n: int, seed: int = 0, count: int = 16, max_duration: int = 10) -> Workload:
+    """count независимых layered-конвейеров, склеенных в один запрос."""
+    rnd = random.Random(seed)
+    precedence = {i: set() for i in range(n)}
+    size = max(1, n // count)
+    for base in range(0, n, size):
+        part, _ = layered(min(size, n - base), seed=rnd.randrange(2**32))
+        for u, vs in part.items():
+            precedence[base + u] = {base + v for v in vs}
+    return precedence, _durations(n, rnd, max_duration)
+
+
+GENERATORS: Dict[str, Callable[..., Workload]] = {
+    "layered": layered,
+    "erdos": erdos,
+    "fork_join": fork_join,
+    "chain": chain,
+    "fan_out": fan_out,
+    "pipelines": pipelines,
+}
@@ -0,0 +1,339 @@
+"""
+Бенчмарк планировщиков на синтетических DAG.
+
+    python -m benchmarks.run --sizes 100 1000 10000 100000 --output bench.json
+    python -m benchmarks.run --sizes 100 1000 10000 --compare bench.json
+
+Для каждой пары (алгоритм, генератор) и каждого размера меряется время,
+пиковая память (tracemalloc, отдельным прогоном) и показатель роста:
+наклон log(time) от log(n) по методу наименьших квадратов.
+Результаты сохраняются в JSON, --compare сравнивает с прошлым прогоном.
+--verify проверяет расписания планировщиков (verify.verify_schedule) и пишет
+в результаты время проверки и загрузку машин; нарушение — код выхода 1.
+"""
+import argparse
+import gc
+import json
+import math
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from array import array
+from itertools import accumulate, chain
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.generators import GENERATORS
+from coffman import coffman_graham
+from common import ScheduleResult, Task, build_graph
+from fujii import fujii_scheduler
+from gabow import gabow_scc
+from reach import transitive_reduction
+from registry import run_result
+from sethi import sethi_ulman_schedule
+from verify import verify_schedule
+
+
+def _tasks(durations):
+    return {i: Task(i, d) for i, d in enumerate(durations)}
+
+
+def _build_graph(precedence, durations, m):
+    return lambda: build_graph(precedence)
+
+
+def _coffman(precedence, durations, m):
+    tasks = _tasks(durations)
+    graph = build_graph(precedence, tasks)
+    return lambda: coffman_graham(tasks, graph, m)
+
+
+def _fujii(precedence, durations, m):
+    tasks = _tasks(durations)
+    graph = build_graph(precedence, tasks)
+    return lambda: fujii_scheduler(tasks, graph, m)
+
+
+def _fkn(precedence, durations, m):
+    # FKN определён для двух машин и равных длительностей: длительности из генератора не используются
+    tasks = _tasks([1] * len(durations))
+    graph = build_graph(precedence, tasks)
+    return lambda: fujii_scheduler(tasks, graph, 2, mode="matching")
+
+
+def _coffman_split(precedence, durations, m):
+    # Компоненты по очереди в этом процессе: накладные расходы разбиения и упаковки без выигрыша от пула
+    from components import schedule_components
+    graph = build_graph(precedence)
+    ordered = [durations[i] for i in graph.ids]
+    return lambda: schedule_components("coffman", graph, ordered, m)
+
+
+def _sethi(precedence, durations, m):
+    graph = build_graph(precedence)
+    return lambda: sethi_ulman_schedule(graph)
+
+
+def _reduce(precedence, durations, m):
+    graph = build_graph(precedence)
+    return lambda: transitive_reduction(graph)
+
+
+def _gabow(precedence, durations, m):
+    graph = build_graph(precedence)
+    return lambda: gabow_scc(graph)
+
+
+def _api_coffman(precedence, durations, m, fmt="model", reduce=False):
+    # Обработчик вызывается в процессе, без HTTP: парсинг pydantic + алгоритм + сборка ответа
+    from fastapi.encoders import jsonable_encoder
+    from api import ScheduleRequest, cache, schedule_coffman
+
+    preds = {i: [] for i in range(len(durations))}
+    for u, vs in precedence.items():
+        for v in vs:
+            preds[v].append(u)
+    payload = {
+        "tasks": [{"id": i, "duration": d, "predecessors": preds[i]} for i, d in enumerate(durations)],
+        "machines": m,
+    }
+
+    def run():
+        cache.clear()
+        # Без HTTP умолчания Query не подставляются: флаги передаются явно
+        response = schedule_coffman(ScheduleRequest.model_validate(payload), fmt, split=False, reduce=reduce)
+        if fmt == "model":
+            # Так модель ответа сериализует FastAPI; fmt="json" уже вернул готовые байты
+            json.dumps(jsonable_encoder(response))
+        return response
+    return run
+
+
+def _api_coffman_json(precedence, durations, m):
+    return _api_coffman(precedence, durations, m, fmt="json")
+
+
+def _api_coffman_reduce(precedence, durations, m):
+    return _api_coffman(precedence, durations, m, reduce=True)
+
+
+CASES: Dict[str, Callable] = {
+    "build_graph": _build_graph,
+    "coffman": _coffman,
+    "coffman_split": _coffman_split,
+    "fujii": _fujii,
+    "fkn": _fkn,
+    "sethi": _sethi,
+    "gabow": _gabow,
+    "reduce": _reduce,
+    "api_coffman": _api_coffman,
+    "api_coffman_json": _api_coffman_json,
+    "api_coffman_reduce": _api_coffman_reduce,
+}
+
+
+def _schedule(name: str, split: bool = False, unit: bool = False, machines: Optional[int] = None):
+    # Тот же планировщик, что и в случае бенчмарка, но в колонках ScheduleResult для verify_schedule
+    def build(precedence, durations, m):
+        from components import schedule_components
+        graph = build_graph(precedence)
+        ordered = array("q", [1 if unit else durations[i] for i in graph.ids])
+        m = machines or m
+        if split:
+            return graph, ordered, schedule_components(name, graph, ordered, m)
+        return graph, ordered, run_result(name, graph, ordered, m)
+    return build
+
+
+def _api_schedule(fmt: str = "model", reduce: bool = False):
+    # Проверяется сам ответ обработчика: строки расписания из JSON ответа в колонки ScheduleResult
+    def build(precedence, durations, m):
+        from fastapi.encoders import jsonable_encoder
+        response = _api_coffman(precedence, durations, m, fmt, reduce)()
+        body = json.loads(response.body) if fmt == "json" else jsonable_encoder(response)
+        graph = build_graph(precedence)
+        ordered = array("q", [durations[i] for i in graph.ids])
+        rows = body["schedule"]
+        flat = list(chain.from_iterable(rows))
+        schedule = ScheduleResult(graph.ids, len(rows),
+                                  array("q", [graph.index[row["id"]] for row in flat]),
+                                  array("q", [row["start_time"] for row in flat]),
+                                  array("q", [row["end_time"] for row in flat]),
+                                  array("q", [row["machine"] for row in flat]),
+                                  array("q", accumulate(chain((0,), map(len, rows)))))
+        return graph, ordered, schedule
+    return build
+
+
+# Случаи, чьё расписание проверяет --verify
+VERIFIED: Dict[str, Callable] = {
+    "coffman": _schedule("coffman"),
+    "coffman_split": _schedule("coffman", split=True),
+    "fujii": _schedule("fujii"),
+    "fkn": _schedule("fkn", unit=True, machines=2),
+    "api_coffman": _api_schedule(),
+    "api_coffman_json": _api_schedule("json"),
+    "api_coffman_reduce": _api_schedule(reduce=True),
+}
+
+
+def measure_time(run: Callable, repeat: int) -> float:
+    best = math.inf
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure_memory(run: Callable) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def scaling_exponent(points: List[tuple]) -> Optional[float]:
+    """Наклон прямой log(time) = k·log(n) + b по точкам (n, time)."""
+    points = [(math.log(n), math.log(t)) for n, t in points if n > 0 and t > 0]
+    if len(points) < 2:
+        return None
+    mx = sum(x for x, _ in points) / len(points)
+    my = sum(y for _, y in points) / len(points)
+    var = sum((x - mx) ** 2 for x, _ in points)
+    if var == 0:
+        return None
+    return sum((x - mx) * (y - my) for x, y in points) / var
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(algorithms, generators, sizes, machines=2, repeat=1, memory=False,
+              budget=30.0, seed=0, verify=False) -> dict:
+    results = []
+    invalid = []
+    scaling = {}
+    for algorithm in algorithms:
+        for generator in generators:
+            points = []
+            for n in sorted(sizes):
+                precedence, durations = GENERATORS[generator](n, seed=seed)
+                run = CASES[algorithm](precedence, durations, machines)
+                elapsed = measure_time(run, repeat)
+                peak = measure_memory(run) if memory else None
+                edges = sum(len(vs) for vs in precedence.values())
+                checked = None
+                if verify and algorithm in VERIFIED:
+                    graph, ordered, schedule = VERIFIED[algorithm](precedence, durations, machines)
+                    started = time.perf_counter()
+                    checked = verify_schedule(graph, ordered, schedule)
+                    checked_time = time.perf_counter() - started
+                    if checked.errors:
+                        invalid.append(f"{algorithm}/{generator} n={n}: {checked.errors[0]}")
+                results.append({
+                    "algorithm": algorithm,
+                    "generator": generator,
+                    "n": n,
+                    "edges": edges,
+                    "machines": machines,
+                    "time": elapsed,
+                    "peak_memory": peak,
+                    "verify_time": checked_time if checked else None,
+                    "utilization": checked.total_utilization if checked else None,
+                    "valid": checked.ok if checked else None,
+                })
+                points.append((n, elapsed))
+                mem = f"{peak / 2**20:9.1f} MiB" if peak is not None else ""
+                ok = f" verify {checked_time:.4f} s {'ok' if checked.ok else 'INVALID'}" if checked else ""
+                print(f"{algorithm:>12} {generator:>10} n={n:<8} e={edges:<9} {elapsed:9.4f} s {mem}{ok}",
+                      file=sys.stderr)
+                # Дальше только дольше — не тратим время на заведомо медленные размеры
+                if elapsed > budget:
+                    break
+            scaling[f"{algorithm}/{generator}"] = scaling_exponent(points)
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.time(),
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "results": results,
+        "scaling": scaling,
+        "invalid": invalid,
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Строки отчёта о замедлениях относительно baseline больше чем в (1 + tolerance) раз."""
+    old = {(r["algorithm"], r["generator"], r["n"]): r for r in baseline["results"]}
+    regressions = []
+    for r in current["results"]:
+        prev = old.get((r["algorithm"], r["generator"], r["n"]))
+        if prev is None or prev["time"] <= 0:
+            continue
+        ratio = r["time"] / prev["time"]
+        line = f"{r['algorithm']:>12} {r['generator']:>10} n={r['n']:<8} {prev['time']:9.4f} → {r['time']:9.4f} s  ×{ratio:.2f}"
+        print(line)
+        if ratio > 1 + tolerance:
+            regressions.append(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--algorithms", nargs="+", default=list(CASES), choices=list(CASES))
+    parser.add_argument("--generators", nargs="+", default=list(GENERATORS), choices=list(GENERATORS))
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--machines", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--memory", action="store_true", help="мерить пиковую память (отдельный прогон)")
+    parser.add_argument("--budget", type=float, default=30.0,
+                        help="после прогона дольше budget секунд большие размеры пропускаются")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verify", action="store_true", help="проверить расписания планировщиков")
+    parser.add_argument("--output", help="куда сохранить JSON с результатами")
+    parser.add_argument("--compare", help="JSON прошлого прогона для сравнения")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="допустимое замедление при --compare")
+    args = parser.parse_args()
+
+    report = run_suite(args.algorithms, args.generators, args.sizes, args.machines,
+                       args.repeat, args.memory, args.budget, args.seed, args.verify)
+
+    for key, exponent in report["scaling"].items():
+        if exponent is not None:
+            print(f"{key:>24}  O(n^{exponent:.2f})")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    for line in report["invalid"]:
+        print(f"Неверное расписание: {line}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print(f"Замедлений: {len(regressions)}")
+            sys.exit(1)
+    if report["invalid"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
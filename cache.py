@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+
+def canonical_key(tasks: Iterable[Tuple[int, int, Sequence[int]]], machines: int, algorithm: str) -> str:
+    """
+    Хеш задачи планирования, не зависящий от порядка задач и предшественников.
+    tasks — тройки (id, duration, predecessors).
+    """
+    canonical = sorted((task_id, duration, sorted(set(preds))) for task_id, duration, preds in tasks)
+    payload = json.dumps([algorithm, machines, canonical], separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def binary_key(data: bytes, machines: Optional[int], algorithm: str) -> str:
+    """Хеш задачи в двоичном формате graphio: по байтам файла, без разбора."""
+    digest = hashlib.sha256(f"{algorithm}:{machines}:".encode())
+    digest.update(data)
+    return "bin-" + digest.hexdigest()
+
+
+def graph_key(graph_id: str, machines: int, algorithm: str, durations: Dict[int, int]) -> str:
+    """Хеш расписания графа из graphstore: id графа, машины и переопределённые длительности."""
+    payload = json.dumps([algorithm, machines, sorted(durations.items())], separators=(",", ":"))
+    return "graph-" + hashlib.sha256(f"{graph_id}:{payload}".encode()).hexdigest()
+
+
+def stream_hasher(kind: str, machines: Optional[int], algorithm: str):
+    """
+    Хеш тела запроса, которое приходит кусками: update() на каждый кусок,
+    ключ — kind + "-" + hexdigest(). Зависит от порядка строк, в отличие от canonical_key.
+    """
+    return hashlib.sha256(f"{kind}:{algorithm}:{machines}:".encode())
+
+
+class ScheduleCache:
+    """
+    LRU-кэш расписаний по canonical_key.
+    Память ограничена числом записей и суммарным размером (в байтах JSON);
+    если задан directory, записи дублируются на диск и переживают перезапуск.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 * 2**20,
+                 directory: Optional[str] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self._entries: "OrderedDict[str, Tuple[Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+        data = self._read_disk(key)
+        with self._lock:
+            if data is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            value = json.loads(data)
+            self._insert(key, value, len(data))
+            return value
+
+    def put(self, key: str, value: Any) -> None:
+        data = json.dumps(value, separators=(",", ":")).encode()
+        with self._lock:
+            self._insert(key, value, len(data))
+        self._write_disk(key, data)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _insert(self, key: str, value: Any, size: int) -> None:
+        if size > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old[1]
+        self._entries[key] = (value, size)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._bytes -= evicted
+            self.evictions += 1
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + ".json")
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write_disk(self, key: str, data: bytes) -> None:
+        if not self.directory:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Через временный файл и os.replace, чтобы параллельный читатель не увидел половину записи
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
@@ -1,82 +1,158 @@
+from array import array
 from collections import defaultdict, deque
 import heapq
-from typing import List
+from typing import Callable, Iterable, List, MutableSequence, Optional, Sequence
 
-from common import Task, get_graph
+import profiling
+from common import Graph, ScheduleResult, Task, as_graph, durations_of
 
-def coffman_graham(tasks: List[Task], precedence, m=2):
+INFINITY = float("inf")
+
+
+def coffman_graham_labels(graph: Graph) -> List[int]:
     """
-    Реализация алгоритма Coffman-Graham.
-    tasks: dict[int, Task] — задачи
-    precedence: dict[int, set[int]] — предшествование (ребро i -> j: i предшествует j)
-    m: число машин
+    Метки Coffman–Graham по плотным индексам графа.
+    Метку 1 получает сток; дальше среди задач, у которых помечены все потомки,
+    выбирается задача с лексикографически наименьшей убывающей
+    последовательностью меток потомков (при равенстве — с меньшим id).
+
+    Метки выдаются по возрастанию, поэтому список меток потомка растёт
+    добавлением в конец и уже отсортирован: ключ задачи — этот список
+    в обратном порядке, без сортировки. Готовые задачи лежат в куче,
+    итого O((n + e) log n).
     """
-    
-    succ, pred = get_graph(precedence)
-    for t in tasks:
-        succ.setdefault(t, set())
-        pred.setdefault(t, set())
-        
-    # dычисляем топологическую сортировку с присвоением меток
-    def compute_labels():
-        in_degree = {t: len(pred[t]) for t in tasks}
-        queue = [t for t in tasks if in_degree[t] == 0]
-        labels = dict()
-        step = 1
-        while queue:
-            queue.sort(reverse=True) 
-            t = queue.pop()
-            labels[t] = step
-            step += 1
-            for v in succ[t]:
-                in_degree[v] -= 1
-                if in_degree[v] == 0:
-                    queue.append(v)
-        return labels
-
-    labels = compute_labels()
-
-    # сортировка задач по возрастанию меток
-    ordered_tasks = sorted(tasks.keys(), key=lambda x: (labels[x], x))
-
-    # расписание на машины
-    machine_end_times = [0] * m
-    machine_schedules = [[] for _ in range(m)]
-
-    task_start = {}
-    task_end = {}
+    ids = graph.ids
+    n = len(ids)
+    successors = graph.successors
+    predecessors = graph.predecessors
 
-    for t in ordered_tasks:
-        task_obj = tasks[t]
+    remaining = graph.out_degrees()
+    succ_labels = [None] * n
+    heap = [((), ids[i], i) for i in range(n) if remaining[i] == 0]
+    heapq.heapify(heap)
+    sinks = len(heap)
+
+    labels = [0] * n
+    step = 0
+    while heap:
+        _, _, t = heapq.heappop(heap)
+        step += 1
+        labels[t] = step
+        for u in predecessors(t):
+            collected = succ_labels[u]
+            if collected is None:
+                collected = succ_labels[u] = []
+            collected.append(step)
+            remaining[u] -= 1
+            if remaining[u] == 0:
+                collected.reverse()
+                heapq.heappush(heap, (tuple(collected), ids[u], u))
+                succ_labels[u] = None
+
+    if step < n:
+        raise ValueError("Граф содержит цикл!")
+    profile = profiling.active()
+    if profile is not None:
+        # Каждая задача снимается с кучи один раз, кладётся — если не была стоком
+        profile.add("coffman.heap_ops", 2 * step - sinks)
+    return labels
+
+
+def coffman_graham_result(graph: Graph, durations: Sequence[int], m: int = 2,
+                          frontiers: Optional[List[array]] = None) -> ScheduleResult:
+    """
+    Coffman–Graham по плотным индексам: durations[i] — длительность задачи i.
+    Task-объекты не создаются и не меняются, результат — колонки ScheduleResult.
+    frontiers не нужны (метки строятся своей кучей от стоков) и принимаются для сигнатуры реестра.
+    """
+    if m < 1:
+        raise ValueError("No solution: at least one machine is required")
+    n = len(graph)
+    predecessors = graph.predecessors
+
+    with profiling.phase("coffman.labels"):
+        labels = coffman_graham_labels(graph)
 
+    with profiling.phase("coffman.assign"):
+        # сортировка задач по убыванию меток: предки всегда помечены старше потомков
+        ordered_tasks = sorted(range(n), key=lambda i: -labels[i])
+        task_start = array("q", [0]) * n
+        task_end = array("q", [0]) * n
+        task_machine = array("q", [0]) * n
+        assign_in_order(ordered_tasks, durations, predecessors, m, task_start, task_end, task_machine)
+
+    return ScheduleResult.from_arrays(graph.ids, m, task_start, task_end, task_machine)
+
+
+def assign_in_order(ordered_tasks: Iterable[int], durations: Sequence[int],
+                    predecessors: Callable[[int], Iterable[int]], m: int,
+                    task_start: MutableSequence[int], task_end: MutableSequence[int],
+                    task_machine: MutableSequence[int], free: Optional[Sequence[int]] = None) -> None:
+    """
+    Назначение Coffman–Graham: задачи по очереди из ordered_tasks (предки раньше потомков)
+    на машину, где max(освобождение, конец предков) меньше всего, при равенстве — с меньшим номером.
+    free — моменты освобождения машин перед первой задачей (продолжение с середины очереди),
+    по умолчанию все свободны с нуля. task_start, task_end, task_machine меняются на месте.
+    """
+    # Машины — листья дерева минимумов по времени освобождения: tree[size + i] — машина i,
+    # tree[k] = min(tree[2k], tree[2k + 1]), лишние листья заняты навсегда.
+    # Выбор машины и обновление — O(log m) вместо просмотра всех m машин
+    size = 1
+    while size < m:
+        size *= 2
+    tree = [0] * (2 * size)
+    if free is not None:
+        tree[size:size + m] = free
+    for leaf in range(size + m, 2 * size):
+        tree[leaf] = INFINITY
+    for node in range(size - 1, 0, -1):
+        tree[node] = min(tree[2 * node], tree[2 * node + 1])
+
+    for t in ordered_tasks:
         # Все предшественники должны быть завершены
         earliest_start = 0
-        for pred_task in pred[t]:
-            earliest_start = max(earliest_start, task_end[pred_task])
-
-        # Найти первую машину, доступную не ранее earliest_start
-        best_machine = None
-        best_start = float('inf')
-        for i in range(m):
-            available_time = max(machine_end_times[i], earliest_start)
-            if available_time < best_start:
-                best_start = available_time
-                best_machine = i
-        if best_machine is None:
-            print("No solution")
-            return []
-        
+        for pred_task in predecessors(t):
+            if task_end[pred_task] > earliest_start:
+                earliest_start = task_end[pred_task]
+
+        # Машина с наименьшим max(освобождение, earliest_start), при равенстве — с меньшим номером:
+        # самая левая из свободных к earliest_start, а если таких нет — самая левая из освобождающихся раньше всех
+        threshold = tree[1] if tree[1] > earliest_start else earliest_start
+        node = 1
+        while node < size:
+            node *= 2
+            if tree[node] > threshold:
+                node += 1
+        best_machine = node - size
+        best_start = tree[node] if tree[node] > earliest_start else earliest_start
+
         # Назначить задачу
-        task_obj.start_time = best_start
-        task_obj.end_time = best_start + task_obj.duration
-        task_obj.machine = best_machine
+        finish = best_start + durations[t]
+        task_start[t] = best_start
+        task_end[t] = finish
+        task_machine[t] = best_machine
+        tree[node] = finish
+        node //= 2
+        while node:
+            left = tree[2 * node]
+            right = tree[2 * node + 1]
+            tree[node] = left if left < right else right
+            node //= 2
 
-        task_start[t] = task_obj.start_time
-        task_end[t] = task_obj.end_time
-        machine_end_times[best_machine] = task_obj.end_time
-        machine_schedules[best_machine].append(task_obj)
 
-    return machine_schedules
+def coffman_graham(tasks: List[Task], precedence, m=2):
+    """
+    Реализация алгоритма Coffman-Graham.
+    tasks: dict[int, Task] — задачи
+    precedence: dict[int, set[int]] или common.Graph — предшествование (ребро i -> j: i предшествует j)
+    m: число машин
+    """
+    if m < 1:
+        print("No solution")
+        return []
+    graph = as_graph(precedence, tasks)
+    result = coffman_graham_result(graph, durations_of(tasks, graph), m)
+    return result.apply(tasks)
 
 # Пример использования
 if __name__ == "__main__":
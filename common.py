@@ -1,7 +1,15 @@
-from collections import defaultdict, deque
-from typing import Dict, Set, Tuple
+import operator
+from array import array
+from collections import Counter, defaultdict, deque
+from itertools import accumulate, chain, repeat
+from typing import Dict, Hashable, Iterable, Set, Tuple
+
+import profiling
+
 
 class Task:
+    __slots__ = ("id", "duration", "start_time", "end_time", "machine")
+
     def __init__(self, id, duration: int = 1):
         self.id = id
         self.duration = duration
@@ -10,6 +18,273 @@ class Task:
         self.machine = None
 
 
+class ScheduleResult:
+    """
+    Расписание в виде параллельных колонок вместо атрибутов на Task.
+    Строки упорядочены по машине, внутри машины — по времени старта:
+      task[k]    — плотный индекс задачи (id — ids[task[k]])
+      start[k], end[k], machine[k]
+    Строки машины i — срез machine_offsets[i]:machine_offsets[i + 1].
+    """
+    __slots__ = ("ids", "m", "task", "start", "end", "machine", "machine_offsets")
+
+    def __init__(self, ids, m, task, start, end, machine, machine_offsets):
+        self.ids = ids
+        self.m = m
+        self.task = task
+        self.start = start
+        self.end = end
+        self.machine = machine
+        self.machine_offsets = machine_offsets
+
+    @classmethod
+    def from_arrays(cls, ids, m: int, start, end, machine) -> "ScheduleResult":
+        """Собрать из массивов, индексированных задачами (start[i], end[i], machine[i])."""
+        order = sorted(range(len(ids)), key=lambda i: (machine[i], start[i]))
+        counts = Counter(machine)
+        offsets = array("q", accumulate(chain((0,), map(counts.__getitem__, range(m)))))
+        return cls(ids, m,
+                   array("q", order),
+                   array("q", map(start.__getitem__, order)),
+                   array("q", map(end.__getitem__, order)),
+                   array("q", map(machine.__getitem__, order)),
+                   offsets)
+
+    def __len__(self) -> int:
+        return len(self.task)
+
+    @property
+    def makespan(self) -> int:
+        return max(self.end, default=0)
+
+    def machine_slice(self, i: int) -> slice:
+        return slice(self.machine_offsets[i], self.machine_offsets[i + 1])
+
+    def machine_rows(self, i: int):
+        """Строки (id, start, end, machine) машины i по возрастанию старта."""
+        ids, task, start, end = self.ids, self.task, self.start, self.end
+        for k in range(self.machine_offsets[i], self.machine_offsets[i + 1]):
+            yield ids[task[k]], start[k], end[k], i
+
+    def to_raw(self):
+        """По машинам списки кортежей (id, start_time, end_time, machine)."""
+        return [list(self.machine_rows(i)) for i in range(self.m)]
+
+    def apply(self, tasks):
+        """
+        Совместимость со старым интерфейсом: записать start_time/end_time/machine
+        в Task-объекты и вернуть расписание списками задач по машинам.
+        """
+        schedules = [[] for _ in range(self.m)]
+        for i in range(self.m):
+            machine_tasks = schedules[i]
+            for node, start, end, _ in self.machine_rows(i):
+                task = tasks[node]
+                task.start_time = start
+                task.end_time = end
+                task.machine = i
+                machine_tasks.append(task)
+        return schedules
+
+
+class Graph:
+    """
+    Неизменяемый граф предшествования в CSR-формате.
+      ids[i]    — исходный идентификатор вершины с плотным индексом i
+      index[id] — обратное отображение id → i
+      succ_indices[succ_offsets[i]:succ_offsets[i + 1]] — потомки вершины i
+      pred_indices[pred_offsets[i]:pred_offsets[i + 1]] — предки вершины i
+    Все алгоритмы работают с плотными индексами, id нужны только на входе и выходе.
+    """
+    __slots__ = ("ids", "index", "succ_offsets", "succ_indices", "pred_offsets", "pred_indices")
+
+    def __init__(self, ids, index, succ_offsets, succ_indices, pred_offsets, pred_indices):
+        set_ = object.__setattr__
+        set_(self, "ids", ids)
+        set_(self, "index", index)
+        set_(self, "succ_offsets", succ_offsets)
+        set_(self, "succ_indices", succ_indices)
+        set_(self, "pred_offsets", pred_offsets)
+        set_(self, "pred_indices", pred_indices)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Graph is immutable")
+
+    def __reduce__(self):
+        # Для пула процессов: слоты нельзя восстановить через запрещённый __setattr__
+        return Graph, (self.ids, self.index, self.succ_offsets, self.succ_indices,
+                       self.pred_offsets, self.pred_indices)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __repr__(self) -> str:
+        return f"Graph(n={len(self)}, e={self.edge_count})"
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.succ_indices)
+
+    def successors(self, i: int):
+        return self.succ_indices[self.succ_offsets[i]:self.succ_offsets[i + 1]]
+
+    def predecessors(self, i: int):
+        return self.pred_indices[self.pred_offsets[i]:self.pred_offsets[i + 1]]
+
+    def out_degree(self, i: int) -> int:
+        return self.succ_offsets[i + 1] - self.succ_offsets[i]
+
+    def in_degree(self, i: int) -> int:
+        return self.pred_offsets[i + 1] - self.pred_offsets[i]
+
+    def in_degrees(self) -> array:
+        offsets = self.pred_offsets
+        return array("q", [offsets[i + 1] - offsets[i] for i in range(len(self.ids))])
+
+    def out_degrees(self) -> array:
+        offsets = self.succ_offsets
+        return array("q", [offsets[i + 1] - offsets[i] for i in range(len(self.ids))])
+
+    def reverse(self) -> "Graph":
+        """Граф с обращёнными рёбрами; массивы общие, копирования нет."""
+        return Graph(self.ids, self.index,
+                     self.pred_offsets, self.pred_indices,
+                     self.succ_offsets, self.succ_indices)
+
+    def with_nodes(self, nodes: Iterable[Hashable]) -> "Graph":
+        """
+        Вернуть граф, в котором есть все вершины из nodes.
+        Недостающие добавляются изолированными в конец, существующий граф не меняется.
+        """
+        missing = [v for v in dict.fromkeys(nodes) if v not in self.index]
+        if not missing:
+            return self
+        ids = list(self.ids) + missing
+        index = dict(self.index)
+        for v in missing:
+            index[v] = len(index)
+        tail_s = array("q", [self.succ_offsets[-1]]) * len(missing)
+        tail_p = array("q", [self.pred_offsets[-1]]) * len(missing)
+        return Graph(ids, index,
+                     array("q", self.succ_offsets) + tail_s, self.succ_indices,
+                     array("q", self.pred_offsets) + tail_p, self.pred_indices)
+
+    def to_dicts(self) -> Tuple[Dict[int, Set[int]], Dict[int, Set[int]]]:
+        """Обратная совместимость: та же пара словарей, что и у get_graph."""
+        ids = self.ids
+        successors = {ids[i]: {ids[j] for j in self.successors(i)} for i in range(len(ids))}
+        predecessors = {ids[i]: {ids[j] for j in self.predecessors(i)} for i in range(len(ids))}
+        return successors, predecessors
+
+
+class GraphBuilder:
+    """
+    Однопроходная сборка Graph: вершины и рёбра складываются в плоские массивы,
+    CSR строится подсчётом за O(n + e). Повторные рёбра отбрасываются.
+    """
+
+    def __init__(self):
+        self.ids = []
+        self.index = {}
+        self._src = array("q")
+        self._dst = array("q")
+        # True, если вызывающий гарантирует отсутствие повторных рёбер
+        self._unique = False
+
+    def add_node(self, node: Hashable) -> int:
+        i = self.index.get(node)
+        if i is None:
+            i = self.index[node] = len(self.ids)
+            self.ids.append(node)
+        return i
+
+    def add_edge(self, u: Hashable, v: Hashable) -> None:
+        self._src.append(self.add_node(u))
+        self._dst.append(self.add_node(v))
+
+    def add_edge_index(self, ui: int, vi: int) -> None:
+        self._src.append(ui)
+        self._dst.append(vi)
+
+    def build(self) -> Graph:
+        n = len(self.ids)
+        with profiling.phase("graph.csr"):
+            succ_offsets, succ_indices = _csr(n, self._src, self._dst, dedup=not self._unique)
+            # Предки получаются подсчётом по уже очищенным от дублей рёбрам
+            pred_offsets, pred_indices = transpose(n, succ_offsets, succ_indices)
+        return Graph(self.ids, self.index, succ_offsets, succ_indices, pred_offsets, pred_indices)
+
+
+def transpose(n: int, offsets, indices) -> Tuple[array, array]:
+    """CSR обратных рёбер за O(n + e); списки упорядочены по возрастанию исходной вершины."""
+    degrees = map(operator.sub, offsets[1:n + 1], offsets[:n])
+    sources = array("q", chain.from_iterable(map(repeat, range(n), degrees)))
+    return _csr(n, indices, sources, dedup=False)
+
+
+def _csr(n: int, keys: array, values: array, dedup: bool) -> Tuple[array, array]:
+    """Стабильная сортировка пар (keys[k], values[k]) по ключу в CSR-массивы."""
+    counts = Counter(keys)
+    offsets = array("q", accumulate(chain((0,), map(counts.__getitem__, range(n)))))
+    if any(map(operator.gt, keys[:-1], keys[1:])):
+        # Раскладка подсчётом: курсор на начало списка каждого ключа
+        cursor = array("q", offsets[:n])
+        indices = array("q", [0]) * len(keys)
+        for k, v in zip(keys, values):
+            p = cursor[k]
+            indices[p] = v
+            cursor[k] = p + 1
+    else:
+        # Рёбра уже сгруппированы по ключу (обычный порядок add_edge): раскладывать нечего
+        indices = array("q", values)
+    if not dedup:
+        return offsets, indices
+
+    # Удаляем повторные рёбра только в тех списках, где они действительно есть
+    compact = None
+    for u in range(n):
+        a, b = offsets[u], offsets[u + 1]
+        if b - a > 1 and len(set(indices[a:b])) != b - a:
+            compact = array("q")
+            break
+    if compact is None:
+        return offsets, indices
+    new_offsets = array("q", [0]) * (n + 1)
+    for u in range(n):
+        compact.extend(dict.fromkeys(indices[offsets[u]:offsets[u + 1]]))
+        new_offsets[u + 1] = len(compact)
+    return new_offsets, compact
+
+
+def build_graph(precedence: Dict[int, Set[int]], nodes: Iterable[Hashable] = ()) -> Graph:
+    """
+    Собрать Graph за один проход по precedence (ребро u → v для v из precedence[u]).
+    nodes — дополнительные вершины (например, все задачи), которых может не быть в рёбрах.
+    """
+    builder = GraphBuilder()
+    # Все проходы по входу идут через встроенные итераторы, без Python-цикла на ребро
+    builder.ids = list(dict.fromkeys(chain(
+        precedence.keys(), chain.from_iterable(precedence.values()), nodes)))
+    builder.index = index = {v: i for i, v in enumerate(builder.ids)}
+    builder._src = array("q", chain.from_iterable(
+        repeat(index[u], len(vs)) for u, vs in precedence.items()))
+    builder._dst = array("q", map(index.__getitem__, chain.from_iterable(precedence.values())))
+    builder._unique = all(type(vs) in (set, frozenset) for vs in precedence.values())
+    return builder.build()
+
+
+def as_graph(precedence, nodes: Iterable[Hashable] = ()) -> Graph:
+    """Принять либо готовый Graph, либо словарь предшествования."""
+    if isinstance(precedence, Graph):
+        return precedence.with_nodes(nodes)
+    return build_graph(precedence, nodes)
+
+
+def durations_of(tasks, graph: Graph) -> array:
+    """Длительности задач по плотным индексам графа."""
+    return array("q", [tasks[node].duration for node in graph.ids])
+
+
 def get_graph(precedence: Dict[int, Set[int]]) -> Tuple[Dict[int, Set[int]], Dict[int, Set[int]]]:
     """
     Построить два словаря:
@@ -17,6 +292,9 @@ def get_graph(precedence: Dict[int, Set[int]]) -> Tuple[Dict[int, Set[int]], Dic
       predecessors[v] = множество u, таких что u → v
     Работает даже если в precedence встречаются вершины только в значениях.
     """
+    if isinstance(precedence, Graph):
+        return precedence.to_dicts()
+
     # Собираем все вершины: и ключи, и те, что в значениях
     all_nodes = set(precedence.keys())
     for vs in precedence.values():
@@ -32,4 +310,4 @@ def get_graph(precedence: Dict[int, Set[int]]) -> Tuple[Dict[int, Set[int]], Dic
             successors[u].add(v)
             predecessors[v].add(u)
 
-    return successors, predecessors
\ No newline at end of file
+    return successors, predecessors
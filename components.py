@@ -0,0 +1,185 @@
+import heapq
+import os
+from array import array
+from concurrent.futures import Executor
+from itertools import accumulate, chain
+from typing import List, Optional, Sequence, Tuple
+
+import profiling
+from analytics import bottom_levels, topological_frontiers
+from common import Graph, ScheduleResult
+from registry import get_algorithm, run_result
+
+
+def weak_components(graph: Graph) -> Tuple[array, int]:
+    """
+    Компоненты слабой связности: обход по потомкам и предкам сразу.
+    Возвращает component_of[i] и число компонент; компоненты нумеруются
+    по наименьшему индексу вершины. O(n + e).
+    """
+    n = len(graph)
+    succ_offsets, succ_indices = graph.succ_offsets, graph.succ_indices
+    pred_offsets, pred_indices = graph.pred_offsets, graph.pred_indices
+    component_of = array("q", [-1]) * n
+    count = 0
+    for root in range(n):
+        if component_of[root] != -1:
+            continue
+        component_of[root] = count
+        stack = [root]
+        while stack:
+            u = stack.pop()
+            for v in chain(succ_indices[succ_offsets[u]:succ_offsets[u + 1]],
+                           pred_indices[pred_offsets[u]:pred_offsets[u + 1]]):
+                if component_of[v] == -1:
+                    component_of[v] = count
+                    stack.append(v)
+        count += 1
+    return component_of, count
+
+
+def subgraph(graph: Graph, members: Sequence[int], local: array) -> Graph:
+    """
+    Подграф на вершинах members (по возрастанию индексов, замкнутых по рёбрам).
+    local[i] — индекс вершины i внутри подграфа; заполняется здесь.
+    """
+    for k, i in enumerate(members):
+        local[i] = k
+    ids = [graph.ids[i] for i in members]
+    arrays = []
+    for offsets, indices in ((graph.succ_offsets, graph.succ_indices), (graph.pred_offsets, graph.pred_indices)):
+        arrays.append(array("q", accumulate(chain((0,), (offsets[i + 1] - offsets[i] for i in members)))))
+        arrays.append(array("q", map(local.__getitem__, chain.from_iterable(
+            indices[offsets[i]:offsets[i + 1]] for i in members))))
+    succ_offsets, succ_indices, pred_offsets, pred_indices = arrays
+    return Graph(ids, dict(zip(ids, range(len(ids)))), succ_offsets, succ_indices, pred_offsets, pred_indices)
+
+
+def machine_shares(works: Sequence[int], critical_paths: Sequence[int], m: int,
+                   max_steps: int = 1024) -> List[int]:
+    """
+    Сколько машин дать каждой компоненте.
+    Время компоненты на k машинах оценивается как max(критический путь, ⌈работа / k⌉).
+    Начинаем с одной машины на компоненту и, пока оценка упаковки pack улучшается
+    (или хотя бы есть куда расти), добавляем машину той компоненте, что заканчивает последней.
+    """
+    count = len(works)
+
+    def estimate(c: int, k: int) -> int:
+        return max(critical_paths[c], -(-works[c] // k))
+
+    lower_bound = max(max(critical_paths, default=0), -(-sum(works) // m))
+    shares = [1] * count
+    best, best_shares = None, list(shares)
+    for _ in range(max_steps):
+        makespans = [estimate(c, shares[c]) for c in range(count)]
+        finish = [offset + makespans[c] for c, (offset, _) in enumerate(pack(makespans, shares, m))]
+        makespan = max(finish, default=0)
+        if best is None or makespan < best:
+            best, best_shares = makespan, list(shares)
+        if makespan <= lower_bound:
+            break
+        last = max(range(count), key=lambda c: (finish[c], makespans[c]))
+        if shares[last] >= m or estimate(last, shares[last] + 1) == makespans[last]:
+            break
+        shares[last] += 1
+    return best_shares
+
+
+def pack(makespans: Sequence[int], shares: Sequence[int], m: int) -> List[Tuple[int, List[int]]]:
+    """
+    Уложить прямоугольники (shares[c] машин × makespans[c]) на m машин:
+    от самых длинных к коротким, каждый — на shares[c] машин, освобождающихся раньше всех.
+    Возвращает для каждой компоненты (сдвиг по времени, номера машин).
+    """
+    available = [(0, i) for i in range(m)]
+    placement: List[Optional[Tuple[int, List[int]]]] = [None] * len(makespans)
+    for c in sorted(range(len(makespans)), key=lambda c: (-makespans[c], -shares[c], c)):
+        taken = [heapq.heappop(available) for _ in range(shares[c])]
+        offset = taken[-1][0]
+        machines = sorted(mach for _, mach in taken)
+        placement[c] = (offset, machines)
+        for mach in machines:
+            heapq.heappush(available, (offset + makespans[c], mach))
+    return placement
+
+
+def _schedule_component(job: Tuple[str, Graph, Sequence[int], int, List[array]]) -> Tuple[array, array, array, array]:
+    name, component, durations, m, frontiers = job
+    result = get_algorithm(name)(component, durations, m, frontiers)
+    return result.task, result.start, result.end, result.machine
+
+
+def schedule_components(name: str, graph: Graph, durations: Sequence[int], m: int,
+                        executor: Optional[Executor] = None,
+                        frontiers: Optional[List[array]] = None) -> ScheduleResult:
+    """
+    Разбить граф на компоненты слабой связности, спланировать каждую алгоритмом name
+    на своей доле машин (параллельно, если передан executor) и сложить расписания
+    на m машин через pack. Граф из одной компоненты планируется целиком как обычно.
+    frontiers — фронты Кана уже проверенного графа; компоненты получают свои части этих фронтов.
+    """
+    if m < 1:
+        raise ValueError("No solution: at least one machine is required")
+    with profiling.phase("components.split"):
+        component_of, count = weak_components(graph)
+    if count <= 1:
+        return run_result(name, graph, durations, m, frontiers)
+    if frontiers is None:
+        with profiling.phase("graph.validate"):
+            frontiers = topological_frontiers(graph)
+
+    with profiling.phase("components.prepare"):
+        members = [[] for _ in range(count)]
+        for i, c in enumerate(component_of):
+            members[c].append(i)
+
+        works = [sum(map(durations.__getitem__, nodes)) for nodes in members]
+        levels = bottom_levels(graph, durations, frontiers)
+        critical_paths = [max(map(levels.__getitem__, nodes)) for nodes in members]
+        shares = machine_shares(works, critical_paths, m)
+
+        local = array("q", [0]) * len(graph)
+        subgraphs = [subgraph(graph, nodes, local) for nodes in members]
+        # Фронт компоненты — её вершины из общего фронта: уровень вершины задают её предки,
+        # а они все в той же компоненте, так что это ровно фронты Кана подграфа
+        parts = [[] for _ in range(count)]
+        last = [-1] * count
+        for level, frontier in enumerate(frontiers):
+            for u in frontier:
+                c = component_of[u]
+                if last[c] != level:
+                    last[c] = level
+                    parts[c].append(array("q"))
+                parts[c][-1].append(local[u])
+        jobs = [(name, subgraphs[c], array("q", [durations[i] for i in nodes]), shares[c], parts[c])
+                for c, nodes in enumerate(members)]
+
+    profile = profiling.active()
+    if profile is not None:
+        profile.add("components.count", count)
+    with profiling.phase("components.schedule"):
+        if executor is None:
+            results = list(map(_schedule_component, jobs))
+        else:
+            # Мелкие компоненты — пачками, иначе пул тратит больше на пересылку, чем на работу
+            chunksize = max(1, count // (4 * (os.cpu_count() or 1)))
+            results = list(executor.map(_schedule_component, jobs, chunksize=chunksize))
+
+    with profiling.phase("components.pack"):
+        makespans = [max(end, default=0) for _, _, end, _ in results]
+        placement = pack(makespans, shares, m)
+
+        n = len(graph)
+        start = array("q", [0]) * n
+        end = array("q", [0]) * n
+        machine = array("q", [0]) * n
+        for c, (task, s, e, mach) in enumerate(results):
+            offset, machines = placement[c]
+            nodes = members[c]
+            for k in range(len(task)):
+                i = nodes[task[k]]
+                start[i] = s[k] + offset
+                end[i] = e[k] + offset
+                machine[i] = machines[mach[k]]
+    return ScheduleResult.from_arrays(graph.ids, m, start, end, machine)
@@ -0,0 +1,357 @@
+"""
+Точное расписание ветвями и границами для небольших графов (десятки задач).
+
+    solution = solve_exact(graph, durations, m, time_limit=5.0)
+    solution.result       # лучшее найденное расписание
+    solution.optimal      # True, если перебор завершён и оптимальность доказана
+    solution.lower_bound  # доказанная нижняя оценка оптимума
+
+Ветвление — последовательная схема генерации: следующая задача из готовых
+ставится на машину, освобождающуюся раньше всех, в момент max(машина свободна,
+предки завершены). Перебор всех порядков так даёт и оптимальное расписание:
+если ставить задачи в порядке стартов оптимального, каждая начнётся не позже.
+
+Верхняя оценка в начале — лучший из list-планировщиков (coffman, fujii, sethi).
+Графы больше MAX_TASKS не перебираются: сразу coffman и оценка makespan_lower_bound.
+Отсечение по нижним оценкам узла:
+  - критический путь: max(освобождение задачи, самая ранняя машина) + хвост задачи;
+  - загрузка: ⌈(сумма времён освобождения машин + оставшаяся работа) / m⌉.
+Уже разобранные состояния запоминаются: будущее узла определяется множеством
+поставленных задач, временами освобождения машин и моментами освобождения
+оставшихся задач (моменты раньше самой ранней машины неразличимы).
+
+Перебор останавливается по time_limit и возвращает лучшее найденное (anytime).
+С workers > 1 корень раскрывается на несколько уровней, и поддеревья
+перебираются в пуле процессов; каждое новое поддерево получает текущую
+верхнюю оценку, но между уже запущенными процессами она не передаётся.
+"""
+import bisect
+import heapq
+import time
+from array import array
+from concurrent.futures import FIRST_COMPLETED, Executor, ProcessPoolExecutor, wait
+from typing import List, Optional, Sequence, Tuple
+
+import profiling
+from analytics import bottom_levels, makespan_lower_bound, topological_frontiers
+from coffman import coffman_graham_result
+from common import Graph, ScheduleResult
+from fujii import fujii_result
+from reach import transitive_reduction
+from sethi import sethi_ulman_result
+
+EXACT_TIME_LIMIT = 1.0
+# Глубина рекурсии перебора равна числу задач; больше — только эвристики
+MAX_TASKS = 500
+# Предел запомненных состояний, дальше перебор идёт без новых записей
+MEMO_LIMIT = 1 << 20
+# Часы проверяются раз в столько узлов
+CHECK_EVERY = 256
+# Во сколько раз больше поддеревьев, чем процессов, — для балансировки
+SUBTREES_PER_WORKER = 4
+
+HEURISTICS = (coffman_graham_result, fujii_result, sethi_ulman_result)
+
+
+class ExactSolution:
+    """Итог solve_exact: расписание, доказанная нижняя оценка, признак оптимальности, число узлов."""
+    __slots__ = ("result", "lower_bound", "optimal", "nodes")
+
+    def __init__(self, result: ScheduleResult, lower_bound: int, optimal: bool, nodes: int):
+        self.result = result
+        self.lower_bound = lower_bound
+        self.optimal = optimal
+        self.nodes = nodes
+
+
+# Состояние перебора: старты задач (-1 — не поставлена) и времена освобождения машин по возрастанию
+State = Tuple[List[int], List[int]]
+
+
+class _Search:
+    """Перебор в глубину из заданных состояний с общей верхней оценкой и памятью состояний."""
+
+    def __init__(self, graph: Graph, durations: Sequence[int], tails: Sequence[int],
+                 best: int, best_start: Optional[List[int]], deadline: float):
+        n = len(graph)
+        self.n = n
+        self.full = (1 << n) - 1
+        self.durations = list(durations)
+        self.tails = list(tails)
+        self.succ = [list(graph.successors(i)) for i in range(n)]
+        self.pred = [list(graph.predecessors(i)) for i in range(n)]
+        self.best = best
+        self.best_start = best_start
+        self.deadline = deadline
+        self.memo = set()
+        self.nodes = 0
+        self.pruned = 0
+        self.memo_hits = 0
+        self.timed_out = False
+
+        self.start: List[int] = []
+        self.end: List[int] = []
+        self.missing: List[int] = []
+        self.ready: List[int] = []
+
+    def load(self, start: List[int]) -> Tuple[int, int]:
+        """Поставить задачи со старта start; вернуть (маску поставленных, оставшуюся работу)."""
+        durations, pred = self.durations, self.pred
+        self.start = list(start)
+        self.end = [s + d if s >= 0 else 0 for s, d in zip(start, durations)]
+        self.missing = [sum(1 for p in pred[j] if start[p] < 0) for j in range(self.n)]
+        self.ready = [j for j in range(self.n) if start[j] < 0 and self.missing[j] == 0]
+        mask = 0
+        work = 0
+        for j, s in enumerate(start):
+            if s >= 0:
+                mask |= 1 << j
+            else:
+                work += durations[j]
+        return mask, work
+
+    def evaluate(self, free: List[int], mask: int, work: int) -> Tuple[int, tuple, List[int]]:
+        """Нижняя оценка узла, ключ состояния и моменты освобождения задач (не раньше самой ранней машины)."""
+        earliest = free[0]
+        bound = max(free[-1], -(-(sum(free) + work) // len(free)))
+        start, end, pred, tails = self.start, self.end, self.pred, self.tails
+        release = [0] * self.n
+        for j in range(self.n):
+            if start[j] >= 0:
+                continue
+            r = earliest
+            for p in pred[j]:
+                if start[p] >= 0 and end[p] > r:
+                    r = end[p]
+            release[j] = r
+            if r + tails[j] > bound:
+                bound = r + tails[j]
+        key = (mask, tuple(free), tuple(release[j] for j in range(self.n) if start[j] < 0))
+        return bound, key, release
+
+    def place(self, j: int, s: int) -> None:
+        self.start[j] = s
+        self.end[j] = s + self.durations[j]
+        self.ready.remove(j)
+        for k in self.succ[j]:
+            self.missing[k] -= 1
+            if self.missing[k] == 0:
+                self.ready.append(k)
+
+    def unplace(self, j: int) -> None:
+        for k in self.succ[j]:
+            if self.missing[k] == 0:
+                self.ready.remove(k)
+            self.missing[k] += 1
+        self.ready.append(j)
+        self.start[j] = -1
+
+    def children(self, free: List[int], release: List[int]) -> List[Tuple[int, int]]:
+        """Готовые задачи со стартами: раньше стартующие, при равенстве — с длинным хвостом."""
+        tails = self.tails
+        return sorted(((release[j], j) for j in self.ready), key=lambda c: (c[0], -tails[c[1]], c[1]))
+
+    def dfs(self, free: List[int], mask: int, work: int) -> None:
+        self.nodes += 1
+        if self.nodes % CHECK_EVERY == 0 and time.monotonic() > self.deadline:
+            self.timed_out = True
+        if self.timed_out:
+            return
+        if mask == self.full:
+            if free[-1] < self.best:
+                self.best = free[-1]
+                self.best_start = list(self.start)
+            return
+        bound, key, release = self.evaluate(free, mask, work)
+        if bound >= self.best:
+            self.pruned += 1
+            return
+        if key in self.memo:
+            self.memo_hits += 1
+            return
+        if len(self.memo) < MEMO_LIMIT:
+            self.memo.add(key)
+
+        durations = self.durations
+        for s, j in self.children(free, release):
+            child = free[1:]
+            bisect.insort(child, s + durations[j])
+            self.place(j, s)
+            self.dfs(child, mask | (1 << j), work - durations[j])
+            self.unplace(j)
+            if self.timed_out:
+                return
+
+    def run(self, state: State) -> None:
+        start, free = state
+        mask, work = self.load(start)
+        self.dfs(list(free), mask, work)
+
+    def expand(self, state: State) -> List[Tuple[int, State]]:
+        """Дети состояния с их нижними оценками (без отсечённых); лист обновляет верхнюю оценку."""
+        start, free = state
+        mask, work = self.load(start)
+        if mask == self.full:
+            if free[-1] < self.best:
+                self.best = free[-1]
+                self.best_start = list(start)
+            return []
+        expanded = []
+        _, _, release = self.evaluate(free, mask, work)
+        for s, j in self.children(free, release):
+            child = free[1:]
+            bisect.insort(child, s + self.durations[j])
+            self.place(j, s)
+            bound, key, _ = self.evaluate(child, mask | (1 << j), work - self.durations[j])
+            if bound < self.best and key not in self.memo:
+                self.memo.add(key)
+                expanded.append((bound, (list(self.start), child)))
+            self.unplace(j)
+        return expanded
+
+
+def _search_subtree(job) -> Tuple[int, Optional[List[int]], bool, int]:
+    # Функция модульного уровня для пула процессов
+    graph, durations, tails, state, best, deadline = job
+    search = _Search(graph, durations, tails, best, None, deadline)
+    search.run(state)
+    return search.best, search.best_start, search.timed_out, search.nodes
+
+
+def _to_result(graph: Graph, m: int, start: Sequence[int], durations: Sequence[int]) -> ScheduleResult:
+    """Машины по стартам: в любой момент идёт не больше m задач, так что ранняя свободная машина подходит."""
+    n = len(graph)
+    end = array("q", [start[i] + durations[i] for i in range(n)])
+    machine = array("q", [0]) * n
+    available = [(0, k) for k in range(m)]
+    for i in sorted(range(n), key=lambda i: (start[i], i)):
+        _, k = heapq.heappop(available)
+        machine[i] = k
+        heapq.heappush(available, (end[i], k))
+    return ScheduleResult.from_arrays(graph.ids, m, array("q", start), end, machine)
+
+
+def solve_exact(graph: Graph, durations: Sequence[int], m: int, time_limit: float = EXACT_TIME_LIMIT,
+                workers: int = 1, executor: Optional[Executor] = None,
+                frontiers: Optional[List[array]] = None) -> ExactSolution:
+    """
+    Оптимальное расписание, если перебор укладывается в time_limit секунд, иначе лучшее найденное.
+    workers > 1 — поддеревья в пуле процессов: в executor, если передан, иначе в своём пуле.
+    frontiers — фронты Кана, если граф уже проверен. ValueError с кратчайшим циклом, если граф не ацикличен.
+    """
+    if m < 1:
+        raise ValueError("No solution: at least one machine is required")
+    deadline = time.monotonic() + time_limit
+    frontiers = frontiers or topological_frontiers(graph)
+    n = len(graph)
+
+    if n > MAX_TASKS:
+        # Перебора не будет: одна эвристика, без редукции графа и оценок хвостов
+        with profiling.phase("exact.heuristics"):
+            result = HEURISTICS[0](graph, durations, m, frontiers)
+            lower_bound = makespan_lower_bound(graph, durations, m, frontiers)
+        return ExactSolution(result, lower_bound, lower_bound >= result.makespan, 0)
+
+    with profiling.phase("exact.heuristics"):
+        incumbent = min((heuristic(graph, durations, m, frontiers) for heuristic in HEURISTICS),
+                        key=lambda result: result.makespan)
+        best = incumbent.makespan
+        best_start = [0] * n
+        for k, i in enumerate(incumbent.task):
+            best_start[i] = incumbent.start[k]
+        tails = bottom_levels(graph, durations, frontiers)
+    if time.monotonic() >= deadline:
+        # Бюджет ушёл на эвристики: редукция и перебор уже не успеют
+        lower_bound = max(max(tails, default=0), -(-sum(durations) // m))
+        return ExactSolution(incumbent, lower_bound, lower_bound >= best, 0)
+
+    with profiling.phase("exact.reduction"):
+        # Перебор смотрит только на прямых предков: транзитивные рёбра ничего не добавляют к оценкам
+        reduced = transitive_reduction(graph, frontiers)
+
+    # Машин больше, чем задач, не бывает нужно одновременно
+    width = max(1, min(m, n))
+    search = _Search(reduced, durations, tails, best, best_start, deadline)
+    root: State = ([-1] * n, [0] * width)
+    mask, work = search.load(root[0])
+    lower_bound = search.evaluate(root[1], mask, work)[0] if n else 0
+    if lower_bound >= best:
+        return ExactSolution(incumbent, lower_bound, lower_bound >= best, 0)
+
+    with profiling.phase("exact.search"):
+        if workers <= 1:
+            search.run(root)
+            unfinished = [lower_bound] if search.timed_out else []
+            nodes = search.nodes
+        else:
+            unfinished, nodes = _search_parallel(search, reduced, durations, tails, root, lower_bound,
+                                                 workers, executor, deadline)
+    profile = profiling.active()
+    if profile is not None:
+        profile.add("exact.nodes", nodes)
+        profile.add("exact.pruned", search.pruned)
+        profile.add("exact.memo_hits", search.memo_hits)
+
+    best = search.best
+    # Оценка недоперебранного поддерева не выше найденного; найденное, равное ей, — уже оптимум
+    proven = min(max(lower_bound, min(unfinished, default=best)), best)
+    result = incumbent if search.best_start is best_start else _to_result(graph, m, search.best_start, durations)
+    return ExactSolution(result, proven, proven == best, nodes)
+
+
+def _search_parallel(search: _Search, graph: Graph, durations: Sequence[int], tails,
+                     root: State, lower_bound: int, workers: int, executor: Optional[Executor],
+                     deadline: float) -> Tuple[List[int], int]:
+    """Раскрыть корень по уровням до SUBTREES_PER_WORKER * workers поддеревьев и перебрать их в пуле."""
+    frontier = [(lower_bound, root)]
+    while frontier and len(frontier) < SUBTREES_PER_WORKER * workers:
+        following = []
+        for _, state in frontier:
+            following.extend(search.expand(state))
+        if not following:
+            frontier = following
+            break
+        frontier = following
+    frontier.sort(key=lambda item: item[0])
+    nodes = search.nodes + len(frontier)
+
+    own = None
+    if executor is None:
+        executor = own = ProcessPoolExecutor(max_workers=workers)
+    unfinished: List[int] = []
+    running = {}
+    try:
+        position = 0
+        while position < len(frontier) or running:
+            while position < len(frontier) and len(running) < workers:
+                bound, state = frontier[position]
+                position += 1
+                if bound >= search.best:
+                    continue
+                if time.monotonic() > deadline:
+                    unfinished.append(bound)
+                    continue
+                job = (graph, durations, tails, state, search.best, deadline)
+                running[executor.submit(_search_subtree, job)] = bound
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                bound = running.pop(future)
+                value, start, timed_out, count = future.result()
+                nodes += count
+                if start is not None and value < search.best:
+                    search.best, search.best_start = value, start
+                if timed_out:
+                    unfinished.append(bound)
+    finally:
+        if own is not None:
+            own.shutdown()
+    # Поддеревья с оценкой не меньше найденного закрыты и без перебора
+    return [bound for bound in unfinished if bound < search.best], nodes
+
+
+def exact_result(graph: Graph, durations: Sequence[int], m: int = 2,
+                 frontiers: Optional[List[array]] = None) -> ScheduleResult:
+    """Планировщик для реестра: solve_exact с бюджетом EXACT_TIME_LIMIT в одном процессе."""
+    return solve_exact(graph, durations, m, frontiers=frontiers).result
@@ -1,75 +1,260 @@
+from array import array
 from collections import defaultdict
 import heapq
+from typing import List, Optional, Sequence
 
-from common import Task, get_graph
+import profiling
+from analytics import bottom_levels, topological_frontiers
+from coffman import coffman_graham_labels
+from common import Graph, ScheduleResult, Task, as_graph, durations_of
+from simulation import list_schedule
 
+FUJII_MODES = ("greedy", "matching")
+# Граф несравнимости хранится битовыми масками по n бит на задачу; больше — сразу Coffman–Graham
+MATCHING_MAX_TASKS = 8192
 
-def fujii_scheduler(tasks, precedence, m=2):
+
+def fujii_priority(duration: int, tail: int, node) -> tuple:
+    """Ключ очереди готовых задач Fujii: короче раньше, затем длиннее хвост, затем меньший id."""
+    return duration, -tail, node
+
+
+def fujii_result(graph: Graph, durations, m: int = 2, frontiers: Optional[List[array]] = None) -> ScheduleResult:
+    """
+    Планировщик Fujii по плотным индексам: durations[i] — длительность задачи i.
+    Приоритет — по короткой длительности, при равенстве — по более длинному
+    критическому пути до стока (analytics.bottom_levels).
+    Моделирование событийное (simulation.list_schedule).
+    frontiers — фронты Кана, если уже посчитаны (analytics.topological_frontiers).
+    """
+    ids = graph.ids
+    with profiling.phase("fujii.priorities"):
+        tail = bottom_levels(graph, durations, frontiers)
+        priority = [fujii_priority(durations[i], tail[i], ids[i]) for i in range(len(ids))]
+    with profiling.phase("fujii.simulate"):
+        start, end, machine = list_schedule(graph, durations, m, priority)
+    return ScheduleResult.from_arrays(ids, m, start, end, machine)
+
+
+def incomparability(graph: Graph, frontiers: Optional[List[array]] = None) -> List[int]:
+    """
+    Граф несравнимости битовыми масками: бит j в masks[i] — ни i не предшествует j, ни j не предшествует i.
+    Потомки и предки собираются по фронтам Кана; O(n · e / 64) операций над словами.
+    ValueError, если граф содержит цикл.
+    """
+    n = len(graph)
+    frontiers = frontiers or topological_frontiers(graph)
+    succ_offsets, succ_indices = graph.succ_offsets, graph.succ_indices
+    pred_offsets, pred_indices = graph.pred_offsets, graph.pred_indices
+    related = [1 << i for i in range(n)]
+    descendants = list(related)
+    for frontier in reversed(frontiers):
+        for u in frontier:
+            mask = descendants[u]
+            for k in range(succ_offsets[u], succ_offsets[u + 1]):
+                mask |= descendants[succ_indices[k]]
+            descendants[u] = mask
+    ancestors = related
+    for frontier in frontiers:
+        for v in frontier:
+            mask = ancestors[v]
+            for k in range(pred_offsets[v], pred_offsets[v + 1]):
+                mask |= ancestors[pred_indices[k]]
+            ancestors[v] = mask
+    everyone = (1 << n) - 1
+    return [everyone ^ (descendants[i] | ancestors[i]) for i in range(n)]
+
+
+def maximum_matching(adjacency: Sequence[int], max_pairs: Optional[int] = None) -> List[int]:
+    """
+    Наибольшее паросочетание в общем графе (Эдмондс, сжатие цветков).
+    adjacency[i] — битовая маска соседей i; mate[i] — пара i или -1.
+    Жадное начальное паросочетание, затем по поиску увеличивающего пути
+    из каждой свободной вершины; соседи перебираются по маскам, так что
+    вершины, уже лежащие в дереве поиска нечётными, не просматриваются.
+    max_pairs — известная верхняя оценка размера: дойдя до неё, поиск останавливается
+    (неудачный поиск в плотном графе — самая дорогая часть).
+    """
+    n = len(adjacency)
+    mate = [-1] * n
+    isolated = sum(1 for mask in adjacency if not mask)
+    limit = (n - isolated) // 2 if max_pairs is None else min(max_pairs, (n - isolated) // 2)
+    pairs = 0
+    unmatched = (1 << n) - 1
+    for v in range(n):
+        if mate[v] == -1:
+            candidates = adjacency[v] & unmatched & ~(1 << v)
+            if candidates:
+                u = (candidates & -candidates).bit_length() - 1
+                mate[u], mate[v] = v, u
+                unmatched &= ~((1 << u) | (1 << v))
+                pairs += 1
+    for root in range(n):
+        if pairs >= limit:
+            break
+        if mate[root] == -1 and adjacency[root]:
+            end, parent = _augmenting_path(adjacency, mate, root)
+            if end != -1:
+                pairs += 1
+            # Перевернуть паросочетание вдоль найденного пути
+            while end != -1:
+                previous = mate[parent[end]]
+                mate[end] = parent[end]
+                mate[parent[end]] = end
+                end = previous
+    return mate
+
+
+def _augmenting_path(adjacency: Sequence[int], mate: List[int], root: int):
+    """Поиск в ширину из root; возвращает (свободная вершина на конце пути или -1, parent)."""
+    n = len(adjacency)
+    parent = [-1] * n
+    base = list(range(n))
+    even = bytearray(n)
+    even[root] = 1
+    odd_mask = 0
+    queue = [root]
+    head = 0
+
+    def lowest_common_base(a: int, b: int) -> int:
+        seen = bytearray(n)
+        while True:
+            a = base[a]
+            seen[a] = 1
+            if mate[a] == -1:
+                break
+            a = parent[mate[a]]
+        while True:
+            b = base[b]
+            if seen[b]:
+                return b
+            b = parent[mate[b]]
+
+    def mark_path(v: int, b: int, child: int, in_blossom: bytearray) -> None:
+        while base[v] != b:
+            in_blossom[base[v]] = in_blossom[base[mate[v]]] = 1
+            parent[v] = child
+            child = mate[v]
+            v = parent[mate[v]]
+
+    while head < len(queue):
+        v = queue[head]
+        head += 1
+        neighbours = adjacency[v] & ~odd_mask
+        while neighbours:
+            low = neighbours & -neighbours
+            neighbours ^= low
+            to = low.bit_length() - 1
+            if base[v] == base[to] or mate[v] == to:
+                continue
+            if to == root or (mate[to] != -1 and parent[mate[to]] != -1):
+                # Нечётный цикл: стянуть цветок в его основание
+                current = lowest_common_base(v, to)
+                in_blossom = bytearray(n)
+                mark_path(v, current, to, in_blossom)
+                mark_path(to, current, v, in_blossom)
+                for i in range(n):
+                    if in_blossom[base[i]]:
+                        base[i] = current
+                        if not even[i]:
+                            even[i] = 1
+                            odd_mask &= ~(1 << i)
+                            queue.append(i)
+            elif parent[to] == -1:
+                parent[to] = v
+                if mate[to] == -1:
+                    return to, parent
+                odd_mask |= low
+                following = mate[to]
+                even[following] = 1
+                queue.append(following)
+    return -1, parent
+
+
+def fujii_matching_result(graph: Graph, durations, m: int = 2,
+                          frontiers: Optional[List[array]] = None) -> ScheduleResult:
+    """
+    Fujii–Kasami–Ninomiya: оптимум для двух машин и задач равной длительности.
+    Наибольшее паросочетание M в графе несравнимости задаёт пары задач, идущих
+    одновременно; оптимальная длина — n − |M| шагов. Пары и одиночные задачи
+    стягиваются в вершины, граф которых упорядочивается топологически, шаг на вершину.
+    Если стянутый граф оказался с циклом (обмены пар из статьи FKN не выполняются),
+    расписание строит Coffman–Graham по меткам — для m = 2 и равных длительностей
+    он тоже оптимален и даёт те же n − |M| шагов.
+    Для m != 2 или разных длительностей — обычный fujii_result.
+    """
+    n = len(graph)
+    if m != 2 or len(set(durations)) > 1:
+        return fujii_result(graph, durations, m, frontiers)
+    step = durations[0] if n else 0
+    if n > MATCHING_MAX_TASKS:
+        return _coffman_graham_list(graph, durations)
+
+    with profiling.phase("fujii.incomparability"):
+        frontiers = frontiers or topological_frontiers(graph)
+        adjacency = incomparability(graph, frontiers)
+    with profiling.phase("fujii.matching"):
+        # Шагов не меньше, чем задач на самом длинном пути, — пар не больше n − длина пути
+        mate = maximum_matching(adjacency, n - len(frontiers))
+    profile = profiling.active()
+    if profile is not None:
+        profile.add("fujii.matched_pairs", sum(1 for i in range(n) if mate[i] > i))
+
+    with profiling.phase("fujii.order"):
+        # Вершина стянутого графа — меньший индекс пары
+        composite = [min(i, mate[i]) if mate[i] != -1 else i for i in range(n)]
+        indegree = [0] * n
+        edges = defaultdict(set)
+        for u in range(n):
+            for v in graph.successors(u):
+                cu, cv = composite[u], composite[v]
+                if cv not in edges[cu]:
+                    edges[cu].add(cv)
+                    indegree[cv] += 1
+        frontier = [c for c in range(n) if composite[c] == c and indegree[c] == 0]
+        order = []
+        while frontier:
+            c = frontier.pop()
+            order.append(c)
+            for d in edges[c]:
+                indegree[d] -= 1
+                if indegree[d] == 0:
+                    frontier.append(d)
+        if len(order) != n - sum(1 for i in range(n) if mate[i] > i):
+            return _coffman_graham_list(graph, durations)
+
+        start = array("q", [0]) * n
+        end = array("q", [0]) * n
+        machine = array("q", [0]) * n
+        for t, c in enumerate(order):
+            start[c], end[c] = t * step, (t + 1) * step
+            if mate[c] != -1:
+                other = mate[c]
+                start[other], end[other], machine[other] = t * step, (t + 1) * step, 1
+    return ScheduleResult.from_arrays(graph.ids, 2, start, end, machine)
+
+
+def _coffman_graham_list(graph: Graph, durations) -> ScheduleResult:
+    # Классический Coffman–Graham: list-scheduling без простоев, старшая метка раньше
+    labels = coffman_graham_labels(graph)
+    start, end, machine = list_schedule(graph, durations, 2, [-label for label in labels])
+    return ScheduleResult.from_arrays(graph.ids, 2, start, end, machine)
+
+
+def fujii_scheduler(tasks, precedence, m=2, mode="greedy"):
     """
     Реализация алгоритма Fujii.
     tasks: dict[int, Task]
-    precedence: dict[int, set[int]]
+    precedence: dict[int, set[int]] или common.Graph
     m: количество машин
+    mode: greedy — list-scheduling по коротким задачам (fujii_result),
+          matching — Fujii–Kasami–Ninomiya по паросочетанию (fujii_matching_result)
     """
-    time = 0
-    in_progress = []
-    finished = set()
-    ready_queue = []
-    machine_end_times = [0] * m
-    machine_schedules = [[] for _ in range(m)]
-
-    successors, predecessors = get_graph(precedence)
-
-    for t in tasks.values():
-        successors.setdefault(t.id, set())
-        predecessors.setdefault(t.id, set())
-
-    # Задачи без предшественников
-    available = {t.id for t in tasks.values() if not predecessors.get(t.id, set())}
-
-    while len(finished) < len(tasks):
-        # Обновим время
-        if in_progress:
-            time = min([end for end, _, _ in in_progress])
-        else:
-            time += 1  # Иначе просто двигаем время вперёд
-
-        # Удалим завершённые
-        still_in_progress = []
-        for end_time, task_id, machine in in_progress:
-            if end_time <= time:
-                finished.add(task_id)
-                machine_end_times[machine] = end_time
-                # Освободить потомков
-                for succ in successors[task_id]:
-                    if predecessors[succ].issubset(finished):
-                        available.add(succ)
-            else:
-                still_in_progress.append((end_time, task_id, machine))
-        in_progress = still_in_progress
-
-        # Готовые задачи
-        ready = sorted(
-            [t for t in available if t not in finished],
-            key=lambda x: tasks[x].duration  # Приоритет — по короткой длительности
-        )
-
-        # Распределим задачи по свободным машинам
-        free_machines = [i for i in range(m) if all(end > time or mach != i for end, _, mach in in_progress)]
-
-        for i in range(min(len(ready), len(free_machines))):
-            t_id = ready[i]
-            machine = free_machines[i]
-            task = tasks[t_id]
-            task.start_time = time
-            task.end_time = time + task.duration
-            task.machine = machine
-
-            in_progress.append((task.end_time, task.id, machine))
-            machine_schedules[machine].append(task)
-            available.remove(t_id)
-
-    return machine_schedules
+    if mode not in FUJII_MODES:
+        raise ValueError(f"Unknown Fujii mode: {mode}")
+    graph = as_graph(precedence, tasks)
+    result = fujii_result if mode == "greedy" else fujii_matching_result
+    return result(graph, durations_of(tasks, graph), m).apply(tasks)
 
 
 if __name__ == "__main__":
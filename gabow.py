@@ -1,52 +1,107 @@
-from common import Task, get_graph
-from typing import Dict, List
-
-def gabow_scc(succ: Dict[int, set[int]]) -> List[List[int]]:
-    index = 0
-    visited = set()
-    stack = []
-    p_stack = []
-    indices = {}
-    components = []
-
-    def dfs(v):
-        nonlocal index
-        indices[v] = index
-        index += 1
-        stack.append(v)
-        p_stack.append(v)
-        visited.add(v)
-
-        for w in succ.get(v, []):
-            if w not in indices:
-                dfs(w)
-            elif w not in components_flat:
-                while indices[p_stack[-1]] > indices[w]:
-                    p_stack.pop()
-
-        if p_stack and p_stack[-1] == v:
-            p_stack.pop()
-            component = []
-            while True:
-                u = stack.pop()
-                component.append(u)
-                components_flat.add(u)
-                if u == v:
-                    break
-            components.append(component)
-
-    components_flat = set()  # все уже обработанные узлы
-
-    for v in succ:
-        if v not in indices:
-            dfs(v)
+from array import array
 
+import profiling
+from common import Graph, GraphBuilder, Task, as_graph, get_graph
+from typing import Dict, List, Tuple, Union
+
+
+def scc_indices(graph: Graph) -> Tuple[array, int]:
+    """
+    Алгоритм Габова (path-based) с явным стеком вызовов по плотным индексам.
+    Возвращает component_of[i] и число компонент; компоненты нумеруются
+    в порядке завершения, т.е. потомки раньше предков (обратный топологический).
+    Время O(n + e), глубина графа ограничена только памятью.
+    """
+    n = len(graph)
+    offsets = graph.succ_offsets
+    indices = graph.succ_indices
+
+    preorder = array("q", [-1]) * n
+    component_of = array("q", [-1]) * n
+    stack = []      # S: вершины, ещё не отнесённые к компоненте
+    boundaries = [] # P: корни потенциальных компонент на текущем пути
+    counter = 0
+    count = 0
+
+    for root in range(n):
+        if preorder[root] != -1:
+            continue
+        preorder[root] = counter
+        counter += 1
+        stack.append(root)
+        boundaries.append(root)
+        call = [root]
+        cursor = [offsets[root]]
+
+        while call:
+            v = call[-1]
+            k = cursor[-1]
+            if k < offsets[v + 1]:
+                cursor[-1] = k + 1
+                w = indices[k]
+                if preorder[w] == -1:
+                    preorder[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    boundaries.append(w)
+                    call.append(w)
+                    cursor.append(offsets[w])
+                elif component_of[w] == -1:
+                    pw = preorder[w]
+                    while preorder[boundaries[-1]] > pw:
+                        boundaries.pop()
+                continue
+
+            call.pop()
+            cursor.pop()
+            if boundaries[-1] == v:
+                boundaries.pop()
+                while True:
+                    u = stack.pop()
+                    component_of[u] = count
+                    if u == v:
+                        break
+                count += 1
+
+    return component_of, count
+
+
+def gabow_scc(succ: Union[Dict[int, set[int]], Graph]) -> List[List[int]]:
+    graph = as_graph(succ)
+    with profiling.phase("gabow.scc"):
+        component_of, count = scc_indices(graph)
+    profile = profiling.active()
+    if profile is not None:
+        profile.add("gabow.components", count)
+    components = [[] for _ in range(count)]
+    for node, c in zip(graph.ids, component_of):
+        components[c].append(node)
     return components
 
 
+def condensation(graph: Graph) -> Tuple[array, Graph]:
+    """
+    Сжатие сильно связных компонент.
+    Возвращает component_of[i] и DAG компонент, где id вершины — номер компоненты.
+    Номера компонент идут в обратном топологическом порядке DAG.
+    """
+    component_of, count = scc_indices(graph)
+    builder = GraphBuilder()
+    for c in range(count):
+        builder.add_node(c)
+    offsets = graph.succ_offsets
+    indices = graph.succ_indices
+    for u in range(len(graph)):
+        cu = component_of[u]
+        for k in range(offsets[u], offsets[u + 1]):
+            cv = component_of[indices[k]]
+            if cu != cv:
+                builder.add_edge_index(cu, cv)
+    return component_of, builder.build()
+
+
 def validate_schedule(precedence):
-    succ, pred = get_graph(precedence)
-    sccs = gabow_scc(succ)
+    sccs = gabow_scc(as_graph(precedence))
     for comp in sccs:
         if len(comp) > 1:
             raise ValueError(f"Cycle detected in tasks: {comp}")
@@ -0,0 +1,219 @@
+"""
+Двоичный формат задачи планирования для больших графов.
+
+    python -m graphio tasks.json tasks.dag
+
+Файл — заголовок и шесть массивов int64 little-endian подряд:
+    magic b"DAGB", version u16, reserved u16, n u64, e u64, machines u64   (32 байта)
+    ids[n], durations[n],
+    succ_offsets[n + 1], succ_indices[e],
+    pred_offsets[n + 1], pred_indices[e]
+Массивы — ровно поля common.Graph, поэтому load() отдаёт граф поверх mmap
+через memoryview без копирования и без разбора; строятся только словарь id → индекс
+и обращение рёбер для проверки, что предки согласованы с потомками (O(n + e)).
+machines == 0 — число машин не задано.
+"""
+import argparse
+import io
+import json
+import mmap
+import operator
+import struct
+import sys
+from array import array
+from itertools import chain, repeat
+from typing import BinaryIO, Dict, Iterable, List, Sequence, Tuple
+
+import profiling
+from common import Graph, GraphBuilder, transpose
+
+MAGIC = b"DAGB"
+VERSION = 1
+HEADER = struct.Struct("<4sHHQQQ")
+ITEM = 8
+
+# Задачи в сыром виде: (id, duration, predecessors)
+RawTasks = List[Tuple[int, int, List[int]]]
+
+
+class ProblemBuilder:
+    """
+    Задача планирования, собираемая по одной задаче: сразу в плоские массивы
+    GraphBuilder и длительностей, без списка всех задач в памяти.
+    Предшественник, которого ещё не было, ждёт в pending и подключается,
+    когда придёт его задача; finish() падает, если кто-то так и не пришёл.
+    Рёбра получаются в том же порядке, что и при двух проходах по полному списку.
+    """
+
+    def __init__(self):
+        self.builder = GraphBuilder()
+        self.durations = array("q")
+        self.pending: Dict[int, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.durations)
+
+    def add(self, task_id: int, duration: int, predecessors: Iterable[int]) -> None:
+        builder = self.builder
+        index = builder.index
+        if task_id in index:
+            raise ValueError(f"Duplicate task id: {task_id}")
+        t = builder.add_node(task_id)
+        self.durations.append(duration)
+        for s in self.pending.pop(task_id, ()):
+            builder.add_edge_index(t, s)
+        for p in predecessors:
+            i = index.get(p)
+            if i is None:
+                self.pending.setdefault(p, []).append(t)
+            else:
+                builder.add_edge_index(i, t)
+
+    def finish(self) -> Tuple[Graph, array]:
+        """ValueError, если остались ссылки на задачи, которых нет."""
+        for p in self.pending:
+            raise ValueError(f"Unknown predecessor id: {p}")
+        return self.builder.build(), self.durations
+
+
+def build_problem(tasks: RawTasks) -> Tuple[Graph, array]:
+    """
+    Собрать граф предшествования (ребро p → t для каждого предшественника p)
+    и длительности по плотным индексам, без Task-объектов.
+    ValueError при повторных id и неизвестных предшественниках.
+    """
+    with profiling.phase("graph.build"):
+        problem = ProblemBuilder()
+        for task_id, duration, predecessors in tasks:
+            problem.add(task_id, duration, predecessors)
+        return problem.finish()
+
+
+def _arrays(graph: Graph, durations: Sequence[int]) -> Iterable[Sequence[int]]:
+    return (graph.ids, durations,
+            graph.succ_offsets, graph.succ_indices,
+            graph.pred_offsets, graph.pred_indices)
+
+
+def dump(graph: Graph, durations: Sequence[int], f: BinaryIO, machines: int = 0) -> None:
+    """Записать граф и длительности в файл f. ValueError, если id не целые."""
+    if not all(type(node) is int for node in graph.ids):
+        raise ValueError("Binary format supports integer task ids only")
+    f.write(HEADER.pack(MAGIC, VERSION, 0, len(graph), graph.edge_count, machines))
+    for values in _arrays(graph, durations):
+        data = values if isinstance(values, array) and values.typecode == "q" else array("q", values)
+        if sys.byteorder != "little":
+            data = array("q", data)
+            data.byteswap()
+        f.write(data.tobytes())
+
+
+def dumps(graph: Graph, durations: Sequence[int], machines: int = 0) -> bytes:
+    buffer = io.BytesIO()
+    dump(graph, durations, buffer, machines)
+    return buffer.getvalue()
+
+
+def loads(buffer) -> Tuple[Graph, Sequence[int], int]:
+    """
+    Граф, длительности и число машин из буфера (bytes, mmap, ...).
+    Массивы — memoryview поверх buffer, буфер должен жить, пока жив граф.
+    ValueError, если заголовок или массивы не согласованы.
+    """
+    view = memoryview(buffer).cast("B")
+    if len(view) < HEADER.size:
+        raise ValueError("Truncated graph file: no header")
+    magic, version, _, n, e, machines = HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise ValueError("Not a binary graph file")
+    if version != VERSION:
+        raise ValueError(f"Unsupported graph file version: {version}")
+    sizes = (n, n, n + 1, e, n + 1, e)
+    if len(view) != HEADER.size + ITEM * sum(sizes):
+        raise ValueError("Graph file size does not match its header")
+
+    arrays = []
+    position = HEADER.size
+    for size in sizes:
+        chunk = view[position:position + ITEM * size]
+        if sys.byteorder == "little":
+            arrays.append(chunk.cast("q"))
+        else:
+            # На big-endian без копии не обойтись
+            values = array("q", chunk.tobytes())
+            values.byteswap()
+            arrays.append(values)
+        position += ITEM * size
+    ids, durations, succ_offsets, succ_indices, pred_offsets, pred_indices = arrays
+
+    index = dict(zip(ids, range(n)))
+    if len(index) != n:
+        raise ValueError("Duplicate task ids in graph file")
+    for offsets, indices in ((succ_offsets, succ_indices), (pred_offsets, pred_indices)):
+        _check_csr(n, e, offsets, indices)
+    _check_transpose(n, succ_offsets, succ_indices, pred_offsets, pred_indices)
+    if n and min(durations) < 0:
+        raise ValueError("Negative task duration in graph file")
+    graph = Graph(ids, index, succ_offsets, succ_indices, pred_offsets, pred_indices)
+    return graph, durations, machines
+
+
+def _check_csr(n: int, e: int, offsets, indices) -> None:
+    # Проверки без Python-цикла на вершину: битый файл не должен ронять алгоритмы IndexError
+    if offsets[0] != 0 or offsets[n] != e:
+        raise ValueError("Corrupted graph file: bad CSR offsets")
+    if n and any(map(int.__gt__, offsets[:-1], offsets[1:])):
+        raise ValueError("Corrupted graph file: CSR offsets are not monotone")
+    if e and (min(indices) < 0 or max(indices) >= n):
+        raise ValueError("Corrupted graph file: edge index out of range")
+
+
+def _check_transpose(n: int, succ_offsets, succ_indices, pred_offsets, pred_indices) -> None:
+    # Предки должны быть ровно обращёнными потомками, иначе Кан и поиск цикла расходятся
+    offsets, indices = transpose(n, succ_offsets, succ_indices)
+    if memoryview(offsets) != memoryview(pred_offsets):
+        raise ValueError("Corrupted graph file: predecessor lists do not match successor lists")
+    if memoryview(indices) == memoryview(pred_indices):
+        return
+    # Те же списки в другом порядке внутри вершины: сравниваем пары (вершина, предок) как множества
+    degrees = map(operator.sub, offsets[1:], offsets[:-1])
+    targets = array("q", chain.from_iterable(map(repeat, range(n), degrees)))
+    expected = sorted(map(operator.add, map(operator.mul, targets, repeat(n)), indices))
+    actual = sorted(map(operator.add, map(operator.mul, targets, repeat(n)), pred_indices))
+    if expected != actual:
+        raise ValueError("Corrupted graph file: predecessor lists do not match successor lists")
+
+
+def load(path: str) -> Tuple[Graph, Sequence[int], int]:
+    """То же из файла через mmap: страницы читаются ОС по мере обращения."""
+    with open(path, "rb") as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Пустой файл нельзя отобразить
+            raise ValueError("Truncated graph file: no header") from None
+    return loads(mapped)
+
+
+def from_json(payload: dict) -> Tuple[Graph, array, int]:
+    """Задача в JSON-форме ScheduleRequest: {"tasks": [{"id", "duration", "predecessors"}], "machines"}."""
+    tasks = [(t["id"], t.get("duration", 1), t.get("predecessors", [])) for t in payload["tasks"]]
+    graph, durations = build_problem(tasks)
+    return graph, durations, payload.get("machines", 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="JSON в формате ScheduleRequest")
+    parser.add_argument("output", help="куда записать двоичный файл")
+    args = parser.parse_args()
+
+    with open(args.input) as f:
+        graph, durations, machines = from_json(json.load(f))
+    with open(args.output, "wb") as f:
+        dump(graph, durations, f, machines)
+    print(f"{len(graph)} tasks, {graph.edge_count} edges → {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
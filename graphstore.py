@@ -0,0 +1,162 @@
+"""
+Графы в общей памяти (multiprocessing.shared_memory), общие для всех процессов-воркеров.
+
+Граф кладётся один раз в двоичном формате graphio; id — sha256 этих байт, имя
+сегмента выводится из id, поэтому любой процесс находит граф по id без общего
+реестра. Имя несёт только начало id, поэтому id принимается лишь полный, а при
+первом отображении сегмента процесс сверяет id с хешем его байт. Процесс отображает сегмент и отдаёт Graph поверх него через memoryview
+(graphio.loads) — без разбора и копирования массивов; свой у каждого процесса
+только словарь id → индекс, он строится при первом обращении.
+
+Сегмент живёт, пока его не удалят (delete) — в том числе после выхода создавшего
+процесса, иначе остальные воркеры потеряли бы граф.
+"""
+import hashlib
+import os
+import re
+import threading
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, Sequence, Tuple
+
+from analytics import topological_frontiers
+from common import Graph
+from graphio import HEADER, ITEM, MAGIC, loads
+
+# Префикс имён сегментов; вместе с началом id укладывается в 31 символ (предел macOS)
+PREFIX = "dag_"
+NAME_DIGITS = 24
+# id — полный sha256 в нижнем регистре; по имени сегмента различаются только первые NAME_DIGITS цифр
+GRAPH_ID = re.compile(r"[0-9a-f]{64}")
+
+
+def graph_id(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def segment_name(gid: str) -> str:
+    """Имя сегмента графа; KeyError, если gid — не полный sha256 (иначе нашёлся бы граф по префиксу)."""
+    if not GRAPH_ID.fullmatch(gid):
+        raise KeyError(gid)
+    return PREFIX + gid[:NAME_DIGITS]
+
+
+class _Segment(SharedMemory):
+    def __del__(self):
+        # Графы этого сегмента могут пережить его объект; отображение освободится вместе с последним из них
+        try:
+            self.close()
+        except BufferError:
+            pass
+
+
+def _open(name: str, create: bool = False, size: int = 0) -> SharedMemory:
+    shm = _Segment(name, create=create, size=size)
+    if os.name == "posix":
+        # resource_tracker удалил бы сегмент при выходе этого процесса — и у остальных воркеров тоже
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+def _holds(shm: SharedMemory, gid: str) -> bool:
+    """Лежит ли в сегменте граф именно с этим id: имя сегмента несёт только начало id."""
+    size = _data_size(shm.buf)
+    if size == 0 or size > shm.size:
+        return False
+    with shm.buf[:size] as data:
+        return graph_id(data) == gid
+
+
+def _data_size(buffer) -> int:
+    """Размер файла graphio по заголовку: сегмент бывает округлён до страницы."""
+    if len(buffer) < HEADER.size:
+        return 0
+    magic, _, _, n, e, _ = HEADER.unpack_from(buffer)
+    if magic != MAGIC:
+        return 0
+    return HEADER.size + ITEM * (4 * n + 2 + 2 * e)
+
+
+class GraphStore:
+    """
+    Сегменты графов и отображения этого процесса.
+    put / get / delete потокобезопасны внутри процесса; между процессами
+    согласованы через имена сегментов: одинаковые байты — один сегмент.
+    """
+
+    def __init__(self, max_bytes: int = 2**30):
+        self.max_bytes = max_bytes
+        self._attached: Dict[str, Tuple[SharedMemory, Graph, Sequence[int], int]] = {}
+        self._lock = threading.Lock()
+
+    def put(self, data: bytes) -> str:
+        """
+        Положить граф в формате graphio и вернуть его id.
+        ValueError — битый файл, цикл (с кратчайшим циклом) или граф больше max_bytes.
+        """
+        if len(data) > self.max_bytes:
+            raise ValueError(f"Graph is too large: {len(data)} bytes, limit {self.max_bytes}")
+        graph, _, _ = loads(data)
+        topological_frontiers(graph)
+        gid = graph_id(data)
+        with self._lock:
+            if gid in self._attached:
+                return gid
+            try:
+                shm = _open(segment_name(gid), create=True, size=len(data))
+            except FileExistsError:
+                # Тот же граф уже положил другой процесс — возможно, ещё пишет; байты те же, допишем сами
+                shm = _open(segment_name(gid))
+            shm.buf[:len(data)] = data
+            self._attach(gid, shm, verified=True)
+        return gid
+
+    def get(self, gid: str) -> Tuple[Graph, Sequence[int], int]:
+        """Граф, длительности и число машин из заголовка (0 — не задано). KeyError, если графа нет."""
+        name = segment_name(gid)
+        with self._lock:
+            try:
+                shm = _open(name)
+            except (FileNotFoundError, ValueError):
+                # Сегмент удалён, возможно другим воркером: забываем и своё отображение
+                self._attached.pop(gid, None)
+                raise KeyError(gid) from None
+            entry = self._attached.get(gid)
+            if entry is None:
+                entry = self._attach(gid, shm)
+            else:
+                shm.close()
+        return entry[1:]
+
+    def delete(self, gid: str) -> None:
+        """Удалить сегмент для всех процессов; уже выданные графы остаются рабочими. KeyError, если графа нет."""
+        with self._lock:
+            self._attached.pop(gid, None)
+            try:
+                # Без _open: unlink() сам снимает сегмент с учёта resource_tracker
+                shm = _Segment(segment_name(gid))
+            except (FileNotFoundError, ValueError):
+                raise KeyError(gid) from None
+            if not _holds(shm, gid):
+                # Чужой граф с тем же началом id: не удаляем и не оставляем resource_tracker
+                if os.name == "posix":
+                    resource_tracker.unregister(shm._name, "shared_memory")
+                shm.close()
+                raise KeyError(gid)
+            shm.unlink()
+
+    def _attach(self, gid: str, shm: SharedMemory,
+                verified: bool = False) -> Tuple[SharedMemory, Graph, Sequence[int], int]:
+        size = _data_size(shm.buf)
+        if size == 0 or size > shm.size:
+            shm.close()
+            raise KeyError(gid)
+        if not verified and not _holds(shm, gid):
+            shm.close()
+            raise KeyError(gid)
+        graph, durations, machines = loads(shm.buf[:size])
+        entry = self._attached[gid] = (shm, graph, durations, machines)
+        return entry
+
+    def __len__(self) -> int:
+        return len(self._attached)
@@ -5,6 +5,21 @@ from tests.test_coffman import TestCoffmanGraham
 from tests.test_fujii import TestFujiiScheduler
 from tests.test_sethi import TestSethiUllman
 from tests.test_gabow import TestGabowSCC
+from tests.test_common import TestGraph, TestScheduleResult
+from tests.test_simulation import TestListSchedule
+from tests.test_cache import TestScheduleCache
+from tests.test_registry import TestRegistry
+from tests.test_analytics import TestAnalytics
+from tests.test_session import TestSchedulingSession
+from tests.test_graphio import TestGraphIO
+from tests.test_render import TestRender
+from tests.test_components import TestComponents
+from tests.test_profiling import TestProfiling
+from tests.test_exact import TestExact
+from tests.test_reach import TestReach
+from tests.test_verify import TestVerify
+from tests.test_graphstore import TestGraphStore
+from tests.test_api import TestBatch, TestBinaryRoute, TestCacheRoute, TestExactRoute, TestFormats, TestGraphs, TestJobs, TestNdjson, TestPortfolio, TestProfilingRoutes, TestReduce, TestScheduleRoute, TestSessions
 
 def run_all_tests():
     loader = unittest.TestLoader()
@@ -15,6 +30,34 @@ def run_all_tests():
     suite.addTests(loader.loadTestsFromTestCase(TestFujiiScheduler))
     suite.addTests(loader.loadTestsFromTestCase(TestSethiUllman))
     suite.addTests(loader.loadTestsFromTestCase(TestGabowSCC))
+    suite.addTests(loader.loadTestsFromTestCase(TestGraph))
+    suite.addTests(loader.loadTestsFromTestCase(TestScheduleResult))
+    suite.addTests(loader.loadTestsFromTestCase(TestListSchedule))
+    suite.addTests(loader.loadTestsFromTestCase(TestScheduleCache))
+    suite.addTests(loader.loadTestsFromTestCase(TestRegistry))
+    suite.addTests(loader.loadTestsFromTestCase(TestAnalytics))
+    suite.addTests(loader.loadTestsFromTestCase(TestSchedulingSession))
+    suite.addTests(loader.loadTestsFromTestCase(TestGraphIO))
+    suite.addTests(loader.loadTestsFromTestCase(TestRender))
+    suite.addTests(loader.loadTestsFromTestCase(TestComponents))
+    suite.addTests(loader.loadTestsFromTestCase(TestProfiling))
+    suite.addTests(loader.loadTestsFromTestCase(TestExact))
+    suite.addTests(loader.loadTestsFromTestCase(TestReach))
+    suite.addTests(loader.loadTestsFromTestCase(TestVerify))
+    suite.addTests(loader.loadTestsFromTestCase(TestGraphStore))
+    suite.addTests(loader.loadTestsFromTestCase(TestBatch))
+    suite.addTests(loader.loadTestsFromTestCase(TestJobs))
+    suite.addTests(loader.loadTestsFromTestCase(TestScheduleRoute))
+    suite.addTests(loader.loadTestsFromTestCase(TestCacheRoute))
+    suite.addTests(loader.loadTestsFromTestCase(TestReduce))
+    suite.addTests(loader.loadTestsFromTestCase(TestProfilingRoutes))
+    suite.addTests(loader.loadTestsFromTestCase(TestFormats))
+    suite.addTests(loader.loadTestsFromTestCase(TestBinaryRoute))
+    suite.addTests(loader.loadTestsFromTestCase(TestExactRoute))
+    suite.addTests(loader.loadTestsFromTestCase(TestNdjson))
+    suite.addTests(loader.loadTestsFromTestCase(TestSessions))
+    suite.addTests(loader.loadTestsFromTestCase(TestPortfolio))
+    suite.addTests(loader.loadTestsFromTestCase(TestGraphs))
 
     runner = unittest.TextTestRunner(verbosity=2)
     result = runner.run(suite)
@@ -0,0 +1,172 @@
+"""
+Лёгкая инструментация горячих путей: времена фаз и счётчики.
+
+    with profiling.profiled() as profile:
+        coffman_graham_result(graph, durations, m)
+    profile.phases    # {"coffman.labels": 0.012, "coffman.assign": 0.004}
+    profile.counters  # {"coffman.heap_ops": 2000, ...}
+
+Вне profiled() активного профиля нет: phase() возвращает общий пустой
+контекст, а ядра проверяют active() один раз на вызов, поэтому
+выключенная инструментация стоит одного сравнения с None на фазу.
+Профиль хранится в ContextVar и виден в потоках пула FastAPI,
+но не в пуле процессов.
+"""
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional
+
+
+class Profile:
+    """Фазы (секунды, суммируются при повторе), счётчики (суммы) и пики (максимумы) одного запроса."""
+    __slots__ = ("phases", "counters", "peaks", "started", "_lap")
+
+    def __init__(self):
+        self.phases: Dict[str, float] = defaultdict(float)
+        self.counters: Dict[str, int] = defaultdict(int)
+        self.peaks: Dict[str, int] = {}
+        self.started = self._lap = time.perf_counter()
+
+    def add(self, name: str, value: int = 1) -> None:
+        self.counters[name] += value
+
+    def peak(self, name: str, value: int) -> None:
+        if value > self.peaks.get(name, 0):
+            self.peaks[name] = value
+
+    def lap(self, name: str) -> None:
+        """Записать фазу name длиной от предыдущего lap (или от создания профиля)."""
+        now = time.perf_counter()
+        self.phases[name] += now - self._lap
+        self._lap = now
+
+    def total(self, name: str = "total") -> None:
+        """Записать фазу name — всё время с создания профиля."""
+        self.phases[name] = time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        """Значение заголовка Server-Timing: фазы в миллисекундах."""
+        return ", ".join(f"{name};dur={seconds * 1000:.3f}" for name, seconds in self.phases.items())
+
+
+_active: ContextVar[Optional[Profile]] = ContextVar("profile", default=None)
+
+
+def active() -> Optional[Profile]:
+    return _active.get()
+
+
+class _Phase:
+    __slots__ = ("profile", "name", "start")
+
+    def __init__(self, profile: Profile, name: str):
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profile.phases[self.name] += time.perf_counter() - self.start
+        return False
+
+
+class _NullPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+def phase(name: str):
+    """Контекст, замеряющий фазу name в активном профиле; без профиля ничего не делает."""
+    profile = _active.get()
+    return _NULL_PHASE if profile is None else _Phase(profile, name)
+
+
+@contextmanager
+def profiled() -> Iterator[Profile]:
+    """Включить профилирование на время блока."""
+    profile = Profile()
+    token = _active.set(profile)
+    try:
+        yield profile
+    finally:
+        _active.reset(token)
+
+
+class Metrics:
+    """
+    Накопленные по процессу метрики в текстовом формате Prometheus:
+    суммы фаз и счётчиков из профилей, максимумы пиков, число запросов.
+    """
+
+    def __init__(self, prefix: str = "scheduler"):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._phase_seconds: Dict[str, float] = defaultdict(float)
+        self._phase_calls: Dict[str, int] = defaultdict(int)
+        self._counters: Dict[str, int] = defaultdict(int)
+        self._peaks: Dict[str, int] = {}
+        self._requests: Dict[tuple, int] = defaultdict(int)
+
+    def observe(self, profile: Profile, route: Optional[str] = None, status: Optional[int] = None) -> None:
+        with self._lock:
+            for name, seconds in profile.phases.items():
+                self._phase_seconds[name] += seconds
+                self._phase_calls[name] += 1
+            for name, value in profile.counters.items():
+                self._counters[name] += value
+            for name, value in profile.peaks.items():
+                if value > self._peaks.get(name, 0):
+                    self._peaks[name] = value
+            if route is not None:
+                self._requests[(route, status)] += 1
+
+    def render(self, extra: Optional[Dict[str, float]] = None) -> str:
+        """
+        Текст для /metrics; extra — дополнительные метрики без меток (имя без префикса → значение),
+        имена на _total выводятся как counter, остальные как gauge.
+        """
+        p = self.prefix
+        lines: List[str] = []
+
+        def family(name: str, kind: str, help_text: str, samples) -> None:
+            lines.append(f"# HELP {p}_{name} {help_text}")
+            lines.append(f"# TYPE {p}_{name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{p}_{name}{labels} {value}")
+
+        with self._lock:
+            family("phase_seconds_total", "counter", "Время в фазе, секунды",
+                   [(_labels(phase=k), v) for k, v in sorted(self._phase_seconds.items())])
+            family("phase_calls_total", "counter", "Число замеров фазы",
+                   [(_labels(phase=k), v) for k, v in sorted(self._phase_calls.items())])
+            family("events_total", "counter", "Счётчики горячих путей",
+                   [(_labels(name=k), v) for k, v in sorted(self._counters.items())])
+            family("peak", "gauge", "Максимум за время жизни процесса",
+                   [(_labels(name=k), v) for k, v in sorted(self._peaks.items())])
+            family("requests_total", "counter", "Запросы по маршруту и статусу",
+                   [(_labels(route=r, status=s), v) for (r, s), v in sorted(self._requests.items())])
+        for name, value in (extra or {}).items():
+            kind = "counter" if name.endswith("_total") else "gauge"
+            family(name, kind, name.replace("_", " "), [("", value)])
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
@@ -0,0 +1,66 @@
+from array import array
+from typing import Callable, Dict, List, Optional, Sequence
+
+import profiling
+from analytics import topological_frontiers
+
+from coffman import coffman_graham_result
+from common import Graph, ScheduleResult, Task, as_graph, durations_of
+from exact import exact_result
+from fujii import fujii_matching_result, fujii_result
+from sethi import sethi_ulman_result
+
+# Планировщик: (graph: Graph, durations по плотным индексам, m, frontiers) -> ScheduleResult;
+# frontiers — фронты Кана уже проверенного графа или None, тогда планировщик строит их сам
+Scheduler = Callable[[Graph, Sequence[int], int, Optional[List[array]]], ScheduleResult]
+
+ALGORITHMS: Dict[str, Scheduler] = {}
+
+
+def register(name: str):
+    """Декоратор: добавить планировщик в реестр под именем name."""
+    def decorator(fn: Scheduler) -> Scheduler:
+        if name in ALGORITHMS:
+            raise ValueError(f"Algorithm already registered: {name}")
+        ALGORITHMS[name] = fn
+        return fn
+    return decorator
+
+
+register("coffman")(coffman_graham_result)
+register("fujii")(fujii_result)
+register("fkn")(fujii_matching_result)
+register("sethi")(sethi_ulman_result)
+register("exact")(exact_result)
+
+
+def get_algorithm(name: str) -> Scheduler:
+    try:
+        return ALGORITHMS[name]
+    except KeyError:
+        raise KeyError(f"Unknown algorithm: {name}. Available: {', '.join(sorted(ALGORITHMS))}") from None
+
+
+def run_result(name: str, graph: Graph, durations: Sequence[int], m: int,
+               frontiers: Optional[List[array]] = None) -> ScheduleResult:
+    """
+    Проверить граф на циклы и запустить планировщик name.
+    frontiers — фронты Кана, если граф уже проверен при построении: тогда второго прохода нет.
+    Фронты проверки передаются планировщику, и он не повторяет проход Кана.
+    ValueError с кратчайшим циклом, если граф не ацикличен.
+    """
+    scheduler = get_algorithm(name)
+    if frontiers is None:
+        with profiling.phase("graph.validate"):
+            frontiers = topological_frontiers(graph)
+    return scheduler(graph, durations, m, frontiers)
+
+
+def run_algorithm(name: str, tasks: Dict[int, Task], precedence, m: int) -> List[List[Task]]:
+    """То же для Task-объектов: результат записывается в tasks и возвращается по машинам."""
+    graph = as_graph(precedence, tasks)
+    return run_result(name, graph, durations_of(tasks, graph), m).apply(tasks)
+
+
+def makespan(schedule: List[List[Task]]) -> int:
+    return max((task.end_time for machine in schedule for task in machine), default=0)
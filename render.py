@@ -0,0 +1,47 @@
+"""
+Ответы расписания без pydantic-моделей: JSON собирается строками прямо из Solved.
+Источник — строки (id, start, end, machine) из solved["schedule"], а не колонки ScheduleResult:
+Solved — то, что лежит в кэше (в том числе на диске), приходит из пула процессов и из фоновых
+задач, а колонок там нет. Строки собираются один раз при планировании, и попадание в кэш
+рендерится без пересборки; хранить рядом ещё и колонки значило бы держать расписание дважды.
+"""
+import json
+from typing import Any, Dict, Optional, Sequence
+
+JSON_MEDIA_TYPE = "application/json"
+COLUMNAR_MEDIA_TYPE = "application/vnd.schedule.columnar+json"
+
+_ROW = '{"id":%d,"start_time":%d,"end_time":%d,"machine":%d}'
+
+
+def _header(algorithm: Optional[str], makespan: Optional[int], lower_bound: Optional[int]) -> str:
+    return '"algorithm":%s,"makespan":%s,"lower_bound":%s' % (
+        json.dumps(algorithm), json.dumps(makespan), json.dumps(lower_bound))
+
+
+def _ints(values: Sequence[int]) -> str:
+    return ",".join(map(str, values))
+
+
+def schedule_json(algorithm: Optional[str], solved: Dict[str, Any]) -> bytes:
+    """
+    Тот же JSON, что у ScheduleResponse, но напрямую из сырых строк расписания:
+    без TaskOutput на каждую задачу и без валидации модели.
+    """
+    machines = ",".join("[" + ",".join([_ROW % row for row in rows]) + "]" for rows in solved["schedule"])
+    return ('{"schedule":[%s],%s}' % (
+        machines, _header(algorithm, solved.get("makespan"), solved.get("lower_bound")))).encode()
+
+
+def schedule_columnar(algorithm: Optional[str], solved: Dict[str, Any]) -> bytes:
+    """
+    Колоночный JSON: по машине три массива вместо объекта на задачу,
+    {"schedule": [{"machine": i, "ids": [...], "starts": [...], "ends": [...]}], ...}.
+    """
+    machines = []
+    for machine, rows in enumerate(solved["schedule"]):
+        ids, starts, ends = ((), (), ()) if not rows else tuple(zip(*rows))[:3]
+        machines.append('{"machine":%d,"ids":[%s],"starts":[%s],"ends":[%s]}' % (
+            machine, _ints(ids), _ints(starts), _ints(ends)))
+    return ('{"schedule":[%s],%s}' % (
+        ",".join(machines), _header(algorithm, solved.get("makespan"), solved.get("lower_bound")))).encode()
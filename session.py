@@ -0,0 +1,559 @@
+import heapq
+from array import array
+from bisect import bisect_left
+from fractions import Fraction
+from itertools import accumulate, chain, repeat
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from analytics import bottom_levels
+from coffman import assign_in_order, coffman_graham_labels
+from common import Graph, GraphBuilder, ScheduleResult
+from fujii import fujii_priority
+from simulation import simulate
+
+SESSION_ALGORITHMS = ("fujii", "coffman")
+
+INFINITY = float("inf")
+# Знаменатель дробной метки, после которого метки пересчитываются заново целыми
+MAX_LABEL_DENOMINATOR = 2**20
+# Если пересчитывать нужно больше 1/AFFECTED_SHARE вершин, метки строятся заново
+AFFECTED_SHARE = 4
+
+
+class SchedulingSession:
+    """
+    Расписание, которое меняется дельтами вместо полного пересчёта; результат тот же,
+    что у fujii_result / coffman_graham_result на текущем графе.
+
+    fujii — событийный list-scheduling (simulation.simulate) с ключом fujii.fujii_priority:
+    (длительность, −хвост, id), хвост — критический путь до стока. Дельта пересчитывает
+    хвосты от изменённых вершин вверх, пока они меняются, и вычисляет момент t0, до
+    которого решения старого расписания заведомо не меняются: самый ранний момент
+    готовности задачи с новым приоритетом или новыми предками. Задачи, стартовавшие
+    раньше t0, остаются на месте, моделирование продолжается с t0 с теми же занятыми машинами.
+
+    coffman — назначение coffman.assign_in_order по убыванию меток Coffman–Graham.
+    Назначение последовательное, поэтому у старой и новой очереди общее начало
+    (пока в нём нет задач с новой длительностью или новыми предками) назначается
+    так же; дельта продолжает назначение с первой отличающейся задачи.
+    Метки не зависят от длительностей и пересчитываются только при изменении
+    структуры, и только у изменившихся вершин и их предков: порядок остальных
+    (множество, замкнутое по потомкам) в Coffman–Graham нового графа тот же, что и
+    в старом. Пересчитанные вершины вливаются в старый порядок тем же выбором
+    по наименьшему ключу и получают дробные метки между соседями.
+
+    Строки расписания хранятся по машинам в порядке старта, поэтому дельта
+    отрезает на каждой машине хвост бисекцией и трогает только его.
+    Дельты копятся и применяются при первом обращении к result().
+    Удаление задачи удаляет и её рёбра, транзитивных рёбер взамен не добавляется.
+    Сессия не потокобезопасна: одновременные дельты и чтения разводит вызывающий.
+    """
+
+    def __init__(self, durations: Dict[Hashable, int], precedence: Dict[Hashable, Iterable[Hashable]],
+                 m: int = 2, algorithm: str = "fujii"):
+        if algorithm not in SESSION_ALGORITHMS:
+            raise ValueError(f"Unknown session algorithm: {algorithm}")
+        if m < 1:
+            raise ValueError("No solution: at least one machine is required")
+        self.m = m
+        self.algorithm = algorithm
+
+        self._ids: List[Hashable] = []
+        self._index: Dict[Hashable, int] = {}
+        self._alive = bytearray()
+        self._succ: List[set] = []
+        self._pred: List[set] = []
+        self._duration = array("q")
+        self._start = array("q")
+        self._end = array("q")
+        self._machine = array("q")
+        # Строки машин в порядке старта: задачи, старты, концы
+        self._rows = [array("q") for _ in range(m)]
+        self._row_starts = [array("q") for _ in range(m)]
+        self._row_ends = [array("q") for _ in range(m)]
+        # fujii: хвосты, ключи очереди готовых, ещё не запланированные задачи
+        self._tail = array("q")
+        self._priority: list = []
+        self._unscheduled: List[int] = []
+        self._dirty_from = INFINITY
+        # coffman: метки, задачи по возрастанию метки, вершины с изменившимися потомками,
+        # очередь последнего назначения и задачи с новой длительностью или новыми предками
+        self._label: list = []
+        self._by_label: Optional[list] = None
+        self._changed: Set[int] = set()
+        self._removed: List[int] = []
+        self._labels_stale = False
+        self._assigned: Optional[list] = None
+        self._inputs_changed: Set[int] = set()
+
+        for node, duration in durations.items():
+            self._new_node(node, duration)
+        for u, vs in precedence.items():
+            for v in vs:
+                self._link(self._require(u), self._require(v))
+
+        if algorithm == "fujii":
+            graph, alive = self._graph()
+            tails = bottom_levels(graph, array("q", map(self._duration.__getitem__, alive)))
+            for k, i in enumerate(alive):
+                self._tail[i] = tails[k]
+                self._priority[i] = fujii_priority(self._duration[i], tails[k], self._ids[i])
+            self._dirty_from = 0
+        else:
+            self._labels_stale = True
+        self._result: Optional[ScheduleResult] = None
+        self.result()
+
+    # --- дельты ---------------------------------------------------------------
+
+    def add_task(self, node: Hashable, duration: int = 1, predecessors: Iterable[Hashable] = (),
+                 successors: Iterable[Hashable] = ()) -> None:
+        if node in self._index and self._alive[self._index[node]]:
+            raise ValueError(f"Duplicate task id: {node}")
+        preds = [self._require(p) for p in predecessors]
+        succs = [self._require(s) for s in successors]
+        # Новая вершина замкнёт цикл, только если кто-то из потомков достижим до предка
+        if preds and succs and self._reaches(succs, set(preds)):
+            raise ValueError(f"Cycle detected through task {node}")
+
+        t0 = min([self._ready_time(s) for s in succs] + [self._max_end(preds)])
+        i = self._new_node(node, duration)
+        for p in preds:
+            self._link(p, i)
+        for s in succs:
+            self._link(i, s)
+        self._changed.update(preds)
+        self._changed.add(i)
+        self._inputs_changed.add(i)
+        self._inputs_changed.update(succs)
+        self._touch(t0, [i], structural=True)
+
+    def remove_task(self, node: Hashable) -> None:
+        i = self._require(node)
+        succs = list(self._succ[i])
+        preds = list(self._pred[i])
+        for p in preds:
+            self._unlink(p, i)
+        for s in succs:
+            self._unlink(i, s)
+        # Без i потомки готовы не позже, чем раньше: момент считается уже по оставшимся предкам
+        t0 = min([self._started(i)] + [self._ready_time(s) for s in succs])
+        self._alive[i] = 0
+        self._changed.update(preds)
+        self._removed.append(i)
+        self._inputs_changed.update(succs)
+        self._touch(t0, preds, structural=True)
+
+    def set_duration(self, node: Hashable, duration: int) -> None:
+        i = self._require(node)
+        if self._duration[i] == duration:
+            return
+        self._duration[i] = duration
+        # Длительность входит в ключ fujii и в хвосты предков: решения меняются с момента готовности задачи
+        self._inputs_changed.add(i)
+        self._touch(self._ready_time(i), [i], structural=False)
+
+    def add_edge(self, u: Hashable, v: Hashable) -> None:
+        ui, vi = self._require(u), self._require(v)
+        if vi in self._succ[ui]:
+            return
+        if ui == vi or self._reaches([vi], {ui}):
+            raise ValueError(f"Cycle detected: {v} already precedes {u}")
+        t0 = self._ready_time(vi)
+        self._link(ui, vi)
+        self._changed.add(ui)
+        self._inputs_changed.add(vi)
+        self._touch(t0, [ui], structural=True)
+
+    def remove_edge(self, u: Hashable, v: Hashable) -> None:
+        ui, vi = self._require(u), self._require(v)
+        if vi not in self._succ[ui]:
+            raise ValueError(f"Unknown edge: {u} -> {v}")
+        self._unlink(ui, vi)
+        t0 = self._ready_time(vi)
+        self._changed.add(ui)
+        self._inputs_changed.add(vi)
+        self._touch(t0, [ui], structural=True)
+
+    def apply(self, change: dict) -> None:
+        """Применить дельту в виде словаря {"op": ..., ...} (формат PATCH API)."""
+        op = change.get("op")
+        if op == "add_task":
+            self.add_task(change["id"], change.get("duration", 1),
+                          change.get("predecessors", ()), change.get("successors", ()))
+        elif op == "remove_task":
+            self.remove_task(change["id"])
+        elif op == "set_duration":
+            self.set_duration(change["id"], change["duration"])
+        elif op == "add_edge":
+            self.add_edge(change["source"], change["target"])
+        elif op == "remove_edge":
+            self.remove_edge(change["source"], change["target"])
+        else:
+            raise ValueError(f"Unknown change op: {op}")
+
+    # --- расписание -----------------------------------------------------------
+
+    def result(self) -> ScheduleResult:
+        if self._result is None:
+            if self.algorithm == "fujii":
+                if self._dirty_from != INFINITY:
+                    self._reschedule(self._dirty_from)
+                    self._dirty_from = INFINITY
+            else:
+                if self._labels_stale:
+                    self._relabel()
+                if self._by_label is not self._assigned or self._inputs_changed:
+                    self._reassign()
+            # Колонки — склейка строк машин, без сортировки
+            task = array("q")
+            start = array("q")
+            end = array("q")
+            for k in range(self.m):
+                task.extend(self._rows[k])
+                start.extend(self._row_starts[k])
+                end.extend(self._row_ends[k])
+            counts = list(map(len, self._rows))
+            machine = array("q", chain.from_iterable(map(repeat, range(self.m), counts)))
+            offsets = array("q", accumulate(chain((0,), counts)))
+            self._result = ScheduleResult(self._ids, self.m, task, start, end, machine, offsets)
+        return self._result
+
+    @property
+    def makespan(self) -> int:
+        return self.result().makespan
+
+    def __len__(self) -> int:
+        return sum(self._alive)
+
+    def _reschedule(self, t0) -> None:
+        """fujii: оставить задачи со стартом раньше t0 и доиграть моделирование с момента t0."""
+        alive, start, end, machine, duration = self._alive, self._start, self._end, self._machine, self._duration
+        pred, succ = self._pred, self._succ
+
+        # На машине до t0 может ещё идти только последняя из начавшихся задач;
+        # её конец пересчитывается — у неё могла измениться длительность
+        pending = [i for i in self._unscheduled if alive[i]]
+        self._unscheduled = []
+        running = []
+        for k in range(self.m):
+            rows, starts, ends = self._rows[k], self._row_starts[k], self._row_ends[k]
+            cut = bisect_left(starts, t0)
+            pending.extend(i for i in rows[cut:] if alive[i])
+            del rows[cut:], starts[cut:], ends[cut:]
+            if cut:
+                last = rows[cut - 1]
+                end[last] = ends[cut - 1] = start[last] + duration[last]
+                if end[last] > t0:
+                    running.append((end[last], k, last))
+
+        # Невыполненные к t0 предки: ещё не начавшиеся (или новые) и ещё идущие
+        indegree = {}
+        ready = []
+        for i in pending:
+            count = 0
+            for p in pred[i]:
+                if machine[p] < 0 or start[p] >= t0 or end[p] > t0:
+                    count += 1
+            indegree[i] = count
+            if count == 0:
+                ready.append(i)
+        for i in pending:
+            # Старый старт не должен сойти за зафиксированный, пока задача ждёт запуска
+            machine[i] = -1
+
+        simulate(succ.__getitem__, indegree, duration, self.m, self._priority, len(pending),
+                 ready, start, end, machine, time=t0, running=running)
+
+        # Запуски идут по неубыванию времени: дописываем хвосты машин в этом порядке
+        pending.sort(key=lambda i: (start[i], end[i]))
+        self._append_rows(pending)
+
+    def _update_tails(self, seeds: Iterable[int]) -> None:
+        """fujii: пересчитать хвосты от seeds вверх, пока они меняются; t0 — готовность задач с новым ключом."""
+        alive, duration, tail, succ, pred, ids = (self._alive, self._duration, self._tail,
+                                                  self._succ, self._pred, self._ids)
+        stack = list(seeds)
+        while stack:
+            v = stack.pop()
+            if not alive[v]:
+                continue
+            value = duration[v] + max(map(tail.__getitem__, succ[v]), default=0)
+            priority = fujii_priority(duration[v], value, ids[v])
+            if priority == self._priority[v]:
+                continue
+            self._priority[v] = priority
+            self._dirty_from = min(self._dirty_from, self._ready_time(v))
+            if value != tail[v]:
+                tail[v] = value
+                stack.extend(pred[v])
+
+    def _reassign(self) -> None:
+        """coffman: оставить назначенное общее начало старой и новой очереди, остальное назначить заново."""
+        order, label, alive = self._by_label, self._label, self._alive
+        n = len(order)
+        # Очередь идёт с конца order — от старших меток
+        keep = _common_suffix(self._assigned, order) if self._assigned is not None else 0
+        key = label.__getitem__
+        for t in self._inputs_changed:
+            if alive[t]:
+                keep = min(keep, n - 1 - bisect_left(order, label[t], key=key))
+
+        # На каждой машине строки идут в порядке очереди: сохранённые — её начало
+        free = []
+        lowest = label[order[n - keep]] if keep else None
+        for k in range(self.m):
+            rows, starts, ends = self._rows[k], self._row_starts[k], self._row_ends[k]
+            cut = bisect_left(rows, True, key=lambda t: not (alive[t] and label[t] >= lowest)) if keep else 0
+            del rows[cut:], starts[cut:], ends[cut:]
+            free.append(ends[-1] if cut else 0)
+
+        pending = order[:n - keep][::-1]
+        assign_in_order(pending, self._duration, self._pred.__getitem__, self.m,
+                        self._start, self._end, self._machine, free)
+        self._append_rows(pending)
+        self._assigned = order
+        self._inputs_changed = set()
+        self._unscheduled = []
+
+    def _append_rows(self, tasks: Iterable[int]) -> None:
+        start, end, machine = self._start, self._end, self._machine
+        for i in tasks:
+            k = machine[i]
+            self._rows[k].append(i)
+            self._row_starts[k].append(start[i])
+            self._row_ends[k].append(end[i])
+
+    def _relabel(self) -> None:
+        """Пересчитать метки Coffman–Graham у изменившихся вершин и их предков."""
+        self._labels_stale = False
+        alive, label = self._alive, self._label
+        changed = [i for i in self._changed if alive[i]]
+        removed = self._removed
+        self._changed = set()
+        self._removed = []
+        if self._by_label is None:
+            self._relabel_all()
+            return
+
+        # Изменившиеся вершины и все их предки: только их ключи могли стать другими
+        affected = set(changed)
+        stack = list(changed)
+        while stack:
+            for p in self._pred[stack.pop()]:
+                if p not in affected:
+                    affected.add(p)
+                    stack.append(p)
+
+        # Если затронута заметная часть графа, слияние не дешевле пересчёта с нуля
+        if AFFECTED_SHARE * len(affected) > len(self._by_label):
+            self._relabel_all()
+            return
+
+        # Старый порядок без них и без удалённых
+        order = self._by_label
+        key = label.__getitem__
+        cuts = sorted(bisect_left(order, label[i], key=key) for i in chain(affected, removed)
+                      if label[i] is not None)
+        bounds = zip(chain((-1,), cuts), chain(cuts, (len(order),)))
+        base = list(chain.from_iterable(order[a + 1:b] for a, b in bounds))
+        if not affected:
+            self._by_label = base
+            return
+
+        ids, succ, pred = self._ids, self._succ, self._pred
+
+        def sort_key(i):
+            return tuple(sorted(map(key, succ[i]), reverse=True)), ids[i]
+
+        # Вершина готова, когда помечены все её потомки: пересчитываемые — по счётчику,
+        # остальные — когда слияние дошло до старшего из них
+        remaining = {}
+        after = {}
+        for a in affected:
+            remaining[a] = sum(1 for s in succ[a] if s in affected)
+            after[a] = max((label[s] for s in succ[a] if s not in affected), default=None)
+        first = min((after[a] for a in affected if remaining[a] == 0 and after[a] is not None), default=None)
+        if any(remaining[a] == 0 and after[a] is None for a in affected) or first is None:
+            position = 0
+        else:
+            position = bisect_left(base, first, key=key) + 1
+        start = position
+        last = label[base[position - 1]] if position else None
+
+        available = []
+        waiting = []
+
+        def release(a):
+            if after[a] is None or (last is not None and after[a] <= last):
+                heapq.heappush(available, (sort_key(a), a))
+            else:
+                heapq.heappush(waiting, (after[a], a))
+
+        for a in affected:
+            if remaining[a] == 0:
+                release(a)
+
+        merged = []
+        gap = 0
+        left = len(affected)
+        x = x_key = None
+        while left:
+            while waiting and last is not None and waiting[0][0] <= last:
+                a = heapq.heappop(waiting)[1]
+                heapq.heappush(available, (sort_key(a), a))
+            if not available and waiting:
+                # Выбирать не из чего: старый порядок переносится целиком до ближайшего ожидаемого потомка
+                stop = bisect_left(base, waiting[0][0], lo=position, key=key) + 1
+                merged.extend(base[position:stop])
+                last = label[base[stop - 1]]
+                position = stop
+                gap = 0
+                x = None
+                continue
+            if x is None and position < len(base):
+                x = base[position]
+                x_key = sort_key(x)
+            if available and (x is None or available[0][0] < x_key):
+                a = heapq.heappop(available)[1]
+                gap += 1
+                label[a] = self._between(last, label[x] if x is not None else None, gap)
+                merged.append(a)
+                left -= 1
+                for p in pred[a]:
+                    if p in affected:
+                        remaining[p] -= 1
+                        if remaining[p] == 0:
+                            release(p)
+            elif x is not None:
+                merged.append(x)
+                last = label[x]
+                position += 1
+                gap = 0
+                x = None
+            else:
+                raise ValueError("Граф содержит цикл!")
+
+        self._by_label = order = base[:start] + merged + base[position:]
+        if any(type(label[a]) is Fraction and label[a].denominator > MAX_LABEL_DENOMINATOR for a in affected):
+            # Дроби измельчились: те же места, целые метки; порядок не меняется
+            for k, i in enumerate(order, 1):
+                label[i] = k
+
+    @staticmethod
+    def _between(low, high, k: int):
+        """k-я метка между соседями low и high (любой из них может отсутствовать)."""
+        if low is None:
+            low = high - 1 if high is not None else 0
+        if high is None:
+            high = low + 1
+        value = low + (high - low) * Fraction(k, k + 1)
+        return value.numerator if value.denominator == 1 else value
+
+    def _relabel_all(self) -> None:
+        """Метки с нуля, целые, с теми же равенствами по id, что и в coffman_graham_labels."""
+        graph, alive = self._graph()
+        labels = coffman_graham_labels(graph)
+        order = [0] * len(alive)
+        for k, i in enumerate(alive):
+            self._label[i] = labels[k]
+            order[labels[k] - 1] = i
+        self._by_label = order
+
+    # --- служебное ------------------------------------------------------------
+
+    def _graph(self) -> Tuple[Graph, List[int]]:
+        """Текущий граф с id задач (как у полного планировщика) и его вершины по порядку."""
+        alive = [i for i in range(len(self._ids)) if self._alive[i]]
+        dense = dict(zip(alive, range(len(alive))))
+        succ = [self._succ[i] for i in alive]
+        builder = GraphBuilder()
+        builder.ids = [self._ids[i] for i in alive]
+        builder.index = dict(zip(builder.ids, range(len(alive))))
+        # Последователи хранятся множествами: повторных рёбер нет
+        builder._src = array("q", chain.from_iterable(map(repeat, range(len(alive)), map(len, succ))))
+        builder._dst = array("q", map(dense.__getitem__, chain.from_iterable(succ)))
+        builder._unique = True
+        return builder.build(), alive
+
+    def _new_node(self, node: Hashable, duration: int) -> int:
+        if node in self._index and self._alive[self._index[node]]:
+            raise ValueError(f"Duplicate task id: {node}")
+        i = len(self._ids)
+        self._ids.append(node)
+        self._index[node] = i
+        self._alive.append(1)
+        self._succ.append(set())
+        self._pred.append(set())
+        self._duration.append(duration)
+        self._start.append(0)
+        self._end.append(0)
+        self._machine.append(-1)
+        self._tail.append(0)
+        self._priority.append(None)
+        self._label.append(None)
+        self._unscheduled.append(i)
+        return i
+
+    def _require(self, node: Hashable) -> int:
+        i = self._index.get(node)
+        if i is None or not self._alive[i]:
+            raise ValueError(f"Unknown task id: {node}")
+        return i
+
+    def _link(self, u: int, v: int) -> None:
+        self._succ[u].add(v)
+        self._pred[v].add(u)
+
+    def _unlink(self, u: int, v: int) -> None:
+        self._succ[u].discard(v)
+        self._pred[v].discard(u)
+
+    def _reaches(self, sources: List[int], targets: set) -> bool:
+        stack = list(sources)
+        seen = set(stack)
+        while stack:
+            u = stack.pop()
+            if u in targets:
+                return True
+            for v in self._succ[u]:
+                if v not in seen:
+                    seen.add(v)
+                    stack.append(v)
+        return False
+
+    def _started(self, i: int):
+        # Ещё не запланированная задача (добавлена после последнего пересчёта) ни на что не влияла
+        return self._start[i] if self._machine[i] >= 0 else INFINITY
+
+    def _max_end(self, nodes: Iterable[int]) -> int:
+        return max((self._end[p] for p in nodes if self._machine[p] >= 0), default=0)
+
+    def _ready_time(self, i: int) -> int:
+        """Момент, когда задача стала готовой в текущем (старом) расписании."""
+        return self._max_end(self._pred[i])
+
+    def _touch(self, t0, seeds: Iterable[int], structural: bool) -> None:
+        self._result = None
+        if self.algorithm == "fujii":
+            self._dirty_from = min(self._dirty_from, t0)
+            self._update_tails(seeds)
+        elif structural:
+            self._labels_stale = True
+
+
+def _common_suffix(a: list, b: list) -> int:
+    """Длина общего конца двух списков: галопом по удвоению, затем бисекцией по длине."""
+    limit = min(len(a), len(b))
+    low, high = 0, 1
+    while high <= limit and a[len(a) - high:] == b[len(b) - high:]:
+        low, high = high, high * 2
+    high = min(high, limit + 1)
+    # a и b совпадают в последних low элементах и расходятся в последних high
+    while high - low > 1:
+        middle = (low + high) // 2
+        if a[len(a) - middle:len(a) - low] == b[len(b) - middle:len(b) - low]:
+            low = middle
+        else:
+            high = middle
+    return low
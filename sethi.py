@@ -1,40 +1,85 @@
-from common import Task, get_graph
-from typing import List, Dict
-
-def sethi_ulman_schedule(succ: Dict[int, set[int]], pred: Dict[int, set[int]]) -> List[int]:
-    # Кэш для подсчёта register need
-    reg_need_cache = {}
-
-    def register_need(node: int) -> int:
-        if node in reg_need_cache:
-            return reg_need_cache[node]
-        if not succ.get(node):  # лист — нет потомков
-            reg_need_cache[node] = 1
-        else:
-            reg_need_cache[node] = max(register_need(child) for child in succ[node]) + 1
-        return reg_need_cache[node]
-
-    remaining = set(succ.keys()) | set(pred.keys())
-    schedule = []
+import heapq
+from array import array
+
+import profiling
+from analytics import bottom_levels
+from common import Graph, ScheduleResult, Task, as_graph, durations_of, get_graph
+from simulation import list_schedule
+from typing import List, Dict, Optional, Union
+
+
+def register_needs(graph: Graph, frontiers: Optional[List[array]] = None) -> array:
+    """
+    register need по плотным индексам: лист (нет потомков) — 1, иначе max по потомкам + 1.
+    Это нижний уровень графа с единичными весами (analytics.bottom_levels),
+    считается без рекурсии; цикл даёт ValueError.
+    """
+    return bottom_levels(graph, array("q", [1]) * len(graph), frontiers)
+
 
-    while remaining:
-        # Найти листья (у которых либо нет succ, либо все succ уже в расписании)
-        leaves = [
-            task for task in remaining
-            if not succ.get(task) or succ[task].issubset(schedule)
-        ]
-        if not leaves:
-            raise ValueError("Граф содержит цикл!")
+def sethi_ulman_schedule(succ: Union[Dict[int, set[int]], Graph],
+                         pred: Optional[Dict[int, set[int]]] = None,
+                         frontiers: Optional[List[array]] = None) -> List[int]:
+    """
+    Порядок Sethi–Ulman: на каждом шаге берётся лист (все его succ уже
+    в расписании) с минимальным register need, при равенстве — с меньшим id.
+    Листья лежат в куче, счётчики непоставленных succ заменяют проверку
+    подмножеств: O((n + e) log n).
+    succ — словарь или common.Graph (тогда pred не нужен); frontiers — фронты Кана этого графа.
+    """
+    graph = as_graph(succ, pred or ())
+    ids = graph.ids
+    predecessors = graph.predecessors
 
-        # Выбрать leaf с минимальным register_need
-        leaves.sort(key=register_need)
-        chosen = leaves[0]
+    with profiling.phase("sethi.needs"):
+        need = register_needs(graph, frontiers)
+    remaining = graph.out_degrees()
+    leaves = [(need[i], ids[i], i) for i in range(len(ids)) if remaining[i] == 0]
+    heapq.heapify(leaves)
+    initial = len(leaves)
 
-        schedule.append(chosen)
-        remaining.remove(chosen)
+    schedule = []
+    while leaves:
+        _, node, i = heapq.heappop(leaves)
+        schedule.append(node)
+        for p in predecessors(i):
+            remaining[p] -= 1
+            if remaining[p] == 0:
+                heapq.heappush(leaves, (need[p], ids[p], p))
 
+    profile = profiling.active()
+    if profile is not None:
+        profile.add("sethi.heap_ops", 2 * len(schedule) - initial)
     return schedule
 
+
+def sethi_ulman_result(graph: Graph, durations, m: int = 2, frontiers: Optional[List[array]] = None) -> ScheduleResult:
+    """
+    Расписание на m машинах по порядку Sethi–Ulman, graph — ребро i -> j: i предшествует j.
+    Здесь "листья" — задачи без предшественников, поэтому порядок строится
+    по обращённому графу и служит приоритетом для simulation.list_schedule.
+    """
+    ids = graph.ids
+    index = graph.index
+    with profiling.phase("sethi.order"):
+        # Фронты в обратном порядке — топологическое разбиение обращённого графа
+        order = sethi_ulman_schedule(graph.reverse(), frontiers=frontiers[::-1] if frontiers else None)
+        priority = [0] * len(ids)
+        for position, node in enumerate(order):
+            priority[index[node]] = position
+    with profiling.phase("sethi.simulate"):
+        start, end, machine = list_schedule(graph, durations, m, priority)
+    return ScheduleResult.from_arrays(ids, m, start, end, machine)
+
+
+def sethi_ulman_scheduler(tasks, precedence, m=2):
+    """
+    tasks: dict[int, Task]
+    precedence: dict[int, set[int]] или common.Graph (ребро i -> j: i предшествует j)
+    """
+    graph = as_graph(precedence, tasks)
+    return sethi_ulman_result(graph, durations_of(tasks, graph), m).apply(tasks)
+
 if __name__ == '__main__':
     tasks = {
         1: Task(1),
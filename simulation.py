@@ -0,0 +1,91 @@
+import heapq
+from array import array
+from typing import Callable, Iterable, MutableSequence, Sequence, Tuple
+
+import profiling
+from common import Graph
+
+
+def list_schedule(graph: Graph, durations: Sequence[int], m: int,
+                  priority: Sequence) -> Tuple[array, array, array]:
+    """
+    Событийное ядро list-scheduling по плотным индексам графа.
+      durations[i] — длительность задачи i
+      priority[i]  — ключ очереди готовых задач, меньший ключ запускается раньше
+    Время перескакивает от одного завершения к следующему, пустых тактов нет:
+    куча событий (end, machine, task), куча свободных машин и счётчики
+    невыполненных предков вместо проверок подмножеств.
+    Возвращает массивы start, end, machine, индексированные задачами.
+    """
+    n = len(graph)
+    indegree = graph.in_degrees()
+
+    start = array("q", [0]) * n
+    end = array("q", [0]) * n
+    machine = array("q", [-1]) * n
+
+    ready = [i for i in range(n) if indegree[i] == 0]
+    simulate(graph.successors, indegree, durations, m, priority, n, ready, start, end, machine)
+    return start, end, machine
+
+
+def simulate(successors: Callable[[int], Iterable[int]], indegree: MutableSequence[int],
+             durations: Sequence[int], m: int, priority: Sequence, pending: int,
+             ready: Iterable[int], start: MutableSequence[int], end: MutableSequence[int],
+             machine: MutableSequence[int], time: int = 0, running: Iterable[Tuple[int, int, int]] = ()) -> None:
+    """
+    Цикл событий list_schedule, вынесенный для продолжения с середины расписания.
+      ready   — задачи, у которых к моменту time нет невыполненных предков
+      running — уже идущие задачи (end, machine, task): их машины заняты, завершения впереди
+      pending — сколько задач ещё должно быть запущено
+    indegree, start, end, machine меняются на месте. ValueError, если запустить все pending нельзя.
+    """
+    profile = profiling.active()
+    ready = [(priority[i], i) for i in ready]
+    heapq.heapify(ready)
+    initially_ready = ready_peak = len(ready)
+    events = list(running)
+    heapq.heapify(events)
+    initially_running = len(events)
+    busy = {mach for _, mach, _ in events}
+    free = [i for i in range(m) if i not in busy]
+    launched = 0
+
+    while True:
+        if profile is not None and len(ready) > ready_peak:
+            ready_peak = len(ready)
+
+        # Раздаём готовые задачи свободным машинам
+        while ready and free:
+            _, t = heapq.heappop(ready)
+            mach = heapq.heappop(free)
+            finish = time + durations[t]
+            start[t] = time
+            end[t] = finish
+            machine[t] = mach
+            launched += 1
+            heapq.heappush(events, (finish, mach, t))
+
+        if not events:
+            break
+
+        # Переходим сразу к ближайшему завершению и снимаем все события этого момента
+        time = events[0][0]
+        while events and events[0][0] == time:
+            _, mach, t = heapq.heappop(events)
+            heapq.heappush(free, mach)
+            for v in successors(t):
+                indegree[v] -= 1
+                if indegree[v] == 0:
+                    heapq.heappush(ready, (priority[v], v))
+
+    if profile is not None:
+        completed = launched + initially_running
+        profile.add("simulate.events", completed)
+        # Куча готовых: push всех, кроме изначально готовых, и pop каждого запуска;
+        # куча событий и куча свободных машин: по push и pop на запуск и завершение
+        profile.add("simulate.heap_ops", (launched - initially_ready) + launched + 2 * (launched + completed))
+        profile.peak("simulate.ready_peak", ready_peak)
+
+    if launched < pending:
+        raise ValueError("Граф содержит цикл!")
@@ -0,0 +1,30 @@
+import verify
+from array import array
+from itertools import accumulate, chain
+from common import ScheduleResult, as_graph, durations_of
+
+def check_schedule(test, graph, durations, result, m):
+    test.assertEqual(result.m, m)
+    verify.check_schedule(graph, durations, result)
+
+def rows_result(graph, rows):
+    # Колонки ScheduleResult из строк (id, start, end) по машинам, упорядоченных по старту
+    flat = list(chain.from_iterable(rows))
+    return ScheduleResult(graph.ids, len(rows),
+                          array("q", [graph.index[row[0]] for row in flat]),
+                          array("q", [row[1] for row in flat]),
+                          array("q", [row[2] for row in flat]),
+                          array("q", chain.from_iterable([i] * len(r) for i, r in enumerate(rows))),
+                          array("q", accumulate(chain((0,), map(len, rows)))))
+
+def response_result(graph, body):
+    # То же для JSON-ответа ScheduleResponse
+    return rows_result(graph, [[(t["id"], t["start_time"], t["end_time"]) for t in machine]
+                               for machine in body["schedule"]])
+
+def check_task_schedule(test, tasks, precedence, schedule, m):
+    # Старый интерфейс — списки Task по машинам: те же проверки по колонкам ScheduleResult
+    graph = as_graph(precedence, tasks)
+    rows = [[(t.id, t.start_time, t.end_time) for t in sorted(machine, key=lambda t: t.start_time)]
+            for machine in schedule]
+    check_schedule(test, graph, durations_of(tasks, graph), rows_result(graph, rows), m)
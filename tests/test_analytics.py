@@ -0,0 +1,50 @@
+import unittest
+from analytics import (bottom_levels, descendant_counts, levels, makespan_lower_bound,
+                       top_levels, topological_frontiers)
+from common import build_graph
+
+class TestAnalytics(unittest.TestCase):
+    def setUp(self):
+        #     1   2
+        #    / \ /
+        #   3   4
+        #    \ /
+        #     5
+        self.graph = build_graph({1: {3, 4}, 2: {4}, 3: {5}, 4: {5}})
+        self.durations = [0] * len(self.graph)
+        for node, d in {1: 2, 2: 1, 3: 3, 4: 1, 5: 2}.items():
+            self.durations[self.graph.index[node]] = d
+
+    def by_id(self, values):
+        return {self.graph.ids[i]: v for i, v in enumerate(values)}
+
+    def test_frontiers_and_levels(self):
+        frontiers = topological_frontiers(self.graph)
+        self.assertEqual([sorted(self.graph.ids[i] for i in f) for f in frontiers], [[1, 2], [3, 4], [5]])
+        self.assertEqual(self.by_id(levels(self.graph)), {1: 0, 2: 0, 3: 1, 4: 1, 5: 2})
+
+    def test_critical_paths(self):
+        self.assertEqual(self.by_id(top_levels(self.graph, self.durations)), {1: 0, 2: 0, 3: 2, 4: 2, 5: 5})
+        self.assertEqual(self.by_id(bottom_levels(self.graph, self.durations)), {1: 7, 2: 4, 3: 5, 4: 3, 5: 2})
+
+    def test_descendant_counts(self):
+        self.assertEqual(self.by_id(descendant_counts(self.graph)), {1: 3, 2: 2, 3: 1, 4: 1, 5: 0})
+
+    def test_lower_bound(self):
+        # Критический путь 1→3→5 = 7, работа 9: на 1 машине граница — работа
+        self.assertEqual(makespan_lower_bound(self.graph, self.durations, 2), 7)
+        self.assertEqual(makespan_lower_bound(self.graph, self.durations, 1), 9)
+
+    def test_cycle(self):
+        with self.assertRaises(ValueError):
+            topological_frontiers(build_graph({1: {2}, 2: {1}}))
+
+    def test_cycle_witness(self):
+        # Цикл 2→3→4→5→2 с хордой 2→5: кратчайший через 2 — 2→5→2; 1 и 6 на цикле не лежат
+        with self.assertRaisesRegex(ValueError, r"Cycle detected in tasks: \[2, 5\]"):
+            topological_frontiers(build_graph({1: {2}, 2: {3, 5}, 3: {4}, 4: {5}, 5: {2, 6}}))
+        with self.assertRaisesRegex(ValueError, r"\[7\]"):
+            topological_frontiers(build_graph({7: {7}, 8: {7}}))
+
+if __name__ == "__main__":
+    unittest.main()
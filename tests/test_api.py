@@ -0,0 +1,514 @@
+import asyncio
+import json
+import unittest
+from concurrent.futures import Future, ThreadPoolExecutor
+from unittest import mock
+from fastapi.testclient import TestClient
+import api
+import registry
+from common import ScheduleResult
+from graphio import build_problem, dumps
+from simulation import list_schedule
+from tests.helpers import check_schedule, response_result
+
+client = TestClient(api.app)
+
+def request(durations, machines=2, predecessors=None):
+    predecessors = predecessors or {}
+    return {
+        "tasks": [{"id": i, "duration": d, "predecessors": predecessors.get(i, [])} for i, d in enumerate(durations)],
+        "machines": machines,
+    }
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        api.cache.clear()
+
+    def test_order_and_errors(self):
+        batch = {"algorithm": "coffman", "requests": [
+            request([3, 3, 3]),
+            request([1, 1], predecessors={0: [1], 1: [0]}),
+            request([5], machines=1),
+            request([2, 2], predecessors={1: [0]}),
+        ]}
+        response = client.post("/schedule/batch", json=batch)
+        self.assertEqual(response.status_code, 200)
+        results = response.json()["results"]
+        self.assertEqual([r["makespan"] for r in results], [6, None, 5, 4])
+        self.assertIsNone(results[0]["error"])
+        self.assertIn("Cycle detected", results[1]["error"])
+        self.assertIsNone(results[1]["schedule"])
+        self.assertEqual(results[3]["schedule"][0][1]["id"], 1)
+        # Повтор из кэша: тот же ответ
+        self.assertEqual(client.post("/schedule/batch", json=batch).json(), response.json())
+
+    def test_unknown_algorithm(self):
+        response = client.post("/schedule/batch", json={"algorithm": "nope", "requests": [request([1])]})
+        self.assertEqual(response.status_code, 404)
+
+    def test_item_crash(self):
+        # Не только ValueError: любое исключение элемента становится его ошибкой
+        with mock.patch("api.solve", side_effect=RuntimeError("boom")):
+            result, error = api._solve_batch_item(("coffman", [(1, 1, [])], 2))
+        self.assertIsNone(result)
+        self.assertEqual(error, "Internal error: RuntimeError: boom")
+
+class TestPortfolio(unittest.TestCase):
+    def setUp(self):
+        api.cache.clear()
+
+    def test_default_skips_exact(self):
+        response = client.post("/schedule/portfolio", json=request([3, 1, 2], predecessors={2: [0]}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["makespan"], 5)
+        tasks = [(0, 3, []), (1, 1, []), (2, 2, [0])]
+        self.assertIsNotNone(api.cache.get(api.canonical_key(tasks, 2, "coffman")))
+        self.assertIsNone(api.cache.get(api.canonical_key(tasks, 2, "exact")))
+        # Явно указанный exact по-прежнему запускается
+        response = client.post("/schedule/portfolio?algorithms=exact", json=request([3, 1, 2], predecessors={2: [0]}))
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(api.cache.get(api.canonical_key(tasks, 2, "exact")))
+
+class TestGraphs(unittest.TestCase):
+    def upload(self):
+        response = client.post("/graphs", json=request([3, 1, 2], predecessors={2: [0]}))
+        self.assertEqual(response.status_code, 201)
+        return response.json()["id"]
+
+    def tearDown(self):
+        for graph_id in list(api.graphs._attached):
+            try:
+                api.graphs.delete(graph_id)
+            except KeyError:
+                pass
+
+    def test_lookup_by_full_id(self):
+        graph_id = self.upload()
+        self.assertEqual(client.get(f"/graphs/{graph_id}").json()["tasks"], 3)
+        self.assertEqual(client.get(f"/graphs/{graph_id[:24]}").status_code, 404)
+        self.assertEqual(client.delete(f"/graphs/{graph_id[:24]}").status_code, 404)
+        self.assertEqual(client.delete(f"/graphs/{graph_id}").status_code, 204)
+        self.assertEqual(client.get(f"/graphs/{graph_id}").status_code, 404)
+
+    def test_body_limit(self):
+        body = json.dumps(request([1] * 50)).encode()
+        with mock.patch.object(api, "MAX_GRAPH_BYTES", 100):
+            # По Content-Length — до чтения тела
+            response = client.post("/graphs", content=body, headers={"Content-Type": "application/json"})
+            self.assertEqual(response.status_code, 413)
+            # Без Content-Length (chunked) — как только поток превысит предел
+            chunks = (body[k:k + 64] for k in range(0, len(body), 64))
+            response = client.post("/graphs", content=chunks, headers={"Content-Type": "application/json"})
+            self.assertEqual(response.status_code, 413)
+        self.assertEqual(len(api.graphs), 0)
+
+class TestJobs(unittest.TestCase):
+    def setUp(self):
+        api.cache.clear()
+
+    def submit(self, payload):
+        response = client.post("/jobs?algorithm=coffman", json=payload)
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()["id"]
+        api._jobs[job_id].exception(timeout=30)
+        return job_id
+
+    def test_lifecycle(self):
+        job_id = self.submit(request([2, 1, 1], predecessors={2: [0]}))
+        self.assertEqual(client.get(f"/jobs/{job_id}").json(), {"id": job_id, "status": "done", "error": None})
+        response = client.get(f"/jobs/{job_id}/result")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("application/x-ndjson"))
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual([line["machine"] for line in lines], [0, 1])
+        ends = {t["id"]: t["end_time"] for line in lines for t in line["tasks"]}
+        starts = {t["id"]: t["start_time"] for line in lines for t in line["tasks"]}
+        self.assertEqual(sorted(ends), [0, 1, 2])
+        self.assertLessEqual(ends[0], starts[2])
+
+    def test_failed(self):
+        job_id = self.submit(request([1, 1], predecessors={0: [1], 1: [0]}))
+        status = client.get(f"/jobs/{job_id}").json()
+        self.assertEqual(status["status"], "failed")
+        self.assertIn("Cycle detected", status["error"])
+        self.assertEqual(client.get(f"/jobs/{job_id}/result").status_code, 400)
+
+    def test_pending_and_unknown(self):
+        api._jobs["pending"] = Future()
+        try:
+            self.assertEqual(client.get("/jobs/pending").json()["status"], "pending")
+            self.assertEqual(client.get("/jobs/pending/result").status_code, 409)
+        finally:
+            del api._jobs["pending"]
+        self.assertEqual(client.get("/jobs/nope").status_code, 404)
+        self.assertEqual(client.get("/jobs/nope/result").status_code, 404)
+        self.assertEqual(client.post("/jobs?algorithm=nope", json=request([1])).status_code, 404)
+
+    def test_cancelled(self):
+        future = Future()
+        future.cancel()
+        api._jobs["cancelled"] = future
+        try:
+            self.assertEqual(client.get("/jobs/cancelled").json()["status"], "cancelled")
+            self.assertEqual(client.get("/jobs/cancelled/result").status_code, 410)
+        finally:
+            del api._jobs["cancelled"]
+
+    def test_limit(self):
+        # Завершённые задачи вытесняются, незавершённые — нет: при полном списке новые отклоняются
+        saved = api._jobs.copy()
+        api._jobs.clear()
+        try:
+            with mock.patch.object(api, "MAX_JOBS", 2):
+                done = self.submit(request([1]))
+                api._jobs["pending"] = Future()
+                self.submit(request([2]))
+                self.assertNotIn(done, api._jobs)
+                self.assertIn("pending", api._jobs)
+                api._jobs.clear()
+                api._jobs.update(first=Future(), second=Future())
+                response = client.post("/jobs?algorithm=coffman", json=request([3]))
+                self.assertEqual(response.status_code, 503)
+                self.assertEqual(list(api._jobs), ["first", "second"])
+        finally:
+            api._jobs.clear()
+            api._jobs.update(saved)
+
+def serial(graph, durations, m, frontiers=None):
+    # Заведомо не оптимальное, но допустимое расписание: всё на одной машине
+    start, end, machine = list_schedule(graph, durations, 1, list(range(len(graph))))
+    return ScheduleResult.from_arrays(graph.ids, m, start, end, machine)
+
+def binary(durations, machines=2, predecessors=None):
+    payload = request(durations, machines, predecessors)
+    graph, weights = build_problem([(t["id"], t["duration"], t["predecessors"]) for t in payload["tasks"]])
+    return dumps(graph, weights, machines)
+
+class TestFormats(unittest.TestCase):
+    payload = request([2, 1, 3], predecessors={2: [0]})
+
+    def setUp(self):
+        api.cache.clear()
+
+    def post(self, query="", headers=None):
+        return client.post("/schedule/coffman" + query, json=self.payload, headers=headers)
+
+    def test_json_matches_model(self):
+        model = self.post()
+        direct = self.post("?format=json")
+        self.assertEqual(direct.headers["content-type"], "application/json")
+        self.assertEqual(direct.json(), model.json())
+        self.assertEqual(self.post(headers={"accept": "application/json"}).json(), model.json())
+
+    def test_columnar(self):
+        model = self.post().json()
+        for query, headers in (("?format=columnar", None), ("", {"accept": api.COLUMNAR_MEDIA_TYPE})):
+            response = self.post(query, headers)
+            self.assertEqual(response.headers["content-type"], api.COLUMNAR_MEDIA_TYPE)
+            data = response.json()
+            self.assertEqual(data["makespan"], model["makespan"])
+            for machine, rows in enumerate(model["schedule"]):
+                self.assertEqual(data["schedule"][machine], {
+                    "machine": machine,
+                    "ids": [t["id"] for t in rows],
+                    "starts": [t["start_time"] for t in rows],
+                    "ends": [t["end_time"] for t in rows],
+                })
+
+    def test_query_overrides_accept(self):
+        response = self.post("?format=json", {"accept": api.COLUMNAR_MEDIA_TYPE})
+        self.assertEqual(response.headers["content-type"], "application/json")
+        self.assertEqual(response.json(), self.post().json())
+        self.assertEqual(self.post("?format=xml").status_code, 422)
+
+def metric(text, sample):
+    # Значение строки метрики с точным именем и метками, 0 — если её ещё нет
+    for line in text.splitlines():
+        if line.startswith(sample + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0
+
+class TestProfilingRoutes(unittest.TestCase):
+    def setUp(self):
+        api.cache.clear()
+
+    def test_server_timing(self):
+        response = client.post("/schedule/fujii", json=request([2, 1, 3], predecessors={2: [0]}))
+        phases = dict(item.split(";dur=") for item in response.headers["server-timing"].split(", "))
+        for name in ("request.parse", "graph.validate", "fujii.simulate", "response.render", "total"):
+            self.assertIn(name, phases)
+        self.assertGreaterEqual(float(phases["total"]), float(phases["fujii.simulate"]))
+        with mock.patch.object(api, "PROFILING", False):
+            response = client.post("/schedule/fujii", json=request([1]))
+        self.assertNotIn("server-timing", response.headers)
+
+    def test_metrics(self):
+        requests = 'scheduler_requests_total{route="/schedule/{algorithm}",status="200"}'
+        simulate = 'scheduler_phase_calls_total{phase="fujii.simulate"}'
+        before = client.get("/metrics").text
+        client.post("/schedule/fujii", json=request([2, 2]))
+        client.post("/schedule/fujii", json=request([2, 2]))
+        client.post("/schedule/nope", json=request([1]))
+        response = client.get("/metrics")
+        self.assertTrue(response.headers["content-type"].startswith("text/plain"))
+        after = response.text
+        self.assertEqual(metric(after, requests), metric(before, requests) + 2)
+        # Второй запрос — из кэша, планировщик не запускался
+        self.assertEqual(metric(after, simulate), metric(before, simulate) + 1)
+        self.assertGreaterEqual(metric(after, 'scheduler_requests_total{route="/schedule/{algorithm}",status="404"}'), 1)
+        self.assertEqual(metric(after, "scheduler_cache_entries"), 1)
+        self.assertIn("# TYPE scheduler_cache_hits_total counter", after)
+
+class TestReduce(unittest.TestCase):
+    # 0 → 1 → 2 → 3 и транзитивные 0 → 2, 0 → 3, 1 → 3; 4 и 5 независимы
+    predecessors = {1: [0], 2: [0, 1], 3: [0, 1, 2], 5: [4]}
+    durations = [2, 1, 3, 1, 2, 2]
+
+    def setUp(self):
+        api.cache.clear()
+
+    def test_reduce(self):
+        payload = request(self.durations, 2, self.predecessors)
+        graph, weights = build_problem([(t["id"], t["duration"], t["predecessors"]) for t in payload["tasks"]])
+        for algorithm in ("fujii", "coffman", "sethi"):
+            plain = client.post(f"/schedule/{algorithm}", json=payload).json()
+            reduced = client.post(f"/schedule/{algorithm}?reduce=true", json=payload)
+            self.assertEqual(reduced.status_code, 200)
+            reduced = reduced.json()
+            self.assertEqual(reduced["makespan"], plain["makespan"], algorithm)
+            self.assertEqual(reduced["lower_bound"], plain["lower_bound"], algorithm)
+            # Расписание сокращённого графа проверяется по исходному, со всеми рёбрами
+            check_schedule(self, graph, weights, response_result(graph, reduced), 2)
+        # У сокращённого графа свой ключ кэша: ответ без reduce из кэша не подставляется
+        self.assertEqual(api.cache.stats()["entries"], 6)
+
+class TestCacheRoute(unittest.TestCase):
+    def setUp(self):
+        api.cache.clear()
+
+    def test_hit(self):
+        payload = request([2, 1, 3], predecessors={2: [0]})
+        before = client.get("/cache/stats").json()
+        with mock.patch.object(api, "solve", wraps=api.solve) as solve:
+            first = client.post("/schedule/coffman", json=payload).json()
+            # Тот же набор задач в другом порядке — тот же ключ
+            shuffled = {**payload, "tasks": payload["tasks"][::-1]}
+            self.assertEqual(client.post("/schedule/coffman", json=shuffled).json(), first)
+            self.assertEqual(client.post("/schedule/coffman", json=payload).json(), first)
+            self.assertEqual(solve.call_count, 1)
+            client.post("/schedule/coffman", json={**payload, "machines": 3})
+            self.assertEqual(solve.call_count, 2)
+        stats = client.get("/cache/stats").json()
+        self.assertEqual(stats["hits"] - before["hits"], 2)
+        self.assertEqual(stats["misses"] - before["misses"], 2)
+        self.assertEqual(stats["entries"], 2)
+        self.assertGreater(stats["bytes"], 0)
+
+class TestScheduleRoute(unittest.TestCase):
+    def setUp(self):
+        api.cache.clear()
+
+    def test_every_algorithm(self):
+        # Единичные длительности и две машины — вход, на котором определены все алгоритмы, включая fkn
+        payload = request([1] * 6, 2, {2: [0, 1], 3: [2], 5: [4]})
+        graph, weights = build_problem([(t["id"], t["duration"], t["predecessors"]) for t in payload["tasks"]])
+        for name in registry.ALGORITHMS:
+            response = client.post(f"/schedule/{name}", json=payload)
+            self.assertEqual(response.status_code, 200, name)
+            body = response.json()
+            self.assertEqual(body["algorithm"], name)
+            self.assertEqual(body["makespan"], max(t["end_time"] for machine in body["schedule"] for t in machine))
+            self.assertGreaterEqual(body["makespan"], body["lower_bound"])
+            check_schedule(self, graph, weights, response_result(graph, body), 2)
+
+    def test_errors(self):
+        response = client.post("/schedule/nope", json=request([1]))
+        self.assertEqual(response.status_code, 404)
+        self.assertIn("Unknown algorithm: nope", response.json()["detail"])
+        response = client.post("/schedule/fujii", json=request([1, 1], predecessors={0: [1], 1: [0]}))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Cycle detected", response.json()["detail"])
+        self.assertEqual(client.post("/schedule/fujii", json={"tasks": [], "machines": 0}).status_code, 422)
+
+class TestBinaryRoute(unittest.TestCase):
+    headers = {"content-type": "application/octet-stream"}
+
+    def setUp(self):
+        api.cache.clear()
+
+    def test_valid(self):
+        predecessors = {2: [0, 1], 3: [2]}
+        expected = client.post("/schedule/fujii", json=request([2, 1, 3, 1], 3, predecessors)).json()
+        # Число машин — из заголовка файла, если не задано в запросе
+        data = binary([2, 1, 3, 1], 3, predecessors)
+        response = client.post("/schedule/fujii/binary", content=data, headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), expected)
+        response = client.post("/schedule/fujii/binary?machines=1", content=data, headers=self.headers)
+        self.assertEqual(len(response.json()["schedule"]), 1)
+        self.assertEqual(response.json()["makespan"], 7)
+
+    def test_invalid(self):
+        data = binary([1, 1], predecessors={1: [0]})
+        for body, message in ((data[:-8], "does not match"), (data[:10], "no header"),
+                              (b"XXXX" + data[4:], "Not a binary graph file")):
+            response = client.post("/schedule/coffman/binary", content=body, headers=self.headers)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn(message, response.json()["detail"])
+        for headers in ({"content-type": "application/json"}, {}):
+            self.assertEqual(client.post("/schedule/coffman/binary", content=data, headers=headers).status_code, 415)
+        self.assertEqual(client.post("/schedule/nope/binary", content=data, headers=self.headers).status_code, 404)
+
+class TestExactRoute(unittest.TestCase):
+    def setUp(self):
+        api.cache.clear()
+
+    def test_optimal_cached(self):
+        payload = request([3, 2, 2, 1], predecessors={3: [0]})
+        first = client.post("/schedule/exact", json=payload)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.json()["makespan"], 4)
+        self.assertEqual(first.json()["lower_bound"], 4)
+        hits = api.cache.stats()["hits"]
+        self.assertEqual(client.post("/schedule/exact", json=payload).json(), first.json())
+        self.assertEqual(api.cache.stats()["hits"], hits + 1)
+
+    def test_unproven_not_cached(self):
+        payload = request([2, 2, 2])
+        unproven = {"schedule": [[(0, 0, 2, 0), (1, 2, 4, 0), (2, 4, 6, 0)], []], "makespan": 6, "lower_bound": 4}
+        with mock.patch.object(api, "solve_optimal", return_value=(unproven, False)):
+            self.assertEqual(client.post("/schedule/exact", json=payload).json()["makespan"], 6)
+        self.assertEqual(api.cache.stats()["entries"], 0)
+
+    def test_generic_paths(self):
+        # exact через общий маршрут: без доказательства оптимальности в кэш не попадает
+        headers = {"content-type": "application/octet-stream"}
+        data = binary([2, 2])
+        with mock.patch.dict(registry.ALGORITHMS, {"exact": serial}):
+            response = client.post("/schedule/exact/binary", content=data, headers=headers)
+            self.assertEqual(response.json()["makespan"], 4)
+            self.assertEqual(response.json()["lower_bound"], 2)
+        self.assertEqual(api.cache.stats()["entries"], 0)
+        response = client.post("/schedule/exact/binary", content=data, headers=headers)
+        self.assertEqual(response.json()["makespan"], 2)
+        self.assertEqual(api.cache.stats()["entries"], 1)
+
+def stream_post(path, data, size, headers):
+    """POST напрямую через ASGI: тело приходит кусками по size байт (TestClient склеивает тело в один кусок)."""
+    path, _, query = path.partition("?")
+    parts = [data[k:k + size] for k in range(0, len(data), size)] or [b""]
+    messages = [{"type": "http.request", "body": part, "more_body": k + 1 < len(parts)}
+                for k, part in enumerate(parts)]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+             "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+             "root_path": "", "server": ("testserver", 80), "client": ("testclient", 50000),
+             "headers": [(k.encode(), v.encode()) for k, v in headers.items()]}
+    asyncio.run(api.app(scope, receive, send))
+    status = next(m["status"] for m in sent if m["type"] == "http.response.start")
+    body = b"".join(m.get("body", b"") for m in sent if m["type"] == "http.response.body")
+    return status, json.loads(body)
+
+class TestNdjson(unittest.TestCase):
+    headers = {"content-type": "application/x-ndjson"}
+
+    def setUp(self):
+        api.cache.clear()
+
+    def post(self, lines, size=7, algorithm="coffman", headers=None):
+        return stream_post(f"/schedule/{algorithm}/ndjson?machines=2", "\n".join(lines).encode(), size,
+                           headers or self.headers)
+
+    def test_split_lines_and_forward_references(self):
+        # Задача 0 ссылается на предшественника 2, который приходит позже
+        payload = request([2, 1, 3, 1], predecessors={0: [2], 3: [1]})
+        lines = [json.dumps(t) for t in payload["tasks"]]
+        expected = client.post("/schedule/coffman", json=payload).json()
+        for size in (1, 7, 1000):
+            status, body = self.post(lines + [""], size)
+            self.assertEqual(status, 200)
+            self.assertEqual(body, expected)
+
+    def test_errors(self):
+        good = json.dumps({"id": 0, "duration": 1, "predecessors": []})
+        status, body = self.post([good, "", '{"id": 1, "duration": "x"}'])
+        self.assertEqual(status, 400)
+        self.assertTrue(body["detail"].startswith("Line 3:"))
+        self.assertEqual(self.post([good, good], size=3), (400, {"detail": "Line 2: Duplicate task id: 0"}))
+        status, body = self.post([json.dumps({"id": 0, "duration": 1, "predecessors": [5]})])
+        self.assertEqual(status, 400)
+        self.assertIn("Unknown predecessor id: 5", body["detail"])
+        self.assertEqual(self.post([good], headers={"content-type": "application/json"})[0], 415)
+        self.assertEqual(self.post([good], algorithm="nope")[0], 404)
+
+class TestSessions(unittest.TestCase):
+    def create(self, payload, algorithm="fujii"):
+        response = client.post(f"/sessions?algorithm={algorithm}", json=payload)
+        self.assertEqual(response.status_code, 201)
+        return response.json()
+
+    def test_lifecycle(self):
+        created = self.create(request([2, 1, 3], predecessors={2: [0]}))
+        session_id = created["id"]
+        self.assertEqual(created["algorithm"], "fujii")
+        self.assertEqual(client.get(f"/sessions/{session_id}").json(), created)
+
+        changes = {"changes": [{"op": "set_duration", "id": 1, "duration": 4},
+                               {"op": "add_task", "id": 3, "duration": 2, "predecessors": [1]}]}
+        response = client.patch(f"/sessions/{session_id}", json=changes)
+        self.assertEqual(response.status_code, 200)
+        # То же, что полный пересчёт тем же алгоритмом
+        full = client.post("/schedule/fujii", json={
+            "tasks": [{"id": 0, "duration": 2, "predecessors": []}, {"id": 1, "duration": 4, "predecessors": []},
+                      {"id": 2, "duration": 3, "predecessors": [0]}, {"id": 3, "duration": 2, "predecessors": [1]}],
+            "machines": 2,
+        }).json()
+        self.assertEqual(response.json()["schedule"], full["schedule"])
+        self.assertEqual(response.json()["makespan"], full["makespan"])
+
+        # Ошибочная дельта отклоняется, предыдущие в том же PATCH остаются
+        response = client.patch(f"/sessions/{session_id}", json={"changes": [
+            {"op": "remove_task", "id": 3}, {"op": "add_edge", "source": 2, "target": 0}]})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Change 1", response.json()["detail"])
+        self.assertEqual(client.get(f"/sessions/{session_id}").json()["makespan"], 5)
+        self.assertEqual(client.patch(f"/sessions/{session_id}", json={"changes": [
+            {"op": "set_duration", "duration": 1}]}).status_code, 400)
+
+        self.assertEqual(client.delete(f"/sessions/{session_id}").status_code, 204)
+        self.assertEqual(client.get(f"/sessions/{session_id}").status_code, 404)
+        self.assertEqual(client.patch(f"/sessions/{session_id}", json=changes).status_code, 404)
+        self.assertEqual(client.delete(f"/sessions/{session_id}").status_code, 404)
+
+    def test_errors(self):
+        self.assertEqual(client.post("/sessions?algorithm=sethi", json=request([1])).status_code, 404)
+        response = client.post("/sessions", json=request([1, 1], predecessors={0: [1], 1: [0]}))
+        self.assertEqual(response.status_code, 400)
+
+    def test_concurrent_patches(self):
+        session_id = self.create(request([1]), algorithm="coffman")["id"]
+
+        def add(k):
+            change = {"op": "add_task", "id": k, "duration": 1 + k % 3, "predecessors": [k // 2]}
+            return client.patch(f"/sessions/{session_id}", json={"changes": [change]}).status_code
+
+        # PATCH сессии идут по одному; обогнавший PATCH своего предка получает 400
+        with ThreadPoolExecutor(8) as pool:
+            codes = list(pool.map(add, range(1, 41)))
+        added = [k for k, code in zip(range(1, 41), codes) if code == 200]
+        self.assertTrue(set(codes) <= {200, 400})
+        final = client.get(f"/sessions/{session_id}").json()
+        full = client.post("/schedule/coffman", json={
+            "tasks": [{"id": 0, "duration": 1, "predecessors": []}] +
+                     [{"id": k, "duration": 1 + k % 3, "predecessors": [k // 2]} for k in added],
+            "machines": 2,
+        }).json()
+        self.assertEqual(final["schedule"], full["schedule"])
+        client.delete(f"/sessions/{session_id}")
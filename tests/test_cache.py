@@ -0,0 +1,47 @@
+import tempfile
+import unittest
+from cache import ScheduleCache, canonical_key
+
+class TestScheduleCache(unittest.TestCase):
+    def test_canonical_key(self):
+        # Порядок задач и предшественников не влияет на ключ, машины и алгоритм — влияют
+        a = [(1, 2, []), (2, 1, [1]), (3, 1, [1, 2])]
+        b = [(3, 1, [2, 1]), (1, 2, []), (2, 1, [1])]
+        self.assertEqual(canonical_key(a, 2, "coffman"), canonical_key(b, 2, "coffman"))
+        self.assertNotEqual(canonical_key(a, 2, "coffman"), canonical_key(a, 3, "coffman"))
+        self.assertNotEqual(canonical_key(a, 2, "coffman"), canonical_key(a, 2, "fujii"))
+        self.assertNotEqual(canonical_key(a, 2, "coffman"), canonical_key([(1, 3, [])] + a[1:], 2, "coffman"))
+
+    def test_lru_eviction(self):
+        cache = ScheduleCache(max_entries=2)
+        cache.put("a", [1])
+        cache.put("b", [2])
+        self.assertEqual(cache.get("a"), [1])  # "a" становится свежей
+        cache.put("c", [3])
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), [1])
+        self.assertEqual(cache.get("c"), [3])
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["evictions"]), (3, 1, 1))
+
+    def test_byte_limit(self):
+        cache = ScheduleCache(max_entries=100, max_bytes=20)
+        cache.put("a", list(range(5)))
+        cache.put("b", list(range(5)))
+        self.assertLessEqual(cache.stats()["bytes"], 20)
+        self.assertIsNone(cache.get("a"))
+        cache.put("huge", list(range(100)))
+        self.assertIsNone(cache.get("huge"))
+
+    def test_disk_tier(self):
+        # Новый экземпляр с тем же каталогом видит записи прошлого
+        with tempfile.TemporaryDirectory() as directory:
+            ScheduleCache(directory=directory).put("k" * 64, [[[1, 0, 1, 0]]])
+            cache = ScheduleCache(directory=directory)
+            self.assertEqual(cache.get("k" * 64), [[[1, 0, 1, 0]]])
+            self.assertEqual(cache.stats()["disk_hits"], 1)
+            self.assertEqual(cache.get("k" * 64), [[[1, 0, 1, 0]]])
+            self.assertEqual(cache.stats()["hits"], 1)
+
+if __name__ == "__main__":
+    unittest.main()
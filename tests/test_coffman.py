@@ -1,6 +1,7 @@
 import unittest
-from coffman import coffman_graham
-from common import Task
+from coffman import coffman_graham, coffman_graham_labels, coffman_graham_result
+from common import Task, build_graph
+from tests.helpers import check_task_schedule
 
 class TestCoffmanGraham(unittest.TestCase):
     def test_simple_schedule(self):
@@ -13,7 +14,7 @@ class TestCoffmanGraham(unittest.TestCase):
             4: {5}
         }
         schedule = coffman_graham(tasks, precedence, m=2)
-        self._check_schedule(tasks, precedence, schedule)
+        check_task_schedule(self, tasks, precedence, schedule, m=2)
 
     def test_no_dependencies(self):
         # Все задачи независимы: должно выровняться по машинам почти поровну
@@ -21,7 +22,7 @@ class TestCoffmanGraham(unittest.TestCase):
         tasks = {i: Task(i, duration=1) for i in range(1, n+1)}
         precedence = {i: set() for i in tasks}
         schedule = coffman_graham(tasks, precedence, m=3)
-        self._check_schedule(tasks, precedence, schedule)
+        check_task_schedule(self, tasks, precedence, schedule, m=3)
 
         # Проверяем балансировку: ни одна машина не должна получить больше ceil(n/m) и меньше floor(n/m)
         sizes = [len(machine) for machine in schedule]
@@ -33,7 +34,7 @@ class TestCoffmanGraham(unittest.TestCase):
         precedence = {i: {i-1} for i in range(2, 6)}
         precedence[1] = set()
         schedule = coffman_graham(tasks, precedence, m=2)
-        self._check_schedule(tasks, precedence, schedule)
+        check_task_schedule(self, tasks, precedence, schedule, m=2)
 
         # Проверяем, что каждая следующая стартует ровно после окончания предыдущей
         order = [task for machine in schedule for task in machine]
@@ -57,28 +58,64 @@ class TestCoffmanGraham(unittest.TestCase):
             10: {9}
         }
         schedule = coffman_graham(tasks, precedence, m=3)
-        self._check_schedule(tasks, precedence, schedule)
+        check_task_schedule(self, tasks, precedence, schedule, m=3)
 
         # Проверим makespan: не больше суммы самых длинных по цепочке
         longest_chain = sum(tasks[i].duration for i in [1, 2, 4, 7, 9, 10])
         makespan = max(task.end_time for machine in schedule for task in machine)
         self.assertLessEqual(makespan, longest_chain)
 
-    def _check_schedule(self, tasks, precedence, schedule):
-        # Все задачи назначены ровно один раз
-        scheduled = [t.id for machine in schedule for t in machine]
-        self.assertCountEqual(scheduled, tasks.keys())
+    def test_graph_input(self):
+        # Готовый CSR-граф принимается вместо словаря
+        tasks = {i: Task(i) for i in range(1, 7)}
+        precedence = {1: {3}, 2: {3}, 3: {4, 5}}
+        schedule = coffman_graham(tasks, build_graph(precedence), m=2)
+        check_task_schedule(self, tasks, precedence, schedule, m=2)
 
-        # На каждой машине нет перекрытий
-        for machine in schedule:
-            machine.sort(key=lambda t: t.start_time)
-            for a, b in zip(machine, machine[1:]):
-                self.assertLessEqual(a.end_time, b.start_time)
+    def test_labels_lexicographic(self):
+        # 1→3, 2→4, 2→5: у 2 потомки с метками (3, 2) > (1,) у 1
+        graph = build_graph({1: {3}, 2: {4, 5}})
+        labels = {graph.ids[i]: label for i, label in enumerate(coffman_graham_labels(graph))}
+        self.assertEqual(labels, {3: 1, 4: 2, 5: 3, 1: 4, 2: 5})
 
-        # Зависимости соблюдены
-        for u, vs in precedence.items():
-            for v in vs:
-                self.assertLessEqual(tasks[u].end_time, tasks[v].start_time)
+    def test_labels_cycle(self):
+        # На цикле метки выдать нельзя — ошибка вместо потерянных задач
+        tasks = {i: Task(i) for i in range(1, 4)}
+        with self.assertRaises(ValueError):
+            coffman_graham(tasks, {1: {2}, 2: {3}, 3: {1}}, m=2)
+
+    def test_two_machine_optimal(self):
+        # Единичные задачи, m=2: метки Coffman–Graham дают оптимум
+        tasks = {i: Task(i) for i in range(1, 8)}
+        precedence = {1: {4, 5}, 2: {5}, 3: {6}, 4: {7}, 5: {7}}
+        schedule = coffman_graham(tasks, precedence, m=2)
+        check_task_schedule(self, tasks, precedence, schedule, m=2)
+        makespan = max(task.end_time for machine in schedule for task in machine)
+        self.assertEqual(makespan, 4)
+
+    def test_result_does_not_mutate(self):
+        # Колоночный вариант не трогает Task-объекты вызывающего
+        tasks = {i: Task(i, duration=2) for i in range(1, 5)}
+        graph = build_graph({1: {2, 3}, 3: {4}}, tasks)
+        result = coffman_graham_result(graph, [2] * len(graph), m=2)
+        self.assertTrue(all(t.start_time is None for t in tasks.values()))
+        self.assertEqual(result.makespan, 6)
+        self.assertEqual(len(result), 4)
+
+    def test_many_machines(self):
+        # Машин больше, чем задач в слое, и m не степень двойки: каждая задача стартует,
+        # как только готова, на самой левой свободной машине
+        precedence = {i: {i + 10} for i in range(10)}
+        graph = build_graph(precedence, range(20))
+        durations = [1 + i % 3 for i in range(20)]
+        result = coffman_graham_result(graph, durations, m=13)
+        start = {node: s for i in range(13) for node, s, _, _ in result.machine_rows(i)}
+        for i in range(10):
+            self.assertEqual(start[i], 0)
+            self.assertEqual(start[i + 10], durations[graph.index[i]])
+        self.assertEqual(result.makespan, 5)
+        # Машины 10–12 так и не понадобились: освободившиеся левые машины берутся первыми
+        self.assertEqual(max(result.machine), 9)
 
 if __name__ == '__main__':
     unittest.main()
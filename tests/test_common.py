@@ -0,0 +1,90 @@
+import unittest
+from common import Graph, GraphBuilder, ScheduleResult, Task, build_graph, as_graph, get_graph
+
+class TestGraph(unittest.TestCase):
+    def test_matches_get_graph(self):
+        # CSR-граф должен давать те же множества, что и словари get_graph
+        precedence = {
+            1: {2, 3},
+            2: {4},
+            3: {4},
+            5: set()
+        }
+        graph = build_graph(precedence)
+        self.assertEqual(graph.to_dicts(), get_graph(precedence))
+        self.assertEqual(len(graph), 5)
+        self.assertEqual(graph.edge_count, 4)
+
+    def test_dense_remap(self):
+        # Индексы плотные, id ↔ index взаимно обратны
+        graph = build_graph({10: {30}, 20: {30}})
+        self.assertEqual(sorted(graph.index.values()), list(range(len(graph))))
+        for i, node in enumerate(graph.ids):
+            self.assertEqual(graph.index[node], i)
+        c = graph.index[30]
+        self.assertCountEqual([graph.ids[p] for p in graph.predecessors(c)], [10, 20])
+        self.assertEqual(graph.in_degree(c), 2)
+        self.assertEqual(graph.out_degree(c), 0)
+
+    def test_duplicate_edges(self):
+        # Повторные рёбра из списков не должны задваиваться
+        graph = build_graph({1: [2, 2, 2], 2: [3, 3]})
+        self.assertEqual(graph.edge_count, 2)
+        self.assertEqual(list(graph.in_degrees()), [0, 1, 1])
+
+    def test_unordered_edges(self):
+        # Рёбра вразнобой раскладываются подсчётом, порядок внутри списка — порядок добавления
+        builder = GraphBuilder()
+        for u, v in [(3, 1), (1, 2), (3, 2), (2, 1), (1, 3), (3, 1)]:
+            builder.add_edge(u, v)
+        graph = builder.build()
+        ids = graph.ids
+        self.assertEqual([ids[v] for v in graph.successors(graph.index[3])], [1, 2])
+        self.assertEqual([ids[v] for v in graph.successors(graph.index[1])], [2, 3])
+        self.assertEqual([ids[u] for u in graph.predecessors(graph.index[1])], [3, 2])
+        self.assertEqual(graph.edge_count, 5)
+
+    def test_extra_nodes(self):
+        # Изолированные задачи добавляются и при сборке, и к готовому графу
+        graph = build_graph({1: {2}}, nodes=[1, 2, 3])
+        self.assertIn(3, graph.index)
+        extended = as_graph(graph, [4, 5])
+        self.assertEqual(len(extended), 5)
+        self.assertEqual(extended.out_degree(extended.index[5]), 0)
+        self.assertEqual(len(graph), 3)
+        self.assertIs(as_graph(graph, [1, 2]), graph)
+
+    def test_reverse_and_immutable(self):
+        graph = build_graph({1: {2}})
+        rev = graph.reverse()
+        self.assertEqual([rev.ids[j] for j in rev.successors(rev.index[2])], [1])
+        with self.assertRaises(AttributeError):
+            graph.ids = []
+
+
+class TestScheduleResult(unittest.TestCase):
+    def test_machine_views(self):
+        # Строки сгруппированы по машинам и упорядочены по старту
+        ids = [10, 20, 30, 40]
+        result = ScheduleResult.from_arrays(ids, 2, start=[3, 0, 0, 1], end=[4, 1, 2, 3], machine=[0, 1, 0, 1])
+        self.assertEqual(len(result), 4)
+        self.assertEqual(list(result.machine_rows(0)), [(30, 0, 2, 0), (10, 3, 4, 0)])
+        self.assertEqual(result.to_raw()[1], [(20, 0, 1, 1), (40, 1, 3, 1)])
+        self.assertEqual(list(result.start[result.machine_slice(1)]), [0, 1])
+        self.assertEqual(result.makespan, 4)
+
+    def test_apply(self):
+        # apply переносит колонки на Task-объекты для старого интерфейса
+        tasks = {i: Task(i) for i in (1, 2)}
+        result = ScheduleResult.from_arrays([1, 2], 2, start=[0, 1], end=[1, 2], machine=[1, 1])
+        schedule = result.apply(tasks)
+        self.assertEqual(schedule[0], [])
+        self.assertEqual([t.id for t in schedule[1]], [1, 2])
+        self.assertEqual((tasks[2].start_time, tasks[2].end_time, tasks[2].machine), (1, 2, 1))
+
+    def test_task_slots(self):
+        with self.assertRaises(AttributeError):
+            Task(1).color = "red"
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import pickle
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from common import build_graph
+from components import machine_shares, pack, schedule_components, weak_components
+from registry import run_result
+from tests.helpers import check_schedule
+
+class TestComponents(unittest.TestCase):
+    def setUp(self):
+        # Три конвейера: 0 → 1 → 2, 3 → 4 ← 5, 6; и вершина 7 без рёбер
+        self.graph = build_graph({0: {1}, 1: {2}, 3: {4}, 5: {4}, 6: set()}, nodes=range(8))
+        self.durations = [3, 2, 1, 2, 2, 1, 4, 1]
+
+    def test_weak_components(self):
+        component_of, count = weak_components(self.graph)
+        self.assertEqual(count, 4)
+        index = self.graph.index
+        self.assertEqual(component_of[index[3]], component_of[index[5]])
+        self.assertNotEqual(component_of[index[0]], component_of[index[3]])
+
+    def test_shares_and_pack(self):
+        # Четыре одинаковые компоненты на восьми машинах — по две машины каждой
+        self.assertEqual(machine_shares([8, 8, 8, 8], [2, 2, 2, 2], 8), [2, 2, 2, 2])
+        placement = pack([4, 2, 2], [1, 1, 1], 2)
+        self.assertEqual(placement[0], (0, [0]))
+        self.assertEqual(placement[2], (2, [1]))
+
+    def test_valid_schedule(self):
+        for m in (1, 2, 3, 8):
+            for name in ("coffman", "fujii", "sethi"):
+                result = schedule_components(name, self.graph, self.durations, m)
+                check_schedule(self, self.graph, self.durations, result, m)
+                self.assertGreaterEqual(result.makespan, -(-sum(self.durations) // m))
+
+    def test_single_component(self):
+        graph = build_graph({1: {2, 3}, 2: {4}, 3: {4}})
+        durations = [1, 2, 3, 1]
+        self.assertEqual(schedule_components("fujii", graph, durations, 2).to_raw(),
+                         run_result("fujii", graph, durations, 2).to_raw())
+
+    def test_process_pool(self):
+        self.assertEqual(pickle.loads(pickle.dumps(self.graph)).to_dicts(), self.graph.to_dicts())
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            result = schedule_components("coffman", self.graph, self.durations, 2, executor)
+        self.assertEqual(result.to_raw(), schedule_components("coffman", self.graph, self.durations, 2).to_raw())
+
+    def test_cycle(self):
+        graph = build_graph({1: {2}, 2: {1}, 3: set()})
+        with self.assertRaises(ValueError):
+            schedule_components("coffman", graph, [1, 1, 1], 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import random
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from itertools import permutations
+from unittest import mock
+
+import exact
+from common import build_graph
+from exact import solve_exact
+from registry import run_result
+from tests.helpers import check_schedule
+
+def random_problem(seed, n, m_max=3, density=0.3):
+    rng = random.Random(seed)
+    precedence = {i: {v for v in range(i + 1, n) if rng.random() < density} for i in range(n)}
+    graph = build_graph(precedence, range(n))
+    durations = [rng.randint(1, 4) for _ in range(n)]
+    return graph, durations, rng.randint(1, m_max)
+
+def brute_force(graph, durations, m):
+    # Все порядки задач, каждая — на раньше всех освобождающуюся машину
+    best = None
+    for order in permutations(range(len(graph))):
+        end = {}
+        free = [0] * m
+        for i in order:
+            if any(p not in end for p in graph.predecessors(i)):
+                break
+            free.sort()
+            start = max([free[0]] + [end[p] for p in graph.predecessors(i)])
+            end[i] = free[0] = start + durations[i]
+        else:
+            makespan = max(free)
+            best = makespan if best is None else min(best, makespan)
+    return best
+
+class TestExact(unittest.TestCase):
+    def test_matches_brute_force(self):
+        for seed in range(60):
+            graph, durations, m = random_problem(seed, seed % 6 + 1)
+            solution = solve_exact(graph, durations, m)
+            self.assertTrue(solution.optimal, seed)
+            self.assertEqual(solution.result.makespan, brute_force(graph, durations, m), seed)
+            self.assertEqual(solution.lower_bound, solution.result.makespan, seed)
+            check_schedule(self, graph, durations, solution.result, m)
+
+    def test_beats_heuristics(self):
+        graph, durations, m = random_problem(7, 40, density=0.08)
+        solution = solve_exact(graph, durations, 3, time_limit=10)
+        self.assertTrue(solution.optimal)
+        for name in ("coffman", "fujii", "sethi"):
+            self.assertLessEqual(solution.result.makespan, run_result(name, graph, durations, 3).makespan)
+        check_schedule(self, graph, durations, solution.result, 3)
+
+    def test_time_limit(self):
+        # Без времени на перебор — лучшая эвристика и честная нижняя оценка
+        graph, durations, _ = random_problem(3, 60, density=0.04)
+        solution = solve_exact(graph, durations, 4, time_limit=0)
+        self.assertLessEqual(solution.lower_bound, solution.result.makespan)
+        if not solution.optimal:
+            self.assertLess(solution.lower_bound, solution.result.makespan)
+        check_schedule(self, graph, durations, solution.result, 4)
+
+    def test_skips_search(self):
+        # Слишком большой граф и исчерпанный бюджет — без транзитивной редукции и перебора
+        graph, durations, _ = random_problem(5, 40, density=0.1)
+        with mock.patch.object(exact, "transitive_reduction", side_effect=AssertionError("reduced")):
+            solution = solve_exact(graph, durations, 3, time_limit=0)
+            self.assertEqual(solution.nodes, 0)
+            check_schedule(self, graph, durations, solution.result, 3)
+            with mock.patch.object(exact, "MAX_TASKS", 10):
+                solution = solve_exact(graph, durations, 3)
+        self.assertEqual(solution.nodes, 0)
+        self.assertEqual(solution.result.to_raw(), run_result("coffman", graph, durations, 3).to_raw())
+        self.assertLessEqual(solution.lower_bound, solution.result.makespan)
+
+    def test_process_pool(self):
+        graph, durations, _ = random_problem(11, 30, density=0.1)
+        sequential = solve_exact(graph, durations, 3, time_limit=10)
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            parallel = solve_exact(graph, durations, 3, time_limit=10, workers=2, executor=executor)
+        self.assertTrue(parallel.optimal)
+        self.assertEqual(parallel.result.makespan, sequential.result.makespan)
+        check_schedule(self, graph, durations, parallel.result, 3)
+
+    def test_edge_cases(self):
+        self.assertEqual(solve_exact(build_graph({}), [], 2).result.makespan, 0)
+        graph = build_graph({1: set(), 2: set()})
+        self.assertEqual(solve_exact(graph, [3, 3], 8).result.makespan, 3)
+        with self.assertRaises(ValueError):
+            solve_exact(build_graph({1: {2}, 2: {1}}), [1, 1], 2)
+        with self.assertRaises(ValueError):
+            solve_exact(graph, [1, 1], 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,9 @@
+import random
 import unittest
-from fujii import fujii_scheduler
-from common import Task
+from fujii import fujii_matching_result, fujii_result, fujii_scheduler, incomparability, maximum_matching
+from common import Task, build_graph
+from exact import solve_exact
+from tests.helpers import check_task_schedule
 
 class TestFujiiScheduler(unittest.TestCase):
     def test_basic_dependency(self):
@@ -16,7 +19,7 @@ class TestFujiiScheduler(unittest.TestCase):
             4: set()
         }
         schedule = fujii_scheduler(tasks, precedence, m=2)
-        self._check_functional(tasks, precedence, schedule, m=2)
+        check_task_schedule(self, tasks, precedence, schedule, m=2)
 
     def test_no_dependencies_concurrency(self):
         """
@@ -28,7 +31,7 @@ class TestFujiiScheduler(unittest.TestCase):
         tasks = {i: Task(i, duration=(i % 3) + 1) for i in range(1, n+1)}
         precedence = {i: set() for i in tasks}
         schedule = fujii_scheduler(tasks, precedence, m=m)
-        self._check_functional(tasks, precedence, schedule, m=m)
+        check_task_schedule(self, tasks, precedence, schedule, m=m)
 
         # Проверяем глобальную нагрузку
         events = []
@@ -50,7 +53,7 @@ class TestFujiiScheduler(unittest.TestCase):
         precedence = {i: {i-1} for i in range(2, 6)}
         precedence[1] = set()
         schedule = fujii_scheduler(tasks, precedence, m=2)
-        self._check_functional(tasks, precedence, schedule, m=2)
+        check_task_schedule(self, tasks, precedence, schedule, m=2)
 
     def test_complex_structure(self):
         """
@@ -73,34 +76,45 @@ class TestFujiiScheduler(unittest.TestCase):
             6: {4, 5},
         }
         schedule = fujii_scheduler(tasks, precedence, m=2)
-        self._check_functional(tasks, precedence, schedule, m=2)
+        check_task_schedule(self, tasks, precedence, schedule, m=2)
 
-    def _check_functional(self, tasks, precedence, schedule, m):
-        # 1. Все задачи назначены ровно один раз
-        assigned = [t.id for machine in schedule for t in machine]
-        self.assertCountEqual(assigned, tasks.keys())
-
-        # 2. Нет перекрытий на каждой машине
-        for machine in schedule:
-            machine.sort(key=lambda t: t.start_time)
-            for a, b in zip(machine, machine[1:]):
-                self.assertLessEqual(a.end_time, b.start_time)
+    def test_matching_mode(self):
+        """
+        FKN на единичных задачах: 1, 2 → 3 → 4; 5 и 6 независимы.
+        Оптимум для двух машин — 3 шага.
+        """
+        tasks = {i: Task(i, duration=1) for i in range(1, 7)}
+        precedence = {1: {3}, 2: {3}, 3: {4}}
+        schedule = fujii_scheduler(tasks, precedence, m=2, mode="matching")
+        check_task_schedule(self, tasks, precedence, schedule, m=2)
+        self.assertEqual(max(t.end_time for t in tasks.values()), 3)
+        with self.assertRaises(ValueError):
+            fujii_scheduler(tasks, precedence, mode="nope")
 
-        # 3. Соблюдение зависимостей
-        for u, vs in precedence.items():
-            for v in vs:
-                self.assertLessEqual(tasks[u].end_time, tasks[v].start_time)
+    def test_matching_optimal(self):
+        # Длина расписания совпадает с точным перебором и с n − |M|
+        for seed in range(80):
+            rng = random.Random(seed)
+            n = rng.randint(1, 14)
+            density = rng.random() * 0.5
+            graph = build_graph({i: {v for v in range(i + 1, n) if rng.random() < density} for i in range(n)}, range(n))
+            durations = [2] * n
+            result = fujii_matching_result(graph, durations, 2)
+            mate = maximum_matching(incomparability(graph))
+            pairs = sum(1 for i in range(n) if mate[i] > i)
+            self.assertEqual(result.makespan, 2 * (n - pairs), seed)
+            self.assertEqual(result.makespan, solve_exact(graph, durations, 2, time_limit=10).result.makespan, seed)
+            start = dict(zip(result.task, result.start))
+            for u in range(n):
+                for v in graph.successors(u):
+                    self.assertLessEqual(start[u] + 2, start[v])
 
-        # 4. Одновременная загрузка ≤ m
-        events = []
-        for machine in schedule:
-            for t in machine:
-                events.append((t.start_time, +1))
-                events.append((t.end_time, -1))
-        active = 0
-        for time, delta in sorted(events):
-            active += delta
-            self.assertLessEqual(active, m)
+    def test_matching_fallback(self):
+        # Не две машины или разные длительности — обычный жадный Fujii
+        graph = build_graph({1: {3}, 2: {3}, 3: set(), 4: set()})
+        for durations, m in (([1, 1, 1, 1], 3), ([1, 2, 1, 1], 2)):
+            self.assertEqual(fujii_matching_result(graph, durations, m).to_raw(),
+                             fujii_result(graph, durations, m).to_raw())
 
 
 if __name__ == "__main__":
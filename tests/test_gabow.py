@@ -1,6 +1,6 @@
 import unittest
-from gabow import gabow_scc
-from common import get_graph
+from gabow import gabow_scc, condensation, validate_schedule
+from common import build_graph, get_graph
 
 class TestGabowSCC(unittest.TestCase):
     def test_scc_detection(self):
@@ -74,5 +74,35 @@ class TestGabowSCC(unittest.TestCase):
         self.assertEqual(len(comp_sets), 1)
         self.assertEqual(comp_sets[0], set(range(1, n+1)))
 
+    def test_graph_input(self):
+        # CSR-граф даёт те же компоненты, что и словарь
+        precedence = {1: {2}, 2: {3}, 3: {1}, 4: {5}}
+        components = gabow_scc(build_graph(precedence))
+        comp_sets = [set(comp) for comp in components]
+        self.assertCountEqual(comp_sets, [{1, 2, 3}, {4}, {5}])
+
+    def test_deep_chain(self):
+        # Цепочка глубже лимита рекурсии, в конце замкнутая в цикл
+        n = 10000
+        precedence = {i: {i + 1} for i in range(1, n)}
+        components = gabow_scc(precedence)
+        self.assertEqual(len(components), n)
+        precedence[n] = {1}
+        self.assertEqual(len(gabow_scc(precedence)), 1)
+        with self.assertRaises(ValueError):
+            validate_schedule(precedence)
+
+    def test_condensation(self):
+        # Два цикла, связанные ребром: DAG из двух вершин
+        precedence = {1: {2}, 2: {1, 3}, 3: {4}, 4: {3}}
+        graph = build_graph(precedence)
+        component_of, dag = condensation(graph)
+        c12 = component_of[graph.index[1]]
+        c34 = component_of[graph.index[3]]
+        self.assertEqual(component_of[graph.index[2]], c12)
+        self.assertNotEqual(c12, c34)
+        self.assertEqual(len(dag), 2)
+        self.assertEqual(list(dag.successors(dag.index[c12])), [dag.index[c34]])
+
 if __name__ == "__main__":
     unittest.main()
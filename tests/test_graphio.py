@@ -0,0 +1,101 @@
+import os
+import tempfile
+import unittest
+from array import array
+
+from analytics import cycle_witness
+from common import Graph, build_graph
+from graphio import ProblemBuilder, build_problem, dump, dumps, from_json, load, loads
+from registry import run_result
+
+class TestGraphIO(unittest.TestCase):
+    def setUp(self):
+        self.graph = build_graph({1: {3}, 2: {3}, 3: {4}}, nodes=[1, 2, 3, 4, 5])
+        self.durations = [2, 1, 3, 1, 4]
+
+    def test_roundtrip(self):
+        graph, durations, machines = loads(dumps(self.graph, self.durations, machines=3))
+        self.assertEqual(machines, 3)
+        self.assertEqual(list(graph.ids), [1, 2, 3, 4, 5])
+        self.assertEqual(list(durations), self.durations)
+        self.assertEqual(graph.to_dicts(), self.graph.to_dicts())
+        # Графом поверх memoryview пользуются те же алгоритмы
+        self.assertEqual(run_result("coffman", graph, durations, 2).to_raw(),
+                         run_result("coffman", self.graph, self.durations, 2).to_raw())
+
+    def test_mmap_file(self):
+        fd, path = tempfile.mkstemp(suffix=".dag")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                dump(self.graph, self.durations, f)
+            graph, durations, machines = load(path)
+            self.assertEqual(machines, 0)
+            self.assertEqual(graph.index[3], self.graph.index[3])
+            self.assertEqual(list(graph.predecessors(graph.index[3])), [0, 1])
+            del graph, durations
+        finally:
+            os.unlink(path)
+
+    def test_from_json(self):
+        graph, durations, machines = from_json({
+            "tasks": [{"id": 1, "duration": 2}, {"id": 2, "predecessors": [1]}],
+            "machines": 2,
+        })
+        self.assertEqual(list(durations), [2, 1])
+        self.assertEqual(list(graph.successors(0)), [1])
+        with self.assertRaises(ValueError):
+            from_json({"tasks": [{"id": 1, "predecessors": [7]}]})
+
+    def test_problem_builder_forward_references(self):
+        tasks = [(1, 2, []), (2, 1, [1, 3]), (3, 4, []), (4, 1, [2, 3])]
+        problem = ProblemBuilder()
+        for task in reversed(tasks):
+            problem.add(*task)
+        graph, durations = problem.finish()
+        expected, _ = build_problem(tasks)
+        self.assertEqual(len(problem), 4)
+        for node in expected.ids:
+            self.assertEqual(sorted(graph.ids[i] for i in graph.successors(graph.index[node])),
+                             sorted(expected.ids[i] for i in expected.successors(expected.index[node])))
+        self.assertEqual(durations[graph.index[3]], 4)
+
+        problem = ProblemBuilder()
+        problem.add(1, 1, [7])
+        with self.assertRaises(ValueError):
+            problem.add(1, 1, [])
+        with self.assertRaises(ValueError):
+            problem.finish()
+
+    def test_corrupted(self):
+        data = dumps(self.graph, self.durations)
+        with self.assertRaises(ValueError):
+            loads(data[:-8])
+        with self.assertRaises(ValueError):
+            loads(b"JSON" + data[4:])
+        broken = bytearray(data)
+        broken[-8:] = (99).to_bytes(8, "little")
+        with self.assertRaises(ValueError):
+            loads(bytes(broken))
+        with self.assertRaises(ValueError):
+            dumps(build_graph({"a": {"b"}}), [1, 1])
+
+    def test_predecessors_match_successors(self):
+        g = self.graph
+
+        def with_pred(pred_indices):
+            return Graph(g.ids, g.index, g.succ_offsets, g.succ_indices, g.pred_offsets, array("q", pred_indices))
+
+        # Другой порядок предков внутри вершины — тот же граф
+        graph, _, _ = loads(dumps(with_pred([1, 0, 2]), self.durations))
+        self.assertEqual(graph.to_dicts(), g.to_dicts())
+        # Предок 3 → 4 подменён петлёй 4 → 4: Кан и поиск цикла разошлись бы
+        broken = with_pred([0, 1, 3])
+        with self.assertRaises(ValueError):
+            loads(dumps(broken, self.durations))
+        with self.assertRaises(ValueError):
+            cycle_witness(broken, [0, 0, 0, 1, 0])
+        with self.assertRaises(ValueError):
+            cycle_witness(g, [0, 0, 1, 0, 0])
+
+if __name__ == "__main__":
+    unittest.main()
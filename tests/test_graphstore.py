@@ -0,0 +1,64 @@
+import multiprocessing
+import unittest
+from common import build_graph
+from graphio import dumps
+from graphstore import GraphStore, graph_id
+
+def attached(gid):
+    # Другой процесс находит граф только по id
+    graph, durations, machines = GraphStore().get(gid)
+    return len(graph), graph.edge_count, sum(durations), machines
+
+class TestGraphStore(unittest.TestCase):
+    def setUp(self):
+        graph = build_graph({10: {30}, 20: {30}, 30: {40}}, nodes=[10, 20, 30, 40, 50])
+        self.data = dumps(graph, [2, 1, 3, 1, 4], machines=3)
+        self.store = GraphStore()
+        self.gid = self.store.put(self.data)
+
+    def tearDown(self):
+        try:
+            self.store.delete(self.gid)
+        except KeyError:
+            pass
+
+    def test_put_get(self):
+        self.assertEqual(self.gid, graph_id(self.data))
+        self.assertEqual(self.store.put(self.data), self.gid)
+        graph, durations, machines = self.store.get(self.gid)
+        self.assertEqual(list(graph.ids), [10, 20, 30, 40, 50])
+        self.assertEqual(list(durations), [2, 1, 3, 1, 4])
+        self.assertEqual(machines, 3)
+        with self.assertRaises(KeyError):
+            self.store.get("0" * 64)
+
+    def test_full_id_only(self):
+        # Префикс, id в верхнем регистре или с лишними символами не находят граф
+        for gid in (self.gid[:24], self.gid[:63], self.gid.upper(), self.gid + "0", self.gid + "\n"):
+            with self.assertRaises(KeyError):
+                self.store.get(gid)
+            with self.assertRaises(KeyError):
+                self.store.delete(gid)
+        # Полный id с тем же началом, но другим хвостом: сегмент тот же, хеш байт не совпадает
+        other = self.gid[:24] + ("0" if self.gid[24] != "0" else "1") + self.gid[25:]
+        with self.assertRaises(KeyError):
+            GraphStore().get(other)
+        with self.assertRaises(KeyError):
+            self.store.delete(other)
+        self.assertEqual(GraphStore().get(self.gid)[2], 3)
+
+    def test_other_process(self):
+        with multiprocessing.get_context("spawn").Pool(1) as pool:
+            self.assertEqual(pool.apply(attached, (self.gid,)), (5, 3, 11, 3))
+            self.store.delete(self.gid)
+            with self.assertRaises(KeyError):
+                pool.apply(attached, (self.gid,))
+        with self.assertRaises(KeyError):
+            self.store.get(self.gid)
+
+    def test_invalid(self):
+        cyclic = dumps(build_graph({1: {2}, 2: {1}}), [1, 1])
+        with self.assertRaisesRegex(ValueError, "Cycle detected"):
+            self.store.put(cyclic)
+        with self.assertRaisesRegex(ValueError, "too large"):
+            GraphStore(max_bytes=10).put(self.data)
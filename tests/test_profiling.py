@@ -0,0 +1,47 @@
+import unittest
+import profiling
+from common import build_graph
+from gabow import gabow_scc
+from registry import run_result
+
+class TestProfiling(unittest.TestCase):
+    def setUp(self):
+        self.graph = build_graph({1: {3}, 2: {3}, 3: {4}}, nodes=range(1, 6))
+        self.durations = [1, 2, 1, 3, 2]
+
+    def test_disabled(self):
+        self.assertIsNone(profiling.active())
+        with profiling.phase("noop"):
+            pass
+        run_result("fujii", self.graph, self.durations, 2)
+        self.assertIsNone(profiling.active())
+
+    def test_phases_and_counters(self):
+        with profiling.profiled() as profile:
+            for name in ("coffman", "fujii", "sethi"):
+                run_result(name, self.graph, self.durations, 2)
+            gabow_scc(self.graph)
+        for phase in ("graph.validate", "coffman.labels", "coffman.assign", "fujii.simulate", "sethi.order", "gabow.scc"):
+            self.assertIn(phase, profile.phases)
+        self.assertEqual(profile.counters["coffman.heap_ops"], 2 * 5 - 2)
+        # fujii и sethi: по 5 запусков и 5 завершений
+        self.assertEqual(profile.counters["simulate.events"], 10)
+        self.assertGreaterEqual(profile.peaks["simulate.ready_peak"], 3)
+        # run_result проверяет циклы проходом Кана, Габов запускается только явно
+        self.assertEqual(profile.counters["gabow.components"], 5)
+        self.assertIn("coffman.labels;dur=", profile.server_timing())
+
+    def test_metrics_text(self):
+        metrics = profiling.Metrics()
+        with profiling.profiled() as profile:
+            run_result("fujii", self.graph, self.durations, 2)
+        metrics.observe(profile, "/schedule/{algorithm}", 200)
+        metrics.observe(profile, "/schedule/{algorithm}", 200)
+        text = metrics.render({"cache_hits_total": 3, "jobs": 1})
+        self.assertIn('scheduler_requests_total{route="/schedule/{algorithm}",status="200"} 2', text)
+        self.assertIn('scheduler_events_total{name="simulate.events"} 10', text)
+        self.assertIn("# TYPE scheduler_cache_hits_total counter", text)
+        self.assertIn("scheduler_jobs 1", text)
+
+if __name__ == "__main__":
+    unittest.main()
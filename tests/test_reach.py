@@ -0,0 +1,70 @@
+import random
+import unittest
+from common import build_graph
+from reach import ReachabilityIndex, transitive_reduction
+
+def closure(graph):
+    reachable = []
+    for source in range(len(graph)):
+        seen, stack = set(), [source]
+        while stack:
+            for v in graph.successors(stack.pop()):
+                if v not in seen:
+                    seen.add(v)
+                    stack.append(v)
+        reachable.append(seen)
+    return reachable
+
+class TestReach(unittest.TestCase):
+    def setUp(self):
+        # 1 → 2 → 3, 1 → 3 и 1 → 4 → 3: рёбра 1 → 3 лишнее
+        self.graph = build_graph({1: {2, 3, 4}, 2: {3}, 4: {3}})
+
+    def edges(self, graph):
+        return {(graph.ids[u], graph.ids[v]) for u in range(len(graph)) for v in graph.successors(u)}
+
+    def test_reduction(self):
+        reduced = transitive_reduction(self.graph)
+        self.assertEqual(self.edges(reduced), {(1, 2), (2, 3), (1, 4), (4, 3)})
+        self.assertEqual(reduced.ids, self.graph.ids)
+        self.assertEqual(sorted(self.graph.ids[i] for i in reduced.predecessors(self.graph.index[3])), [2, 4])
+
+    def test_index(self):
+        index = ReachabilityIndex(self.graph)
+        node = self.graph.index
+        self.assertTrue(index.reaches(node[1], node[3]))
+        self.assertFalse(index.reaches(node[3], node[1]))
+        self.assertFalse(index.reaches(node[2], node[4]))
+        self.assertFalse(index.comparable(node[2], node[4]))
+        self.assertTrue(index.comparable(node[4], node[4]))
+        self.assertEqual(sorted(index.descendants(node[1])), sorted(node[i] for i in (2, 3, 4)))
+        self.assertEqual((index.edge_count, index.reduced_edge_count), (5, 4))
+
+    def test_random_graphs(self):
+        for seed in range(40):
+            rng = random.Random(seed)
+            n = rng.randint(0, 30)
+            nodes = list(range(n))
+            rng.shuffle(nodes)
+            density = rng.random() * 0.4
+            graph = build_graph({nodes[i]: {nodes[j] for j in range(i + 1, n) if rng.random() < density}
+                                 for i in range(n)}, nodes)
+            reachable = closure(graph)
+            index = ReachabilityIndex(graph)
+            reduced = transitive_reduction(graph)
+            self.assertEqual(closure(reduced), reachable, seed)
+            for u in range(n):
+                for v in range(n):
+                    self.assertEqual(index.reaches(u, v), v in reachable[u], seed)
+                for v in reduced.successors(u):
+                    # Ни одно оставшееся ребро не выводится через другого прямого потомка
+                    self.assertFalse(any(v in reachable[w] for w in reduced.successors(u)), seed)
+
+    def test_cycle(self):
+        with self.assertRaises(ValueError):
+            transitive_reduction(build_graph({1: {2}, 2: {1}}))
+        with self.assertRaises(ValueError):
+            ReachabilityIndex(build_graph({1: {2}, 2: {1}}))
+
+if __name__ == "__main__":
+    unittest.main()
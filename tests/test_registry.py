@@ -0,0 +1,70 @@
+import unittest
+from array import array
+from contextlib import ExitStack
+from unittest import mock
+import analytics
+from common import Task, build_graph
+from components import schedule_components
+from registry import ALGORITHMS, get_algorithm, makespan, register, run_algorithm, run_result
+
+def count_kahn_passes(test):
+    # Счётчик вызовов topological_frontiers во всех модулях, которые его импортируют
+    calls = []
+    original = analytics.topological_frontiers
+
+    def counted(graph):
+        calls.append(len(graph))
+        return original(graph)
+    stack = ExitStack()
+    for module in ("analytics", "registry", "fujii", "exact", "components", "reach"):
+        stack.enter_context(mock.patch(module + ".topological_frontiers", counted))
+    test.addCleanup(stack.close)
+    return calls
+
+class TestRegistry(unittest.TestCase):
+    def test_all_algorithms_valid(self):
+        # Каждый планировщик реестра даёт корректное расписание на общем входе
+        precedence = {1: {3}, 2: {3}, 3: {4, 5}, 5: {6}}
+        for name in ALGORITHMS:
+            tasks = {i: Task(i, duration=(i % 3) + 1) for i in range(1, 8)}
+            schedule = run_algorithm(name, tasks, precedence, 2)
+            self.assertEqual(len(schedule), 2, name)
+            self.assertCountEqual([t.id for machine in schedule for t in machine], tasks.keys())
+            for u, vs in precedence.items():
+                for v in vs:
+                    self.assertLessEqual(tasks[u].end_time, tasks[v].start_time, name)
+            for machine in schedule:
+                machine.sort(key=lambda t: t.start_time)
+                for a, b in zip(machine, machine[1:]):
+                    self.assertLessEqual(a.end_time, b.start_time, name)
+            self.assertGreaterEqual(makespan(schedule), 1 + 3 + 1 + 1)
+
+    def test_single_kahn_pass(self):
+        # Фронты проверки доходят до планировщика: проход Кана по графу один
+        graph = build_graph({0: {2}, 1: {2}, 2: {3, 4}, 5: {6}, 7: set()})
+        calls = count_kahn_passes(self)
+        for durations in (array("q", [1, 2, 3, 1, 2, 3, 1, 2]), array("q", [1]) * 8):
+            for name in ALGORITHMS:
+                del calls[:]
+                run_result(name, graph, durations, 2)
+                self.assertEqual(calls, [len(graph)], name)
+                del calls[:]
+                schedule_components(name, graph, durations, 3)
+                self.assertEqual(calls, [len(graph)], name)
+
+    def test_cycle_rejected(self):
+        tasks = {i: Task(i) for i in range(1, 4)}
+        with self.assertRaises(ValueError):
+            run_algorithm("sethi", tasks, {1: {2}, 2: {3}, 3: {1}}, 2)
+        # Петля — тоже цикл, хотя компонента сильной связности из одной вершины
+        with self.assertRaises(ValueError):
+            run_algorithm("fujii", tasks, {1: {1}}, 2)
+
+    def test_unknown_and_duplicate(self):
+        with self.assertRaises(KeyError):
+            get_algorithm("nope")
+        with self.assertRaises(ValueError):
+            register("coffman")(lambda tasks, precedence, m: [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+import json
+import unittest
+from render import schedule_columnar, schedule_json
+
+class TestRender(unittest.TestCase):
+    def setUp(self):
+        self.solved = {
+            "schedule": [[(2, 0, 1, 0), (3, 2, 3, 0)], [(1, 0, 2, 1)], []],
+            "makespan": 3,
+            "lower_bound": 3,
+        }
+
+    def test_rows_match_model_shape(self):
+        expected = {
+            "schedule": [
+                [{"id": i, "start_time": s, "end_time": e, "machine": m} for i, s, e, m in rows]
+                for rows in self.solved["schedule"]
+            ],
+            "algorithm": "coffman",
+            "makespan": 3,
+            "lower_bound": 3,
+        }
+        self.assertEqual(json.loads(schedule_json("coffman", self.solved)), expected)
+
+    def test_columnar(self):
+        data = json.loads(schedule_columnar("fujii", {**self.solved, "lower_bound": None}))
+        self.assertEqual(data["schedule"][0], {"machine": 0, "ids": [2, 3], "starts": [0, 2], "ends": [1, 3]})
+        self.assertEqual(data["schedule"][2], {"machine": 2, "ids": [], "starts": [], "ends": []})
+        self.assertIsNone(data["lower_bound"])
+        self.assertEqual(data["algorithm"], "fujii")
+
+if __name__ == "__main__":
+    unittest.main()
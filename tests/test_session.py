@@ -0,0 +1,123 @@
+import random
+import unittest
+from array import array
+from unittest import mock
+
+import session as session_module
+from common import build_graph
+from registry import run_result
+from session import SchedulingSession
+
+def rows(session):
+    return rows_of(session.result())
+
+def rows_of(result):
+    return sorted(row for i in range(result.m) for row in result.machine_rows(i))
+
+def fresh(session):
+    # Та же задача, спланированная с нуля соответствующим планировщиком из registry
+    alive = [i for i in range(len(session._ids)) if session._alive[i]]
+    precedence = {session._ids[i]: {session._ids[j] for j in session._succ[i]} for i in alive}
+    graph = build_graph(precedence, [session._ids[i] for i in alive])
+    durations = array("q", [session._duration[session._index[node]] for node in graph.ids])
+    return run_result(session.algorithm, graph, durations, session.m)
+
+class TestSchedulingSession(unittest.TestCase):
+    def test_prefix_kept(self):
+        # Цепочка 0 → 1 → 2 → 3: изменение хвоста не трогает начало
+        session = SchedulingSession({i: 2 for i in range(4)}, {0: [1], 1: [2], 2: [3]}, m=2)
+        before = rows(session)
+        session.set_duration(3, 5)
+        after = rows(session)
+        self.assertEqual(before[:3], after[:3])
+        self.assertEqual(session.makespan, 11)
+
+    def test_deltas(self):
+        session = SchedulingSession({1: 2, 2: 1, 3: 2}, {1: [3], 2: [3]}, m=2, algorithm="coffman")
+        session.add_task(4, 3, predecessors=[3])
+        self.assertEqual(session.makespan, 7)
+        session.remove_edge(2, 3)
+        session.remove_task(1)
+        self.assertEqual(session.makespan, 5)
+        session.apply({"op": "add_edge", "source": 2, "target": 3})
+        self.assertEqual(session.makespan, 6)
+        self.assertEqual(len(session), 3)
+
+    def test_cycle_rejected(self):
+        session = SchedulingSession({1: 1, 2: 1}, {1: [2]})
+        with self.assertRaises(ValueError):
+            session.add_edge(2, 1)
+        with self.assertRaises(ValueError):
+            session.add_task(3, predecessors=[2], successors=[1])
+        self.assertEqual(session.makespan, 2)
+
+    def test_matches_full_rebuild(self):
+        rnd = random.Random(7)
+        for algorithm in ("fujii", "coffman"):
+            for _ in range(40):
+                n = rnd.randint(2, 15)
+                precedence = {i: [j for j in range(i + 1, n) if rnd.random() < 0.2] for i in range(n)}
+                session = SchedulingSession({i: rnd.randint(1, 4) for i in range(n)}, precedence,
+                                            rnd.randint(1, 3), algorithm)
+                for step in range(6):
+                    alive = [session._ids[i] for i in range(len(session._ids)) if session._alive[i]]
+                    try:
+                        if step % 3 == 0:
+                            session.add_task(n + step, rnd.randint(1, 4), rnd.sample(alive, 1))
+                        elif step % 3 == 1:
+                            session.set_duration(rnd.choice(alive), rnd.randint(1, 5))
+                        else:
+                            session.add_edge(rnd.choice(alive), rnd.choice(alive))
+                    except ValueError:
+                        pass
+                    self.assertEqual(rows(session), rows_of(fresh(session)))
+
+    def test_matches_registry(self):
+        # Сразу после создания и после случайной дельты — то же, что run_result на текущем графе
+        rnd = random.Random(3)
+        for _ in range(300):
+            algorithm = rnd.choice(("fujii", "coffman"))
+            n = rnd.randint(1, 20)
+            precedence = {i: [j for j in range(i + 1, n) if rnd.random() < 0.2] for i in range(n)}
+            session = SchedulingSession({i: rnd.randint(1, 5) for i in range(n)}, precedence,
+                                        rnd.randint(1, 4), algorithm)
+            self.assertEqual(rows(session), rows_of(fresh(session)))
+            node = rnd.randrange(n)
+            if rnd.random() < 0.5:
+                session.set_duration(node, rnd.randint(1, 5))
+            else:
+                session.remove_task(node)
+            self.assertEqual(rows(session), rows_of(fresh(session)))
+
+    def test_incremental_labels(self):
+        # Слияние пересчитанных меток со старым порядком — без отката к полному пересчёту,
+        # в том числе с перенумерацией измельчившихся дробей
+        rnd = random.Random(11)
+        for limit in (2**20, 4):
+            with mock.patch.object(session_module, "AFFECTED_SHARE", 0), \
+                    mock.patch.object(session_module, "MAX_LABEL_DENOMINATOR", limit):
+                for _ in range(30):
+                    n = rnd.randint(2, 20)
+                    precedence = {i: [j for j in range(i + 1, n) if rnd.random() < 0.15] for i in range(n)}
+                    session = SchedulingSession({i: rnd.randint(1, 4) for i in range(n)}, precedence,
+                                                rnd.randint(1, 3), "coffman")
+                    for step in range(8):
+                        alive = [session._ids[i] for i in range(len(session._ids)) if session._alive[i]]
+                        try:
+                            if step % 4 == 0:
+                                session.add_task(n + step, rnd.randint(1, 4), rnd.sample(alive, 1))
+                            elif step % 4 == 1:
+                                session.add_edge(rnd.choice(alive), rnd.choice(alive))
+                            elif step % 4 == 2:
+                                u = rnd.choice(alive)
+                                succ = [session._ids[v] for v in session._succ[session._index[u]]]
+                                if succ:
+                                    session.remove_edge(u, rnd.choice(succ))
+                            else:
+                                session.remove_task(rnd.choice(alive))
+                        except ValueError:
+                            pass
+                        self.assertEqual(rows(session), rows_of(fresh(session)))
+
+if __name__ == "__main__":
+    unittest.main()
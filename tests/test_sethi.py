@@ -1,6 +1,6 @@
 import unittest
-from sethi import sethi_ulman_schedule
-from common import Task, get_graph
+from sethi import sethi_ulman_schedule, register_needs
+from common import Task, build_graph, get_graph
 
 class TestSethiUllman(unittest.TestCase):
     def test_simple_chain(self):
@@ -106,5 +106,19 @@ class TestSethiUllman(unittest.TestCase):
         # Ожидаем ровно последовательность 1..20
         self.assertEqual(order, list(range(1, n+1)))
 
+    def test_deep_chain(self):
+        # Цепочка глубже лимита рекурсии Python
+        n = 5000
+        precedence = {i: {i-1} for i in range(2, n+1)}
+        precedence[1] = set()
+        order = sethi_ulman_schedule(build_graph(precedence))
+        self.assertEqual(order, list(range(1, n+1)))
+
+    def test_register_needs(self):
+        # need: лист — 1, иначе max по потомкам + 1
+        graph = build_graph({3: {1, 2}, 4: {3}, 5: {1}})
+        need = {graph.ids[i]: v for i, v in enumerate(register_needs(graph))}
+        self.assertEqual(need, {1: 1, 2: 1, 3: 2, 4: 3, 5: 2})
+
 if __name__ == '__main__':
     unittest.main()
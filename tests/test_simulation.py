@@ -0,0 +1,45 @@
+import unittest
+from common import build_graph
+from simulation import list_schedule
+
+class TestListSchedule(unittest.TestCase):
+    def test_long_durations(self):
+        # Огромные длительности: время прыгает по событиям, а не по тактам
+        graph = build_graph({1: {3}, 2: {3}}, nodes=[1, 2, 3])
+        durations = [10**9, 5 * 10**8, 1]
+        priority = list(range(len(graph)))
+        start, end, machine = list_schedule(graph, durations, 2, priority)
+        c = graph.index[3]
+        self.assertEqual(start[c], 10**9)
+        self.assertEqual(end[c], 10**9 + 1)
+
+    def test_priority_and_free_machines(self):
+        # Без зависимостей: меньший ключ стартует раньше, машины не пересекаются
+        graph = build_graph({}, nodes=range(5))
+        durations = [3, 1, 2, 1, 1]
+        priority = [(d, i) for i, d in enumerate(durations)]
+        start, end, machine = list_schedule(graph, durations, 2, priority)
+        self.assertEqual({start[1], start[3]}, {0})
+        self.assertEqual(start[0], max(start))
+        busy = {}
+        for i in range(len(graph)):
+            for t in range(start[i], end[i]):
+                self.assertNotIn((machine[i], t), busy)
+                busy[(machine[i], t)] = i
+
+    def test_precedence(self):
+        precedence = {1: {2, 3}, 2: {4}, 3: {4}}
+        graph = build_graph(precedence)
+        durations = [2, 1, 3, 1]
+        start, end, machine = list_schedule(graph, durations, 3, [0] * len(graph))
+        for u, vs in precedence.items():
+            for v in vs:
+                self.assertLessEqual(end[graph.index[u]], start[graph.index[v]])
+
+    def test_cycle(self):
+        graph = build_graph({1: {2}, 2: {1}})
+        with self.assertRaises(ValueError):
+            list_schedule(graph, [1, 1], 2, [0, 0])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+from array import array
+from common import ScheduleResult, build_graph
+from registry import run_result
+from verify import check_schedule, verify_schedule
+
+class TestVerify(unittest.TestCase):
+    def setUp(self):
+        # 1 → 3, 2 → 3 на двух машинах
+        self.graph = build_graph({1: {3}, 2: {3}})
+        self.durations = array("q", [2, 1, 3])
+
+    def schedule(self, start, machine):
+        end = [s + d for s, d in zip(start, self.durations)]
+        return ScheduleResult.from_arrays(self.graph.ids, 2, start, end, machine)
+
+    def test_valid(self):
+        report = check_schedule(self.graph, self.durations, self.schedule([0, 0, 2], [0, 1, 0]))
+        self.assertTrue(report.ok)
+        self.assertEqual(report.makespan, 5)
+        self.assertEqual(report.busy, [5, 1])
+        self.assertEqual(report.idle, [0, 4])
+        self.assertEqual(report.utilization, [1.0, 0.2])
+        self.assertEqual(report.total_utilization, 0.6)
+
+    def test_violations(self):
+        precedence = verify_schedule(self.graph, self.durations, self.schedule([0, 0, 1], [0, 1, 1]))
+        self.assertIn("Precedence 1 -> 3 violated: 1 ends at 2, 3 starts at 1", precedence.errors)
+        overlap = verify_schedule(self.graph, self.durations, self.schedule([0, 1, 2], [0, 0, 1]))
+        self.assertEqual(len(overlap.errors), 1)
+        self.assertTrue(overlap.errors[0].startswith("Machine 0: task 1 [0, 2) overlaps task 2"))
+        result = self.schedule([0, 0, 2], [0, 1, 0])
+        result.end[0] += 1
+        self.assertFalse(verify_schedule(self.graph, self.durations, result).ok)
+        with self.assertRaises(AssertionError):
+            check_schedule(self.graph, self.durations, result)
+
+    def test_incomplete(self):
+        result = self.schedule([0, 0, 2], [0, 1, 0])
+        result.task[0] = result.task[1]
+        report = verify_schedule(self.graph, self.durations, result)
+        self.assertFalse(report.ok)
+        self.assertTrue(any("missing" in error for error in report.errors))
+
+    def test_algorithms(self):
+        graph = build_graph({i: {i + 3, i + 5} for i in range(30)}, nodes=range(35))
+        durations = [1 + i % 4 for i in range(35)]
+        for name in ("coffman", "fujii", "sethi"):
+            report = check_schedule(graph, durations, run_result(name, graph, durations, 3))
+            self.assertEqual(len(report.busy), 3)
+            self.assertEqual(sum(report.busy), sum(durations))
@@ -0,0 +1,134 @@
+"""
+Проверка готового расписания по колонкам ScheduleResult за O(n + e).
+
+    report = verify_schedule(graph, durations, result)
+    report.errors        # [] — расписание корректно
+    report.utilization   # доля занятого времени по машинам
+
+Проверяется:
+  - полнота: каждая задача графа ровно в одной строке;
+  - длительность: end - start == durations[i], start >= 0;
+  - машины: номер в [0, m), строки лежат в срезе своей машины;
+  - перекрытие: на машине строки по возрастанию старта и не пересекаются;
+  - предшествование: end[u] <= start[v] для каждого ребра u → v.
+Если машины в [0, m) и на каждой задачи не пересекаются, одновременно идёт
+не больше m задач — отдельная проверка по событиям не нужна.
+Быстрый путь — any(map(...)) по массивам без Python-цикла на задачу или ребро;
+только найдя нарушение, проверка проходит ещё раз, чтобы назвать первые из них.
+"""
+import operator
+from array import array
+from collections import deque
+from itertools import chain, repeat
+from typing import List, Sequence
+
+from common import Graph, ScheduleResult
+
+# Сколько нарушений каждого вида перечислять в отчёте
+MAX_ERRORS = 10
+
+
+class ScheduleReport:
+    """Итог verify_schedule: нарушения и загрузка машин на отрезке [0, makespan]."""
+    __slots__ = ("errors", "makespan", "busy", "idle", "utilization")
+
+    def __init__(self, errors: List[str], makespan: int, busy: List[int]):
+        self.errors = errors
+        self.makespan = makespan
+        self.busy = busy
+        self.idle = [makespan - b for b in busy]
+        self.utilization = [b / makespan if makespan else 0.0 for b in busy]
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    @property
+    def total_utilization(self) -> float:
+        """Доля занятого времени всех машин вместе."""
+        capacity = self.makespan * len(self.busy)
+        return sum(self.busy) / capacity if capacity else 0.0
+
+
+def verify_schedule(graph: Graph, durations: Sequence[int], result: ScheduleResult) -> ScheduleReport:
+    """Проверить result для графа graph и длительностей durations (по плотным индексам)."""
+    n = len(graph)
+    m = result.m
+    task, start, end, machine, offsets = result.task, result.start, result.end, result.machine, result.machine_offsets
+    errors: List[str] = []
+    ids = graph.ids
+
+    # Полнота: task — перестановка плотных индексов
+    if len(task) != n or (n and (min(task) < 0 or max(task) >= n)) or len(set(task)) != n:
+        seen = bytearray(n)
+        for i in task:
+            if not 0 <= i < n:
+                errors.append(f"Unknown task index in schedule: {i}")
+            elif seen[i]:
+                errors.append(f"Task {ids[i]} scheduled more than once")
+            seen[i] = 1
+        missing = [ids[i] for i in range(n) if not seen[i]]
+        if missing:
+            errors.append(f"Tasks missing from schedule: {missing[:MAX_ERRORS]}")
+        # Без перестановки дальше нечего сопоставлять с графом
+        return ScheduleReport(errors[:MAX_ERRORS], max(end, default=0), [0] * m)
+
+    # Длительности и неотрицательные старты
+    expected = map(durations.__getitem__, task)
+    if any(map(operator.ne, map(operator.sub, end, start), expected)) or (n and min(start) < 0):
+        for k in range(n):
+            i = task[k]
+            if start[k] < 0 or end[k] - start[k] != durations[i]:
+                errors.append(f"Task {ids[i]}: [{start[k]}, {end[k]}) does not match duration {durations[i]}")
+                if len(errors) >= MAX_ERRORS:
+                    break
+
+    # Машины: срезы по machine_offsets, внутри — по старту без перекрытий
+    busy = [0] * m
+    if len(offsets) != m + 1 or offsets[0] != 0 or offsets[m] != n:
+        errors.append("Machine offsets do not cover the schedule")
+    else:
+        for i in range(m):
+            a, b = offsets[i], offsets[i + 1]
+            if b < a or machine[a:b].count(i) != b - a:
+                errors.append(f"Machine {i}: rows belong to other machines")
+                continue
+            if any(map(operator.gt, end[a:b - 1], start[a + 1:b])):
+                for k in range(a, b - 1):
+                    if end[k] > start[k + 1]:
+                        errors.append(f"Machine {i}: task {ids[task[k]]} [{start[k]}, {end[k]}) overlaps "
+                                      f"task {ids[task[k + 1]]} [{start[k + 1]}, {end[k + 1]})")
+                        break
+            busy[i] = sum(end[a:b]) - sum(start[a:b])
+
+    # Предшествование: рёбра CSR, концы и начала — по плотным индексам
+    start_of = array("q", [0]) * n
+    end_of = array("q", [0]) * n
+    deque(map(start_of.__setitem__, task, start), maxlen=0)
+    deque(map(end_of.__setitem__, task, end), maxlen=0)
+    succ_offsets, succ_indices = graph.succ_offsets, graph.succ_indices
+    degrees = map(operator.sub, succ_offsets[1:], succ_offsets[:-1])
+    sources = chain.from_iterable(map(repeat, range(n), degrees))
+    if any(map(operator.gt, map(end_of.__getitem__, sources), map(start_of.__getitem__, succ_indices))):
+        count = 0
+        for u in range(n):
+            for k in range(succ_offsets[u], succ_offsets[u + 1]):
+                v = succ_indices[k]
+                if end_of[u] > start_of[v]:
+                    errors.append(f"Precedence {ids[u]} -> {ids[v]} violated: "
+                                  f"{ids[u]} ends at {end_of[u]}, {ids[v]} starts at {start_of[v]}")
+                    count += 1
+                    if count >= MAX_ERRORS:
+                        break
+            if count >= MAX_ERRORS:
+                break
+
+    return ScheduleReport(errors, max(end, default=0), busy)
+
+
+def check_schedule(graph: Graph, durations: Sequence[int], result: ScheduleResult) -> ScheduleReport:
+    """То же, но AssertionError со списком нарушений, если они есть: для тестов и отладочного режима API."""
+    report = verify_schedule(graph, durations, result)
+    if report.errors:
+        raise AssertionError("Invalid schedule: " + "; ".join(report.errors))
+    return report